@@ -1,6 +1,6 @@
 from src.app.routers.customer_discovery import CustomerDiscoverer
 
-async def get_customer_discoverer(topic:str):
-    cd = CustomerDiscoverer(topic)
+async def get_customer_discoverer(topic:str, on_progress=None):
+    cd = CustomerDiscoverer(topic, on_progress=on_progress)
     rp = cd.discover()
     return rp.ideal_customer_profile["insights"]
\ No newline at end of file
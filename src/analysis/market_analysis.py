@@ -8,8 +8,8 @@ def base64_to_image(base64_string):
     imgdata = base64.b64decode(base64_string)
     return BytesIO(imgdata)
 
-async def get_market_report(analysis_topic:str):
-    ma = MarketAnalyzer()
+async def get_market_report(analysis_topic:str, on_progress=None):
+    ma = MarketAnalyzer(on_progress=on_progress)
     res = ma.breakdown_problem(analysis_topic)
     tg = await ma.generate_trend_visualization()
     img_tg = ma.visualize_trend(tg)
@@ -0,0 +1,276 @@
+"""
+Batch runner for producing market intelligence reports for many domains.
+
+Usage (from the repository root):
+
+    python -m src.app.batch_runner domains.txt --output reports.jsonl --workers 4
+    python -m src.app.batch_runner domains.txt --run-tag weekly-42
+
+Domains are handed out from a shared queue to a process pool, and every
+worker runs several pipelines concurrently on its own event loop, so a slow
+domain never holds back the domains queued behind it. All workers
+checkpoint into the same on-disk directory under a run tag (by default
+today's date), so an interrupted batch can simply be re-run with the same
+tag, while a later batch with a new tag researches every domain afresh.
+"""
+
+import os
+import sys
+
+# Both "src.app" and "app" import roots are used across the codebase
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SRC_DIR, os.path.dirname(SRC_DIR)):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import queue
+import re
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+
+def load_domains(path: str) -> List[str]:
+    """Read one domain per line, skipping blanks, comments and duplicates"""
+    domains: List[str] = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            domain = line.strip()
+            if not domain or domain.startswith("#"):
+                continue
+            key = domain.lower()
+            if key not in seen:
+                seen.add(key)
+                domains.append(domain)
+    return domains
+
+
+# Longest run tag that keeps domain run ids within the checkpoint run id pattern
+MAX_RUN_TAG_LENGTH = 41
+
+
+def default_run_tag() -> str:
+    """Today's date, so checkpoints are reused within a day and not replayed after"""
+    return date.today().isoformat()
+
+
+def domain_run_id(domain: str, run_tag: str) -> str:
+    """Run id shared by every worker and every re-run of the domain under a run tag"""
+    digest = hashlib.sha256(" ".join(domain.lower().split()).encode("utf-8"))
+    return f"batch-{run_tag}-{digest.hexdigest()[:16]}"
+
+
+async def _run_domains(
+    work: Any,
+    results: Any,
+    concurrency: int,
+    targets: Optional[List[str]],
+    run_tag: str,
+):
+    """Run pipelines for domains taken from the shared queue until it is empty"""
+    from src.app.services.pipeline_service import run_pipeline
+
+    async def run_one(domain: str):
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"domain": domain, "pid": os.getpid()}
+        try:
+            report = await run_pipeline(
+                domain, targets=targets, run_id=domain_run_id(domain, run_tag)
+            )
+            record["status"] = "ok"
+            record["report"] = report.model_dump(mode="json")
+        except Exception as e:
+            record["status"] = "error"
+            record["error"] = str(e)
+        record["latency_seconds"] = round(time.perf_counter() - started, 3)
+        results.put(record)
+
+    async def consume():
+        while True:
+            try:
+                # A manager queue is a proxy whose calls block on the manager process
+                domain = await asyncio.to_thread(work.get_nowait)
+            except queue.Empty:
+                return
+            await run_one(domain)
+
+    await asyncio.gather(*(consume() for _ in range(concurrency)))
+
+
+def _worker(
+    work: Any,
+    results: Any,
+    concurrency: int,
+    targets: Optional[List[str]],
+    run_tag: str,
+):
+    """Process pool entry point"""
+    asyncio.run(_run_domains(work, results, concurrency, targets, run_tag))
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def print_summary(records: List[Dict[str, Any]], elapsed: float):
+    """Print throughput and per-domain latency statistics"""
+    latencies = [record["latency_seconds"] for record in records]
+    failed = [record for record in records if record["status"] != "ok"]
+
+    print("\n=== Batch summary ===")
+    print(f"Domains processed: {len(records)} ({len(failed)} failed)")
+    print(f"Wall time:         {elapsed:.1f}s")
+    if elapsed > 0:
+        print(f"Throughput:        {len(records) / elapsed * 60:.2f} domains/min")
+    if latencies:
+        print(
+            "Latency (s):       "
+            f"mean={statistics.mean(latencies):.1f} "
+            f"p50={_percentile(latencies, 50):.1f} "
+            f"p95={_percentile(latencies, 95):.1f} "
+            f"max={max(latencies):.1f}"
+        )
+    for record in failed:
+        print(f"  FAILED {record['domain']}: {record['error']}")
+
+
+def run_batch(
+    domains: List[str],
+    output_path: str,
+    workers: int,
+    concurrency: int,
+    targets: Optional[List[str]] = None,
+    run_tag: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Execute the pipeline for every domain and stream each report to JSONL.
+
+    Args:
+        domains (List[str]): Domains to research
+        output_path (str): JSONL file receiving one record per domain
+        workers (int): Number of worker processes
+        concurrency (int): Pipelines running concurrently inside each worker
+        targets (List[str], optional): Pipeline stages to produce
+        run_tag (str, optional): Checkpoints are shared by runs with the same
+            tag. Defaults to today's date.
+
+    Returns:
+        List[Dict[str, Any]]: Per-domain records without the report payload
+    """
+    workers = max(1, min(workers, len(domains)))
+    run_tag = run_tag or default_run_tag()
+    records: List[Dict[str, Any]] = []
+    started = time.perf_counter()
+
+    with multiprocessing.Manager() as manager, open(
+        output_path, "a", encoding="utf-8"
+    ) as output:
+        # Workers pull domains as they free up rather than owning a fixed share
+        work = manager.Queue()
+        for domain in domains:
+            work.put(domain)
+        results = manager.Queue()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_worker, work, results, concurrency, targets, run_tag)
+                for _ in range(workers)
+            ]
+
+            while len(records) < len(domains):
+                try:
+                    record = results.get(timeout=1)
+                except queue.Empty:
+                    # A crashed worker never reports its remaining domains
+                    if all(future.done() for future in futures):
+                        break
+                    continue
+
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                record.pop("report", None)
+                records.append(record)
+                print(
+                    f"[{len(records)}/{len(domains)}] {record['domain']}: "
+                    f"{record['status']} in {record['latency_seconds']:.1f}s"
+                )
+
+            for future in futures:
+                if future.exception():
+                    print(f"Worker failed: {future.exception()}")
+
+    print_summary(records, time.perf_counter() - started)
+    return records
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Generate market intelligence reports for a file of domains"
+    )
+    parser.add_argument("domains_file", help="File with one domain per line")
+    parser.add_argument(
+        "--output", default="reports.jsonl", help="JSONL file to append reports to"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1, help="Worker processes"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Concurrent pipelines inside each worker",
+    )
+    parser.add_argument(
+        "--targets",
+        nargs="*",
+        default=None,
+        help="Pipeline stages to produce (default: all)",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Shared on-disk checkpoint directory (default: CHECKPOINT_DIR)",
+    )
+    parser.add_argument(
+        "--run-tag",
+        default=None,
+        help="Re-runs with the same tag resume from checkpoints (default: today's date)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.run_tag is not None and not re.fullmatch(
+        rf"[A-Za-z0-9_-]{{1,{MAX_RUN_TAG_LENGTH}}}", args.run_tag
+    ):
+        parser.error(
+            f"--run-tag must be 1-{MAX_RUN_TAG_LENGTH} letters, digits, '-' or '_'"
+        )
+
+    if args.checkpoint_dir:
+        # Inherited by the worker processes through their Settings
+        os.environ["CHECKPOINT_DIR"] = os.path.abspath(args.checkpoint_dir)
+
+    domains = load_domains(args.domains_file)
+    if not domains:
+        parser.error(f"No domains found in {args.domains_file}")
+
+    run_batch(
+        domains,
+        args.output,
+        args.workers,
+        args.concurrency,
+        args.targets,
+        args.run_tag,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Sequence, TypeVar
+
+from pydantic import BaseModel, Field
+
+from src.app.config import get_settings
+
+T = TypeVar("T")
+
+
+class CallPriority(IntEnum):
+    """How essential an LLM call is to the final report"""
+
+    OPTIONAL = 0
+    NORMAL = 1
+    HIGH = 2
+    CRITICAL = 3
+
+
+class BudgetExceededError(Exception):
+    """Raised when the run budget or deadline does not admit a call"""
+
+
+class BudgetSummary(BaseModel):
+    """Spend of a pipeline run and the work that was dropped to stay within budget"""
+
+    calls: int
+    tokens: int
+    cost_usd: float
+    max_calls: Optional[int] = None
+    max_tokens: Optional[int] = None
+    max_cost_usd: Optional[float] = None
+    deadline_seconds: Optional[float] = None
+    elapsed_seconds: float = 0.0
+    downgraded_calls: int = 0
+    skipped: List[str] = Field(
+        default_factory=list, description="Work skipped because the budget ran low"
+    )
+    partial: bool = Field(
+        False, description="Whether any work was skipped to stay within budget"
+    )
+
+
+class RunBudget:
+    """
+    Per-run limit on LLM calls, tokens, estimated dollars and wall-clock time.
+
+    While plenty of budget remains every call runs as requested. Below
+    degrade_threshold optional calls are refused and normal calls move to a
+    cheaper model; below critical_reserve only high and critical calls run,
+    and once exhausted only critical calls are admitted. With a deadline,
+    in-flight calls are also given a timeout so they end when it passes, and
+    no call is started once less than min_call_timeout seconds remain.
+    """
+
+    # USD per million (input, output) tokens
+    MODEL_PRICES = {
+        "gpt-4o": (2.50, 10.00),
+        "gpt-4o-mini": (0.15, 0.60),
+        "claude-sonnet-3.5": (3.00, 15.00),
+        "claude-haiku-3.5": (0.80, 4.00),
+        "deepseek": (0.27, 1.10),
+        "qwen-2.5": (0.0, 0.0),
+    }
+
+    CHEAPER_MODELS = {
+        "gpt-4o": "gpt-4o-mini",
+        "claude-sonnet-3.5": "claude-haiku-3.5",
+    }
+
+    def __init__(
+        self,
+        max_calls: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        max_cost_usd: Optional[float] = None,
+        deadline_seconds: Optional[float] = None,
+        degrade_threshold: float = 0.5,
+        critical_reserve: float = 0.1,
+        min_call_timeout: float = 1.0,
+    ):
+        self.max_calls = max_calls
+        self.max_tokens = max_tokens
+        self.max_cost_usd = max_cost_usd
+        self.deadline_seconds = deadline_seconds
+        self.degrade_threshold = degrade_threshold
+        self.critical_reserve = critical_reserve
+        self.min_call_timeout = min_call_timeout
+        self.started_at = time.monotonic()
+
+        self.calls = 0
+        self.tokens = 0
+        self.cost_usd = 0.0
+        self.downgraded_calls = 0
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    def elapsed(self) -> float:
+        """Seconds since the run started"""
+        return time.monotonic() - self.started_at
+
+    def time_remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without a deadline"""
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed())
+
+    @property
+    def expired(self) -> bool:
+        """Whether too little time is left before the deadline to start a call"""
+        remaining = self.time_remaining()
+        return remaining is not None and remaining < self.min_call_timeout
+
+    def call_timeout(self) -> Optional[float]:
+        """Timeout for the next LLM call so it ends by the deadline"""
+        return self.time_remaining()
+
+    def remaining_fraction(self) -> float:
+        """Fraction of the tightest configured limit that is still unused"""
+        fractions = [
+            1 - used / limit
+            for used, limit in (
+                (self.calls, self.max_calls),
+                (self.tokens, self.max_tokens),
+                (self.cost_usd, self.max_cost_usd),
+                (self.elapsed(), self.deadline_seconds),
+            )
+            if limit
+        ]
+        return max(0.0, min(fractions)) if fractions else 1.0
+
+    def allows(self, priority: CallPriority) -> bool:
+        """Whether a call of this priority would currently be admitted"""
+        remaining = self.remaining_fraction()
+        if remaining <= 0:
+            return priority >= CallPriority.CRITICAL
+        if remaining < self.critical_reserve:
+            return priority >= CallPriority.HIGH
+        if remaining < self.degrade_threshold:
+            return priority >= CallPriority.NORMAL
+        return True
+
+    def admit(self, model_name: str, priority: CallPriority) -> str:
+        """
+        Reserve a call and pick the model it should run on.
+
+        Args:
+            model_name (str): Model requested by the caller
+            priority (CallPriority): Importance of the call
+
+        Returns:
+            str: Requested model, or a cheaper one when the budget is running low
+
+        Raises:
+            BudgetExceededError: If the budget no longer admits this priority, or
+                the deadline is too close to start a call
+        """
+        with self._lock:
+            if self.expired:
+                raise BudgetExceededError("Run deadline reached")
+            if not self.allows(priority):
+                raise BudgetExceededError(
+                    f"Run budget exhausted for {priority.name.lower()} calls"
+                )
+
+            remaining = self.remaining_fraction()
+            downgrade = (
+                remaining < self.degrade_threshold and priority < CallPriority.CRITICAL
+            )
+            if downgrade and model_name in self.CHEAPER_MODELS:
+                model_name = self.CHEAPER_MODELS[model_name]
+                self.downgraded_calls += 1
+
+            self.calls += 1
+            return model_name
+
+    def record_usage(self, model_name: str, usage: Optional[Dict[str, int]]):
+        """Account for the tokens and estimated cost of a finished call"""
+        usage = usage or {}
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        input_price, output_price = self.MODEL_PRICES.get(model_name, (0.0, 0.0))
+
+        with self._lock:
+            self.tokens += prompt_tokens + completion_tokens
+            self.cost_usd += (
+                prompt_tokens * input_price + completion_tokens * output_price
+            ) / 1_000_000
+
+    def limit(self, count: int, priority: CallPriority = CallPriority.NORMAL) -> int:
+        """Scale down how many units of fan-out work to start as the budget drains"""
+        if not self.allows(priority):
+            return 0
+        remaining = self.remaining_fraction()
+        if remaining >= self.degrade_threshold:
+            return count
+        return max(1, int(count * remaining / self.degrade_threshold))
+
+    def skip(self, item: str):
+        """Record a piece of work dropped because of the budget"""
+        with self._lock:
+            self.skipped.append(item)
+
+    def has_skipped(self, prefix: str) -> bool:
+        """Whether any work whose label starts with prefix was skipped"""
+        with self._lock:
+            return any(item.startswith(prefix) for item in self.skipped)
+
+    def summary(self) -> BudgetSummary:
+        """Snapshot of the spend so far"""
+        with self._lock:
+            return BudgetSummary(
+                calls=self.calls,
+                tokens=self.tokens,
+                cost_usd=round(self.cost_usd, 4),
+                max_calls=self.max_calls,
+                max_tokens=self.max_tokens,
+                max_cost_usd=self.max_cost_usd,
+                deadline_seconds=self.deadline_seconds,
+                elapsed_seconds=round(self.elapsed(), 2),
+                downgraded_calls=self.downgraded_calls,
+                skipped=list(self.skipped),
+                partial=bool(self.skipped),
+            )
+
+
+def within_budget(
+    budget: Optional[RunBudget],
+    items: Sequence[T],
+    label: str,
+    priority: CallPriority = CallPriority.NORMAL,
+) -> List[T]:
+    """Keep the leading items the budget can afford and record the rest as skipped"""
+    if budget is None:
+        return list(items)
+
+    allowed = budget.limit(len(items), priority)
+    for item in items[allowed:]:
+        budget.skip(f"{label}: {item}")
+    return list(items[:allowed])
+
+
+def run_within_budget(
+    budget: Optional[RunBudget],
+    label: str,
+    compute: Callable[[], Any],
+    default: Any = None,
+) -> Any:
+    """Run a unit of work, falling back to default if the budget refuses its calls"""
+    try:
+        return compute()
+    except BudgetExceededError:
+        budget.skip(label)
+        return default
+
+
+def is_partial(budget: Optional[RunBudget], prefix: str) -> bool:
+    """Whether a report was cut short because its budget or deadline ran out"""
+    return budget is not None and budget.has_skipped(prefix)
+
+
+def default_run_budget(
+    max_calls: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    max_cost_usd: Optional[float] = None,
+    deadline_seconds: Optional[float] = None,
+) -> Optional[RunBudget]:
+    """
+    Budget built from the RUN_BUDGET_* settings, or None when no limit is set.
+
+    Limits passed in, e.g. from an endpoint's query parameters, replace the
+    configured ones; the others keep their configured value.
+    """
+    settings = get_settings()
+    limits = {
+        "max_calls": max_calls or settings.RUN_BUDGET_MAX_CALLS,
+        "max_tokens": max_tokens or settings.RUN_BUDGET_MAX_TOKENS,
+        "max_cost_usd": max_cost_usd or settings.RUN_BUDGET_MAX_COST_USD,
+        "deadline_seconds": deadline_seconds,
+    }
+    if all(limit is None for limit in limits.values()):
+        return None
+    return RunBudget(**limits)
@@ -1,3 +1,5 @@
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
@@ -9,11 +11,59 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str = "sqlite:///./market_intelligence.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
     
     # LLM Configuration
     DEFAULT_LLM_MODEL: str = "gpt-4o"
     DEFAULT_LLM_TEMPERATURE: float = 0.7
     
+    # Pipeline Configuration
+    PIPELINE_MAX_CONCURRENT_STAGES: int = 4
+    CHECKPOINT_DIR: str = "./checkpoints"
+    
+    # Admission control for analysis requests
+    MAX_CONCURRENT_RUNS: int = 4
+    MAX_QUEUED_RUNS: int = 16
+    ADMISSION_RETRY_AFTER_SECONDS: int = 30
+    # Identical analysis requests within this window share one run
+    IDEMPOTENCY_WINDOW_SECONDS: int = 300
+    
+    # Compressed, content-addressed storage for raw search texts
+    BLOB_DIR: str = "./blobs"
+    BLOB_EXCERPT_CHARS: int = 280
+    
+    # Per-run LLM budget, unlimited when unset
+    RUN_BUDGET_MAX_CALLS: Optional[int] = None
+    RUN_BUDGET_MAX_TOKENS: Optional[int] = None
+    RUN_BUDGET_MAX_COST_USD: Optional[float] = None
+    
+    # Local document store consulted before external search
+    DOCUMENT_STORE_ENABLED: bool = True
+    DOCUMENT_STORE_MAX_AGE_DAYS: int = 30
+    DOCUMENT_STORE_MIN_RESULTS: int = 3
+    DOCUMENT_STORE_MIN_COVERAGE: float = 0.6
+    
+    # Responses at least this large are compressed (brotli if installed, else gzip)
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 1000
+    
+    # Insights chat: exchanges kept verbatim and estimated tokens per request
+    CHAT_MEMORY_RECENT_TURNS: int = 6
+    CHAT_TOKEN_BUDGET: int = 6000
+    
+    # Chart rendering processes (0 renders in the calling thread) and cache size
+    CHART_RENDER_WORKERS: int = 2
+    CHART_CACHE_SIZE: int = 128
+    # Chart data served by the image endpoint, kept apart from the texts in BLOB_DIR
+    CHART_DIR: str = "./charts"
+    
+    # Exported PDF reports, cached by the hash of the reports they contain
+    PDF_CACHE_DIR: str = "./pdf_cache"
+    
     # Optional additional configurations
     DEBUG: bool = False
     
@@ -24,11 +74,26 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Retrieve application settings.
     
+    The environment and .env file are read once per process; call
+    reload_settings() after changing them.
+    
     Returns:
         Settings: Configured application settings
     """
     return Settings()
+
+
+def reload_settings() -> Settings:
+    """
+    Re-read the environment and .env file.
+    
+    Returns:
+        Settings: Freshly loaded application settings
+    """
+    get_settings.cache_clear()
+    return get_settings()
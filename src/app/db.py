@@ -1,22 +1,138 @@
-import os
-from sqlalchemy import create_engine
+import threading
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy_utils import database_exists, create_database
 
 # SQLAlchemy base class for declarative models
 Base = declarative_base()
 
+# Process-wide engine and session factory, created once at application startup
+_engine: Optional[Engine] = None
+_session_factory: Optional[sessionmaker] = None
+_init_lock = threading.Lock()
+
+# Async counterparts used by the async routers; scripts keep the sync ones
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+
+# Alembic environment holding the schema migrations
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "migrations"
+
+# Async DBAPI drivers for the sync URLs accepted in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def _is_sqlite_memory(database_url: str) -> bool:
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def async_database_url(database_url: str) -> str:
+    """Swap the sync driver of a database URL for its async counterpart"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend: {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def _apply_sqlite_pragmas(engine: Engine, settings, in_memory: bool):
+    """Tune every new SQLite connection for concurrent API access"""
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            # WAL lets readers proceed while a writer is active
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
 # Create SQLAlchemy engine
-def create_database_engine(database_url: str):
+def create_database_engine(database_url: str, settings=None):
     """
     Create a database engine with the given database URL.
     Creates the database if it doesn't exist.
     """
-    engine = create_engine(database_url)
-    
-    if not database_exists(engine.url):
+    from src.app.config import get_settings
+
+    settings = settings or get_settings()
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = _is_sqlite_memory(database_url)
+
+    engine_options = {"pool_pre_ping": True}
+    if is_sqlite:
+        engine_options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not in_memory:
+        engine_options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    engine = create_engine(database_url, **engine_options)
+    if is_sqlite:
+        _apply_sqlite_pragmas(engine, settings, in_memory)
+
+    if not in_memory and not database_exists(engine.url):
         create_database(engine.url)
-    
+
+    return engine
+
+
+def create_async_database_engine(database_url: str, settings=None) -> AsyncEngine:
+    """
+    Create an async engine for the given sync database URL.
+    The database itself is created by the sync engine at startup.
+    """
+    from src.app.config import get_settings
+
+    settings = settings or get_settings()
+    is_sqlite = make_url(database_url).get_backend_name() == "sqlite"
+    in_memory = _is_sqlite_memory(database_url)
+
+    engine_options = {"pool_pre_ping": True}
+    if is_sqlite:
+        engine_options["connect_args"] = {
+            "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000,
+        }
+    if not in_memory:
+        engine_options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+        )
+
+    engine = create_async_engine(async_database_url(database_url), **engine_options)
+    if is_sqlite:
+        # Connection events are registered on the sync engine behind the async one
+        _apply_sqlite_pragmas(engine.sync_engine, settings, in_memory)
     return engine
 
 # Create session factory
@@ -26,20 +142,121 @@ def create_session_factory(engine):
     """
     return sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def migrate_database(engine: Engine):
+    """Apply the Alembic migrations to databases created by an earlier schema"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(MIGRATIONS_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, "head")
+
+
+def init_database(settings=None) -> Engine:
+    """
+    Create the process-wide engine, session factory and tables if they don't exist yet.
+    Called from the FastAPI lifespan; scripts may call it directly.
+    """
+    global _engine, _session_factory
+    from src.app.config import get_settings
+    from src.app import models  # noqa: F401  registers the tables on Base
+    from src.app.services.document_service import ensure_document_index
+    from src.app.services.search_service import ensure_search_index
+
+    with _init_lock:
+        if _engine is None:
+            settings = settings or get_settings()
+            _engine = create_database_engine(settings.DATABASE_URL, settings)
+            Base.metadata.create_all(bind=_engine)
+            migrate_database(_engine)
+            with _engine.begin() as connection:
+                ensure_search_index(connection)
+                ensure_document_index(connection)
+            _session_factory = create_session_factory(_engine)
+        return _engine
+
+
+def init_async_database(settings=None) -> AsyncEngine:
+    """
+    Create the process-wide async engine and session factory if they don't exist yet.
+    Tables are created by init_database, which should run first.
+    """
+    global _async_engine, _async_session_factory
+    from src.app.config import get_settings
+
+    with _init_lock:
+        if _async_engine is None:
+            settings = settings or get_settings()
+            _async_engine = create_async_database_engine(
+                settings.DATABASE_URL, settings
+            )
+            _async_session_factory = async_sessionmaker(
+                _async_engine, autoflush=False, expire_on_commit=False
+            )
+        return _async_engine
+
+
+async def dispose_async_database():
+    """Close every pooled async connection, used at application shutdown"""
+    global _async_engine, _async_session_factory
+    with _init_lock:
+        engine = _async_engine
+        _async_engine = None
+        _async_session_factory = None
+    if engine is not None:
+        await engine.dispose()
+
+
+def dispose_database():
+    """Close every pooled connection, used at application shutdown"""
+    global _engine, _session_factory
+    with _init_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
+
+
+def get_engine() -> Engine:
+    """Return the shared engine, creating it on first use"""
+    return _engine or init_database()
+
+
+def get_session_factory() -> sessionmaker:
+    """Return the shared session factory, creating it on first use"""
+    if _session_factory is None:
+        init_database()
+    return _session_factory
+
+
 # Database connection and session management
 def get_db():
     """
-    Create a database connection and return a session.
-    If the database doesn't exist, it will be created.
+    Yield a session from the shared session factory.
+    The engine and its connection pool are reused across requests.
     """
-    from app.config import get_settings
-    
-    settings = get_settings()
-    engine = create_database_engine(settings.DATABASE_URL)
-    SessionLocal = create_session_factory(engine)
-    
+    db = get_session_factory()()
     try:
-        db = SessionLocal()
         yield db
     finally:
         db.close()
+
+
+def get_async_session_factory() -> async_sessionmaker:
+    """Return the shared async session factory, creating it on first use"""
+    if _async_session_factory is None:
+        init_database()
+        init_async_database()
+    return _async_session_factory
+
+
+async def get_async_db():
+    """
+    Yield an async session for routers running on the event loop.
+    Queries await the driver instead of blocking concurrent requests.
+    """
+    async with get_async_session_factory()() as db:
+        yield db
@@ -0,0 +1,60 @@
+import threading
+from typing import Optional
+
+from starlette.requests import HTTPConnection
+
+from src.app.config import get_settings
+from src.app.exa import ExaAPI
+from src.app.jina import JinaReader
+from src.app.llm import CompletionHandler
+from src.app.schemas.llm import APIKeyManager
+from src.app.services.blob_service import BlobStore, get_blob_store
+from src.app.services.chart_service import get_chart_store
+from src.app.services.document_service import DocumentStore, get_document_store
+
+
+class ServiceContainer:
+    """
+    Long-lived clients shared by every analyzer in the process.
+
+    Analyzers used to build their own LLM helpers and search clients per
+    request; with a container they borrow these instead, so connection pools
+    stay warm and exa_py/litellm are set up once.
+    """
+
+    def __init__(self, settings=None):
+        settings = settings or get_settings()
+        self.settings = settings
+        self.api_key_manager = APIKeyManager()
+        self.completion_handler = CompletionHandler()
+        self.exa = ExaAPI(settings.EXA_API_KEY)
+        self.jina = JinaReader(settings.JINA_API_KEY)
+        self.documents: DocumentStore = get_document_store()
+        self.blobs: BlobStore = get_blob_store()
+        self.charts: BlobStore = get_chart_store()
+
+    def warm_up(self):
+        """Create the external clients now rather than on the first request"""
+        import litellm  # noqa: F401
+
+        self.exa.exa  # the property builds the exa_py client
+
+
+_services: Optional[ServiceContainer] = None
+_services_lock = threading.Lock()
+
+
+def get_service_container() -> ServiceContainer:
+    """Process-wide service container, created on first use outside the API"""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = ServiceContainer()
+        return _services
+
+
+def get_services(connection: HTTPConnection) -> ServiceContainer:
+    """FastAPI dependency returning the container created in the lifespan"""
+    # HTTPConnection rather than Request so WebSocket routes can depend on it too
+    services = getattr(connection.app.state, "services", None)
+    return services or get_service_container()
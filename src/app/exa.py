@@ -1,14 +1,26 @@
+import threading
+
+
 class ExaAPI:
     def __init__(self, api_key):
         self.api_key = api_key
-        self.exa = None
-        self.initialize_client()
+        self._exa = None
+        self._lock = threading.Lock()
+
+    @property
+    def exa(self):
+        """Exa client, created on first use so exa_py is only imported when needed"""
+        if self._exa is None:
+            with self._lock:
+                if self._exa is None:
+                    self.initialize_client()
+        return self._exa
 
     def initialize_client(self):
         """Initialize the Exa client"""
         from exa_py import Exa
 
-        self.exa = Exa(self.api_key)
+        self._exa = Exa(self.api_key)
 
     def search(self, query, **kwargs):
         """Perform a search with various options"""
@@ -1,3 +1,5 @@
+import threading
+
 import requests
 
 
@@ -6,6 +8,17 @@ class JinaReader:
         self.base_read_url = "https://r.jina.ai/"
         self.base_search_url = "https://s.jina.ai/"
         self.api_key = api_key
+        # requests.Session is not thread-safe, so every thread keeps its own pool
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session of the calling thread, reusing its open connections"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
 
     def read_url(self, url):
         """Read content from a specific URL"""
@@ -15,7 +28,7 @@ class JinaReader:
             headers["Authorization"] = f"Bearer {self.api_key}"
 
         full_url = f"{self.base_read_url}{url}"
-        response = requests.get(full_url, headers=headers)
+        response = self.session.get(full_url, headers=headers)
         return response.text
 
     def search(self, query):
@@ -27,5 +40,5 @@ class JinaReader:
             headers["X-Retain-Images"] = "none"
 
         full_url = f"{self.base_search_url}{query}"
-        response = requests.get(full_url, headers=headers)
+        response = self.session.get(full_url, headers=headers)
         return response.text
@@ -1,5 +1,4 @@
-from typing import List, Optional
-from litellm import completion, acompletion
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 from pydantic import BaseModel
 from dotenv import load_dotenv
 import json
@@ -11,6 +10,7 @@ from src.app.schemas.llm import (
     ModelConfig,
     APIKeyManager,
 )
+from src.app.budget import BudgetExceededError, CallPriority, RunBudget
 from typing import Type
 
 # Load environment variables at module level
@@ -28,6 +28,8 @@ class CompletionHandler:
         messages: List[Message],
         api_key: str,
         response_format: Optional[BaseModel] = None,
+        on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+        timeout: Optional[float] = None,
     ) -> Any:
         """Generate async completion"""
         try:
@@ -42,14 +44,21 @@ class CompletionHandler:
 
             if response_format:
                 completion_args["response_format"] = response_format
+            if timeout:
+                completion_args["timeout"] = timeout
+
+            # litellm is slow to import, so it is loaded on the first call
+            from litellm import acompletion
 
             response = await acompletion(**completion_args)
+            response_data = response.model_dump()
+
+            if on_usage:
+                on_usage(response_data.get("usage") or {})
 
             if response_format:
-                return json.loads(
-                    response.model_dump()["choices"][0]["message"]["content"]
-                )
-            return response.model_dump()["choices"][0]["message"]["content"]
+                return json.loads(response_data["choices"][0]["message"]["content"])
+            return response_data["choices"][0]["message"]["content"]
 
         except Exception as e:
             raise Exception(f"Async completion failed: {str(e)}")
@@ -60,6 +69,8 @@ class CompletionHandler:
         messages: List[Message],
         api_key: str,
         response_format: Optional[Type[BaseModel]] = None,
+        on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+        timeout: Optional[float] = None,
     ) -> Any:
         """Generate sync completion"""
         try:
@@ -74,18 +85,99 @@ class CompletionHandler:
 
             if response_format:
                 completion_args["response_format"] = response_format
+            if timeout:
+                completion_args["timeout"] = timeout
+
+            from litellm import completion
 
             response = completion(**completion_args)
+            response_data = response.model_dump()
+
+            if on_usage:
+                on_usage(response_data.get("usage") or {})
 
             if response_format:
-                return json.loads(
-                    response.model_dump()["choices"][0]["message"]["content"]
-                )
-            return response.model_dump()["choices"][0]["message"]["content"]
+                return json.loads(response_data["choices"][0]["message"]["content"])
+            return response_data["choices"][0]["message"]["content"]
 
         except Exception as e:
             raise Exception(f"Sync completion failed: {str(e)}")
 
+    @staticmethod
+    def _stream_args(
+        model_config: ModelConfig,
+        messages: List[Message],
+        api_key: str,
+        timeout: Optional[float],
+    ) -> Dict[str, Any]:
+        completion_args = {
+            "model": model_config.name,
+            "messages": [msg.model_dump() for msg in messages],
+            "temperature": model_config.temperature,
+            "max_tokens": model_config.max_tokens,
+            "api_key": api_key,
+            "num_retries": CompletionHandler.NUM_RETRIES,
+            "stream": True,
+            # Providers that support it report usage in the final chunk
+            "stream_options": {"include_usage": True},
+        }
+        if timeout:
+            completion_args["timeout"] = timeout
+        return completion_args
+
+    @staticmethod
+    def _chunk_text(chunk: Any, on_usage: Optional[Callable]) -> str:
+        usage = getattr(chunk, "usage", None)
+        if usage and on_usage:
+            on_usage(usage.model_dump() if hasattr(usage, "model_dump") else dict(usage))
+        if not chunk.choices:
+            return ""
+        return chunk.choices[0].delta.content or ""
+
+    @staticmethod
+    def stream(
+        model_config: ModelConfig,
+        messages: List[Message],
+        api_key: str,
+        on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> Iterator[str]:
+        """Generate a sync completion, yielding text as it arrives"""
+        from litellm import completion
+
+        try:
+            response = completion(
+                **CompletionHandler._stream_args(model_config, messages, api_key, timeout)
+            )
+            for chunk in response:
+                text = CompletionHandler._chunk_text(chunk, on_usage)
+                if text:
+                    yield text
+        except Exception as e:
+            raise Exception(f"Sync streaming completion failed: {str(e)}")
+
+    @staticmethod
+    async def astream(
+        model_config: ModelConfig,
+        messages: List[Message],
+        api_key: str,
+        on_usage: Optional[Callable[[Dict[str, int]], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[str]:
+        """Generate an async completion, yielding text as it arrives"""
+        from litellm import acompletion
+
+        try:
+            response = await acompletion(
+                **CompletionHandler._stream_args(model_config, messages, api_key, timeout)
+            )
+            async for chunk in response:
+                text = CompletionHandler._chunk_text(chunk, on_usage)
+                if text:
+                    yield text
+        except Exception as e:
+            raise Exception(f"Async streaming completion failed: {str(e)}")
+
 
 class LiteLLMKit:
     """Enhanced LiteLLM client with better organization and error handling"""
@@ -114,35 +206,136 @@ class LiteLLMKit:
         temperature: float = 0.7,
         max_tokens: int = 1024,
         stream: bool = False,
+        budget: Optional[RunBudget] = None,
+        api_key_manager: Optional[APIKeyManager] = None,
+        completion_handler: Optional[CompletionHandler] = None,
     ):
-        """Initialize the enhanced LiteLLM client"""
+        """Initialize the enhanced LiteLLM client, optionally with shared helpers"""
         if model_name not in self.MODELS:
             raise ValueError(
                 f"Unsupported model: {model_name}. Available models: {list(self.MODELS.keys())}"
             )
 
-        self.model_config = self.MODELS[model_name]
-        self.model_config.temperature = temperature
-        self.model_config.max_tokens = max_tokens
-        self.model_config.stream = stream
+        self.model_name = model_name
+        self.model_config = self._build_model_config(
+            model_name, temperature, max_tokens, stream
+        )
+        self.budget = budget
+
+        self.api_key_manager = api_key_manager or APIKeyManager()
+        self.completion_handler = completion_handler or CompletionHandler()
+
+    def _build_model_config(
+        self, model_name: str, temperature: float, max_tokens: int, stream: bool
+    ) -> ModelConfig:
+        """Copy the shared model mapping so per-client settings never leak"""
+        return self.MODELS[model_name].model_copy(
+            update={
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": stream,
+            }
+        )
+
+    def _admit(
+        self, priority: CallPriority
+    ) -> Tuple[ModelConfig, Optional[Callable], Optional[float]]:
+        """Ask the run budget for permission, the model and the timeout for a call"""
+        if self.budget is None:
+            return self.model_config, None, None
+
+        model_name = self.budget.admit(self.model_name, priority)
+        model_config = self.model_config
+        if model_name != self.model_name:
+            model_config = self._build_model_config(
+                model_name,
+                self.model_config.temperature,
+                self.model_config.max_tokens,
+                self.model_config.stream,
+            )
+        return (
+            model_config,
+            lambda usage: self.budget.record_usage(model_name, usage),
+            self.budget.call_timeout(),
+        )
 
-        self.api_key_manager = APIKeyManager()
-        self.completion_handler = CompletionHandler()
+    def _deadline_reached(self) -> bool:
+        """Whether a failed call was most likely cut off by the run deadline"""
+        return self.budget is not None and self.budget.expired
 
     async def agenerate(
-        self, request: ChatRequest, response_format: Optional[BaseModel] = None
+        self,
+        request: ChatRequest,
+        response_format: Optional[BaseModel] = None,
+        priority: CallPriority = CallPriority.NORMAL,
     ) -> Any:
         """Generate async completion"""
-        api_key = self.api_key_manager.get_key(self.model_config.provider)
-        return await self.completion_handler.agenerate(
-            self.model_config, request.messages, api_key, response_format
-        )
+        model_config, on_usage, timeout = self._admit(priority)
+        api_key = self.api_key_manager.get_key(model_config.provider)
+        try:
+            return await self.completion_handler.agenerate(
+                model_config,
+                request.messages,
+                api_key,
+                response_format,
+                on_usage,
+                timeout,
+            )
+        except Exception as e:
+            if self._deadline_reached():
+                raise BudgetExceededError(f"Run deadline reached: {e}") from e
+            raise
 
     def generate(
-        self, request: ChatRequest, response_format: Optional[Type[BaseModel]] = None
+        self,
+        request: ChatRequest,
+        response_format: Optional[Type[BaseModel]] = None,
+        priority: CallPriority = CallPriority.NORMAL,
     ) -> Any:
         """Generate sync completion"""
-        api_key = self.api_key_manager.get_key(self.model_config.provider)
-        return self.completion_handler.generate(
-            self.model_config, request.messages, api_key, response_format
-        )
+        model_config, on_usage, timeout = self._admit(priority)
+        api_key = self.api_key_manager.get_key(model_config.provider)
+        try:
+            return self.completion_handler.generate(
+                model_config,
+                request.messages,
+                api_key,
+                response_format,
+                on_usage,
+                timeout,
+            )
+        except Exception as e:
+            if self._deadline_reached():
+                raise BudgetExceededError(f"Run deadline reached: {e}") from e
+            raise
+
+    def stream(
+        self, request: ChatRequest, priority: CallPriority = CallPriority.NORMAL
+    ) -> Iterator[str]:
+        """Generate sync completion, yielding text chunks as they arrive"""
+        model_config, on_usage, timeout = self._admit(priority)
+        api_key = self.api_key_manager.get_key(model_config.provider)
+        try:
+            yield from self.completion_handler.stream(
+                model_config, request.messages, api_key, on_usage, timeout
+            )
+        except Exception as e:
+            if self._deadline_reached():
+                raise BudgetExceededError(f"Run deadline reached: {e}") from e
+            raise
+
+    async def astream(
+        self, request: ChatRequest, priority: CallPriority = CallPriority.NORMAL
+    ) -> AsyncIterator[str]:
+        """Generate async completion, yielding text chunks as they arrive"""
+        model_config, on_usage, timeout = self._admit(priority)
+        api_key = self.api_key_manager.get_key(model_config.provider)
+        try:
+            async for text in self.completion_handler.astream(
+                model_config, request.messages, api_key, on_usage, timeout
+            ):
+                yield text
+        except Exception as e:
+            if self._deadline_reached():
+                raise BudgetExceededError(f"Run deadline reached: {e}") from e
+            raise
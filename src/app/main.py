@@ -1,31 +1,82 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+
+try:
+    # Optional: brotli compresses JSON reports better and falls back to gzip
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
 
 from app.routers import (
+    blobs,
+    charts,
+    chat,
     competitive_intelligence,
     market_expansion,
     product_evolution,
     users,
     market_analysis,
     customer_discovery,
+    documents,
+    jobs,
+    metrics,
+    pipeline,
+    search,
+)
+
+# Imported through the same root as the services so they share one engine
+from src.app.config import get_settings
+from src.app.dependencies import get_service_container
+from src.app.services.admission_service import QueueFullError
+from src.app.services.chart_service import shutdown_chart_renderer
+from src.app.db import (
+    dispose_async_database,
+    dispose_database,
+    init_async_database,
+    init_database,
 )
 
-from app.db import Base, create_database_engine
-from app.config import get_settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create process-wide resources once at startup and release them at shutdown"""
+    # Create the shared engine, its connection pool and the database tables
+    init_database()
+    # Async routers draw their sessions from a separate async engine
+    init_async_database()
+    # Shared clients handed to analyzers through the get_services dependency
+    app.state.services = get_service_container()
+    app.state.services.warm_up()
+    yield
+    shutdown_chart_renderer()
+    await dispose_async_database()
+    dispose_database()
+
+
+async def queue_full_handler(request: Request, exc: QueueFullError) -> JSONResponse:
+    """Tell an over-capacity caller where it would have queued and when to retry"""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "queue_position": exc.queue_position},
+        headers={
+            "Retry-After": str(exc.retry_after),
+            "X-Queue-Position": str(exc.queue_position),
+        },
+    )
 
 
 def create_application() -> FastAPI:
     """Create and configure FastAPI application"""
-    # Create database tables
-    settings = get_settings()
-    engine = create_database_engine(settings.DATABASE_URL)
-    Base.metadata.create_all(bind=engine)
-
     # Initialize FastAPI app
     app = FastAPI(
         title="Market Intelligence Platform",
         description="Comprehensive market research and business intelligence tool",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # Add CORS middleware
@@ -37,13 +88,31 @@ def create_application() -> FastAPI:
         allow_headers=["*"],  # Allows all headers
     )
 
+    # Compress large report payloads
+    minimum_size = get_settings().RESPONSE_COMPRESSION_MIN_BYTES
+    if BrotliMiddleware is not None:
+        app.add_middleware(BrotliMiddleware, minimum_size=minimum_size)
+    else:
+        app.add_middleware(GZipMiddleware, minimum_size=minimum_size)
+
+    # Reject expensive runs beyond the admission queue
+    app.add_exception_handler(QueueFullError, queue_full_handler)
+
     # Include routers
     # app.include_router(competitive_intelligence.router)
-    # app.include_router(market_expansion.router)
-    # app.include_router(product_evolution.router)
+    app.include_router(market_expansion.router)
+    app.include_router(product_evolution.router)
     # app.include_router(users.router)
     app.include_router(market_analysis.router)
     app.include_router(customer_discovery.router)
+    app.include_router(pipeline.router)
+    app.include_router(search.router)
+    app.include_router(documents.router)
+    app.include_router(blobs.router)
+    app.include_router(charts.router)
+    app.include_router(metrics.router)
+    app.include_router(jobs.router)
+    app.include_router(chat.router)
 
     return app
 
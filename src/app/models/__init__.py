@@ -1,13 +1,23 @@
-from sqlalchemy.ext.declarative import declarative_base
+from src.app.db import Base
 from sqlalchemy import (
     Column,
     DateTime,
 )
 from datetime import datetime
 
-Base = declarative_base()
-
 
 class TimestampMixin:
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Register every model on Base so relationships resolve and create_all sees them
+from src.app.models import (  # noqa: E402
+    competitor,
+    customer,
+    document,
+    expansion,
+    market,
+    product,
+    user,
+)
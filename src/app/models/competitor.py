@@ -14,7 +14,7 @@ class CompetitorAnalysis(Base, TimestampMixin):
     __tablename__ = "competitor_analyses"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     competitor_name = Column(String(255))
     market_share = Column(Float)
     strengths = Column(JSON)
@@ -30,7 +30,7 @@ class MarketPosition(Base, TimestampMixin):
     __tablename__ = "market_positions"
 
     id = Column(Integer, primary_key=True)
-    analysis_id = Column(Integer, ForeignKey("competitor_analyses.id"))
+    analysis_id = Column(Integer, ForeignKey("competitor_analyses.id"), index=True)
     dimension = Column(String(100))
     score = Column(Float)
     evidence = Column(JSON)
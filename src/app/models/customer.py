@@ -6,6 +6,8 @@ from sqlalchemy import (
     ForeignKey,
     Float,
     JSON,
+    Boolean,
+    Text,
 )
 from sqlalchemy.orm import relationship
 
@@ -14,25 +16,47 @@ class CustomerProfile(Base, TimestampMixin):
     __tablename__ = "customer_profiles"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     segment_name = Column(String(255))
+    lookup_key = Column(String(64), index=True)
+    total_market_size = Column(Integer, default=0)
     demographics = Column(JSON)
     behaviors = Column(JSON)
     needs = Column(JSON)
     pain_points = Column(JSON)
+    ideal_customer_profile = Column(JSON)
+    investor_sentiment = Column(JSON)
+    partial = Column(Boolean, default=False)
 
     user = relationship("User", back_populates="customer_profiles")
     journey_maps = relationship("CustomerJourney", back_populates="profile")
+    niches = relationship("ProfileNiche", back_populates="profile")
 
 
 class CustomerJourney(Base, TimestampMixin):
     __tablename__ = "customer_journeys"
 
     id = Column(Integer, primary_key=True)
-    profile_id = Column(Integer, ForeignKey("customer_profiles.id"))
+    profile_id = Column(Integer, ForeignKey("customer_profiles.id"), index=True)
     stage_name = Column(String(100))
     touchpoints = Column(JSON)
     satisfaction_score = Column(Float)
     feedback = Column(JSON)
 
     profile = relationship("CustomerProfile", back_populates="journey_maps")
+
+
+class ProfileNiche(Base, TimestampMixin):
+    __tablename__ = "profile_niches"
+
+    id = Column(Integer, primary_key=True)
+    profile_id = Column(Integer, ForeignKey("customer_profiles.id"), index=True)
+    name = Column(String(255))
+    description = Column(Text)
+    search_query = Column(String(500))
+    search_results = Column(JSON)
+    market_size = Column(Integer, default=0)
+    growth_potential = Column(Float, default=0.0)
+    key_characteristics = Column(JSON)
+
+    profile = relationship("CustomerProfile", back_populates="niches")
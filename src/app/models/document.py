@@ -0,0 +1,21 @@
+from src.app.models import Base, TimestampMixin
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    Text,
+)
+
+
+class Document(Base, TimestampMixin):
+    __tablename__ = "documents"
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String(2048), unique=True, nullable=False)
+    title = Column(String(500))
+    source = Column(String(50))
+    query = Column(String(1000))
+    content = Column(Text)
+    content_hash = Column(String(64), index=True)
+    fetched_at = Column(DateTime, index=True)
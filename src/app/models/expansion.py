@@ -7,6 +7,8 @@ from sqlalchemy import (
     ForeignKey,
     Float,
     JSON,
+    Boolean,
+    Text,
 )
 from sqlalchemy.orm import relationship
 
@@ -14,8 +16,11 @@ class MarketExpansion(Base, TimestampMixin):
     __tablename__ = 'market_expansions'
     
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey('users.id'))
+    user_id = Column(Integer, ForeignKey('users.id'), index=True)
     target_market = Column(String(255))
+    lookup_key = Column(String(64), index=True)
+    potential_synergies = Column(JSON)
+    partial = Column(Boolean, default=False)
     market_size = Column(Float)
     entry_strategy = Column(JSON)
     risks = Column(JSON)
@@ -23,15 +28,31 @@ class MarketExpansion(Base, TimestampMixin):
     cultural_factors = Column(JSON)
     
     milestones = relationship("ExpansionMilestone", back_populates="expansion")
+    domains = relationship("ExpansionDomain", back_populates="expansion")
 
 class ExpansionMilestone(Base, TimestampMixin):
     __tablename__ = 'expansion_milestones'
     
     id = Column(Integer, primary_key=True)
-    expansion_id = Column(Integer, ForeignKey('market_expansions.id'))
+    expansion_id = Column(Integer, ForeignKey('market_expansions.id'), index=True)
     name = Column(String(255))
     status = Column(String(50))
     metrics = Column(JSON)
     completion_date = Column(DateTime)
     
-    expansion = relationship("MarketExpansion", back_populates="milestones")
\ No newline at end of file
+    expansion = relationship("MarketExpansion", back_populates="milestones")
+
+class ExpansionDomain(Base, TimestampMixin):
+    __tablename__ = 'expansion_domains'
+
+    id = Column(Integer, primary_key=True)
+    expansion_id = Column(Integer, ForeignKey('market_expansions.id'), index=True)
+    name = Column(String(255))
+    # Rank among the proposed domains; None for domains only analyzed
+    position = Column(Integer)
+    strategic_rationale = Column(Text)
+    competitive_landscape = Column(JSON)
+    investment_requirement = Column(Float)
+    risk_score = Column(Float)
+
+    expansion = relationship("MarketExpansion", back_populates="domains")
@@ -6,6 +6,8 @@ from sqlalchemy import (
     ForeignKey,
     Float,
     JSON,
+    Text,
+    Boolean,
 )
 from sqlalchemy.orm import relationship
 
@@ -14,7 +16,11 @@ class MarketAnalysis(Base, TimestampMixin):
     __tablename__ = "market_analyses"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    query = Column(Text)
+    lookup_key = Column(String(64), index=True)
+    comprehensive_report = Column(Text)
+    partial = Column(Boolean, default=False)
     market_size = Column(Float)
     growth_rate = Column(Float)
     market_trends = Column(JSON)
@@ -24,16 +30,40 @@ class MarketAnalysis(Base, TimestampMixin):
     # Relationships
     user = relationship("User", back_populates="market_analyses")
     trend_data = relationship("MarketTrend", back_populates="analysis")
+    questions = relationship("ResearchQuestion", back_populates="analysis")
+    search_results = relationship("MarketSearchResult", back_populates="analysis")
 
 
 class MarketTrend(Base, TimestampMixin):
     __tablename__ = "market_trends"
 
     id = Column(Integer, primary_key=True)
-    analysis_id = Column(Integer, ForeignKey("market_analyses.id"))
+    analysis_id = Column(Integer, ForeignKey("market_analyses.id"), index=True)
     trend_type = Column(String(100))
     description = Column(String(500))
     confidence_score = Column(Float)
     data_points = Column(JSON)
 
     analysis = relationship("MarketAnalysis", back_populates="trend_data")
+
+
+class ResearchQuestion(Base, TimestampMixin):
+    __tablename__ = "research_questions"
+
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("market_analyses.id"), index=True)
+    position = Column(Integer)
+    question = Column(Text)
+
+    analysis = relationship("MarketAnalysis", back_populates="questions")
+
+
+class MarketSearchResult(Base, TimestampMixin):
+    __tablename__ = "market_search_results"
+
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("market_analyses.id"), index=True)
+    search_query = Column(Text)
+    result = Column(JSON)
+
+    analysis = relationship("MarketAnalysis", back_populates="search_results")
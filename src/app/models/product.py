@@ -14,7 +14,7 @@ class Product(Base, TimestampMixin):
     __tablename__ = "products"
 
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     name = Column(String(255))
     description = Column(String(500))
     features = Column(JSON)
@@ -28,7 +28,7 @@ class ProductFeedback(Base, TimestampMixin):
     __tablename__ = "product_feedback"
 
     id = Column(Integer, primary_key=True)
-    product_id = Column(Integer, ForeignKey("products.id"))
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     source = Column(String(100))
     sentiment = Column(Float)
     content = Column(JSON)
@@ -41,7 +41,7 @@ class ProductIteration(Base, TimestampMixin):
     __tablename__ = "product_iterations"
 
     id = Column(Integer, primary_key=True)
-    product_id = Column(Integer, ForeignKey("products.id"))
+    product_id = Column(Integer, ForeignKey("products.id"), index=True)
     version = Column(String(50))
     changes = Column(JSON)
     metrics = Column(JSON)
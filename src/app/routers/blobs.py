@@ -0,0 +1,30 @@
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from src.app.services.blob_service import get_blob_store
+
+router = APIRouter(prefix="/blobs", tags=["blobs"])
+
+
+@router.get("/{digest}", response_class=PlainTextResponse)
+def get_blob(digest: str):
+    """Full raw text behind a report's search result reference"""
+    try:
+        return get_blob_store().get(digest)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown blob: {digest}")
+
+
+@router.post("/resolve")
+def resolve_blobs(digests: List[str]) -> Dict[str, Optional[str]]:
+    """Full raw texts for several references at once; unknown hashes map to null"""
+    blobs = get_blob_store()
+    texts: Dict[str, Optional[str]] = {}
+    for digest in dict.fromkeys(digests):
+        try:
+            texts[digest] = blobs.get(digest)
+        except KeyError:
+            texts[digest] = None
+    return texts
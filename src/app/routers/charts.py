@@ -0,0 +1,50 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+
+from src.app.dependencies import ServiceContainer, get_services
+from src.app.services.chart_service import (
+    CHART_FORMATS,
+    chart_digest,
+    get_chart_renderer,
+    load_chart,
+)
+
+router = APIRouter(prefix="/charts", tags=["charts"])
+
+# A chart id is the hash of its data, so its rendering never changes
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get(
+    "/{chart_id}.{fmt}",
+    response_class=Response,
+    responses={200: {"content": {media_type: {} for media_type in CHART_FORMATS.values()}}},
+)
+async def chart_image(
+    chart_id: str,
+    fmt: str,
+    if_none_match: Optional[str] = Header(None),
+    services: ServiceContainer = Depends(get_services),
+):
+    """Rendered PNG or SVG of a chart returned as a spec, cacheable by ETag"""
+    if fmt not in CHART_FORMATS:
+        raise HTTPException(
+            status_code=404, detail=f"Unsupported format: {fmt}. Use png or svg"
+        )
+    try:
+        chart = load_chart(chart_id, services.charts)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown chart: {chart_id}")
+
+    headers = {
+        "ETag": f'"{chart_digest(chart, fmt)}"',
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+    }
+    if if_none_match and headers["ETag"] in [
+        tag.strip() for tag in if_none_match.split(",")
+    ]:
+        return Response(status_code=304, headers=headers)
+
+    image = await get_chart_renderer().arender(chart, fmt)
+    return Response(content=image, media_type=CHART_FORMATS[fmt], headers=headers)
@@ -0,0 +1,133 @@
+import asyncio
+from contextlib import suppress
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.db import get_async_session_factory
+from src.app.dependencies import ServiceContainer, get_services
+from src.app.llm import LiteLLMKit
+from src.app.schemas.llm import ChatRequest, Message
+from src.app.services.customer_service import aload_customer_discovery
+from src.app.services.expansion_service import aload_market_expansion
+from src.app.services.market_service import aload_market_analysis
+from src.app.services.memory_service import ConversationMemory, llm_summarizer
+from src.app.services.retrieval_service import (
+    ReportIndex,
+    chat_system_prompt,
+    report_summary,
+)
+
+router = APIRouter(prefix="/chat", tags=["chat"])
+
+
+async def load_chat_reports(
+    db: AsyncSession, domain: str, query: Optional[str] = None
+) -> Dict[str, Any]:
+    """Stored reports of a domain; the market analysis is looked up by query, or the domain"""
+    query = query or domain
+    reports: Dict[str, Any] = {"domain": domain}
+    reports["customer_discovery"] = await aload_customer_discovery(db, domain)
+    reports["market_analysis"] = await aload_market_analysis(db, query)
+    reports["market_expansion"] = await aload_market_expansion(db, domain, query)
+    return reports
+
+
+async def stream_reply(
+    websocket: WebSocket,
+    llm: LiteLLMKit,
+    memory: ConversationMemory,
+    question: str,
+    messages: List[Message],
+):
+    """Send a reply token by token, then the full text, and remember the exchange"""
+    parts = []
+    try:
+        async for text in llm.astream(ChatRequest(messages=messages)):
+            parts.append(text)
+            await websocket.send_json({"type": "token", "content": text})
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        return
+    answer = "".join(parts)
+    memory.add_exchange(question, answer)
+    await websocket.send_json({"type": "done", "content": answer})
+
+
+@router.websocket("/ws")
+async def chat_websocket(
+    websocket: WebSocket,
+    domain: str,
+    query: Optional[str] = None,
+    services: ServiceContainer = Depends(get_services),
+):
+    """
+    Chat over the stored reports of a domain.
+
+    The client sends {"type": "message", "content": "..."} and receives
+    {"type": "token"} messages followed by {"type": "done"} with the full
+    reply. A new message, or {"type": "cancel"}, cancels the reply still
+    being streamed, which is acknowledged with {"type": "cancelled"}.
+    """
+    await websocket.accept()
+
+    async with get_async_session_factory()() as db:
+        reports = await load_chat_reports(db, domain, query)
+    if not any(reports[name] for name in ("customer_discovery", "market_analysis")):
+        await websocket.send_json(
+            {"type": "error", "detail": f"No stored reports for domain: {domain}"}
+        )
+        await websocket.close(code=1008)
+        return
+
+    index = ReportIndex.from_reports(reports)
+    summary = report_summary(reports)
+    llm = LiteLLMKit(
+        model_name="gpt-4o",
+        temperature=0.7,
+        api_key_manager=services.api_key_manager,
+        completion_handler=services.completion_handler,
+    )
+    memory = ConversationMemory(
+        llm_summarizer(
+            LiteLLMKit(
+                model_name="gpt-4o-mini",
+                temperature=0.3,
+                api_key_manager=services.api_key_manager,
+                completion_handler=services.completion_handler,
+            )
+        )
+    )
+
+    reply: Optional[asyncio.Task] = None
+    try:
+        while True:
+            message = await websocket.receive_json()
+
+            if reply is not None and not reply.done():
+                reply.cancel()
+                with suppress(asyncio.CancelledError):
+                    await reply
+                await websocket.send_json({"type": "cancelled"})
+            if message.get("type") == "cancel":
+                continue
+
+            content = (message.get("content") or "").strip()
+            if not content:
+                await websocket.send_json({"type": "error", "detail": "Empty message"})
+                continue
+
+            messages = memory.messages(
+                chat_system_prompt(index, summary, content), content
+            )
+            reply = asyncio.create_task(
+                stream_reply(websocket, llm, memory, content, messages)
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if reply is not None:
+            reply.cancel()
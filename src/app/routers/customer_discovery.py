@@ -1,11 +1,42 @@
-from typing import List, Dict, Any
-from pydantic import BaseModel
+import asyncio
+from typing import List, Dict, Any, Optional, Union
+from pydantic import BaseModel, Field
 from src.app.llm import LiteLLMKit
-from src.app.jina import JinaReader
-from src.app.exa import ExaAPI
 from src.app.config import get_settings
+from src.app.db import get_async_db, get_async_session_factory
+from src.app.dependencies import ServiceContainer, get_service_container, get_services
 from src.app.schemas.llm import ChatRequest, Message
-from fastapi import APIRouter
+from src.app.services.blob_service import TextRef
+from src.app.services.admission_service import (
+    AdmissionController,
+    get_admission_controller,
+)
+from src.app.services.checkpoint_service import (
+    RUN_ID_PATTERN,
+    CheckpointStore,
+    NullCheckpointStore,
+)
+from src.app.services.job_service import (
+    IdempotencyConflictError,
+    InFlightRuns,
+    get_inflight_runs,
+)
+from src.app.utils.background import ProgressCallback
+from src.app.utils.responses import ReportView, accepted_response, report_response
+from src.app.services.customer_service import (
+    aload_customer_discovery,
+    asave_customer_discovery,
+)
+from src.app.budget import (
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+    is_partial,
+    run_within_budget,
+    within_budget,
+)
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 
 class CustomerNiche(BaseModel):
@@ -14,7 +45,8 @@ class CustomerNiche(BaseModel):
     name: str
     description: str
     search_query: str
-    search_results: List[str]
+    # Raw texts of older reports and checkpoints are moved to the blob store on save
+    search_results: List[Union[TextRef, str]]
     market_size: int = 0
     growth_potential: float = 0.0
     key_characteristics: List[str] = []
@@ -28,6 +60,18 @@ class CustomerDiscoveryReport(BaseModel):
     niches: List[CustomerNiche]
     ideal_customer_profile: Dict[str, Any]
     investor_sentiment: Dict[str, Any]
+    partial: bool = Field(
+        False, description="True when work was skipped to meet the budget or deadline"
+    )
+
+
+CUSTOMER_DISCOVERY_VIEWS = {
+    ReportView.SUMMARY: {
+        "niches": {"__all__": {"description", "search_query", "search_results"}}
+    },
+    ReportView.STANDARD: {"niches": {"__all__": {"search_results"}}},
+    ReportView.FULL: None,
+}
 
 
 class IdentifyMarketNiche(BaseModel):
@@ -38,13 +82,32 @@ class CustomerDiscoverer:
     """Advanced customer discovery and market segmentation tool"""
 
     def __init__(
-        self, domain: str, llm_model: str = "gpt-4o", temperature: float = 0.7
+        self,
+        domain: str,
+        llm_model: str = "gpt-4o",
+        temperature: float = 0.7,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[RunBudget] = None,
+        services: Optional[ServiceContainer] = None,
+        on_progress: Optional[ProgressCallback] = None,
     ):
         """Initialize Customer Discoverer with LLM and external search APIs"""
         self.settings = get_settings()
-        self.llm = LiteLLMKit(model_name=llm_model, temperature=temperature)
-        self.jina = JinaReader(self.settings.JINA_API_KEY)
-        self.exa = ExaAPI(self.settings.EXA_API_KEY)
+        self.checkpoint = checkpoint or NullCheckpointStore()
+        self.budget = budget
+        self.on_progress = on_progress
+        services = services or get_service_container()
+        self.llm = LiteLLMKit(
+            model_name=llm_model,
+            temperature=temperature,
+            budget=budget,
+            api_key_manager=services.api_key_manager,
+            completion_handler=services.completion_handler,
+        )
+        self.jina = services.jina
+        self.exa = services.exa
+        self.documents = services.documents
+        self.blobs = services.blobs
 
         self.domain = domain
         self.niches: List[CustomerNiche] = []
@@ -57,7 +120,8 @@ class CustomerDiscoverer:
         Focus on identifying key customer segments, workflows, and market characteristics.
         """
         return self.llm.generate(
-            ChatRequest(messages=[Message(role="user", content=prompt)])
+            ChatRequest(messages=[Message(role="user", content=prompt)]),
+            priority=CallPriority.CRITICAL,
         )
 
     def identify_market_niches(self, high_level_query: str) -> List[str]:
@@ -72,6 +136,7 @@ class CustomerDiscoverer:
                 messages=[Message(role="user", content=prompt)],
             ),
             response_format=IdentifyMarketNiche,
+            priority=CallPriority.CRITICAL,
         )
         niches = IdentifyMarketNiche(**niches_response).niches
         return niches
@@ -89,18 +154,46 @@ class CustomerDiscoverer:
 
     def search_niche_market(self, niche: str, search_query: str) -> CustomerNiche:
         """Perform comprehensive market research for a specific niche"""
-        # Use Exa and Jina for diverse internet search
-        try:
-            search_contents = self.exa.search_and_contents(search_query)
-            search_results = [
-                search_contents.results[i].text
-                for i in range(len(search_contents.results))
-            ]
-            search_results_str = " \n".join(search_results)
-
-        except Exception as e:
-            print(f"Exa search failed: {e}, falling back to Jina")
-            search_results_str = self.jina.search(search_query)
+        # Previously fetched documents answer the query when they are fresh enough
+        local_results = self.documents.recall(search_query)
+        if local_results is not None:
+            search_results_str = " \n".join(local_results)
+        else:
+            # Use Exa and Jina for diverse internet search
+            try:
+                search_contents = self.exa.search_and_contents(search_query)
+                self.documents.store(
+                    search_query,
+                    [
+                        {
+                            "url": result.url,
+                            "title": result.title,
+                            "content": result.text,
+                        }
+                        for result in search_contents.results
+                    ],
+                    source="exa",
+                )
+                search_results = [
+                    search_contents.results[i].text
+                    for i in range(len(search_contents.results))
+                ]
+                search_results_str = " \n".join(search_results)
+
+            except Exception as e:
+                print(f"Exa search failed: {e}, falling back to Jina")
+                search_results_str = self.jina.search(search_query)
+                self.documents.store(
+                    search_query,
+                    [
+                        {
+                            "url": self.jina.base_search_url + search_query,
+                            "title": search_query,
+                            "content": search_results_str,
+                        }
+                    ],
+                    source="jina",
+                )
 
         # Analyze search results
         analysis_prompt = f"""
@@ -124,9 +217,15 @@ class CustomerDiscoverer:
             name=niche,
             description=niche_analysis,
             search_query=search_query,
-            search_results=[search_results_str],
+            search_results=self.blobs.refs([search_results_str]),
         )
 
+    def research_niche(self, niche: str) -> CustomerNiche:
+        """Generate a search query for a niche and research it"""
+        search_query = self.generate_niche_search_query(niche)
+        print(f"Search query for '{niche}': {search_query}")
+        return self.search_niche_market(niche, search_query)
+
     def search_market_for_year(self, year: int) -> Dict[str, Any]:
         """Perform targeted market search for a specific year"""
         market_year_query = f"""
@@ -150,6 +249,7 @@ class CustomerDiscoverer:
         except Exception as e:
             print(f"Exa search failed for {year}: {e}, falling back to Jina")
             search_results_str = self.jina.search(market_year_query)
+            search_results = [search_results_str]
 
         # Analyze and structure the search results
         analysis_prompt = f"""
@@ -174,7 +274,9 @@ class CustomerDiscoverer:
         return {
             "year": year,
             "analysis": year_analysis,
-            "raw_search_results": search_results,
+            "raw_search_results": [
+                ref.model_dump() for ref in self.blobs.refs(search_results)
+            ],
         }
 
     def compile_comprehensive_report(self):
@@ -185,10 +287,21 @@ class CustomerDiscoverer:
         Research investor sentiment and future outlook for the {self.domain} domain.
         Include perspectives from top consulting firms like McKinsey, BCG, and Bain.
         """
-        investor_insights = self.llm.generate(
-            ChatRequest(
-                messages=[Message(role="user", content=investor_sentiment_query)]
-            )
+        investor_insights = run_within_budget(
+            self.budget,
+            "customer discovery: investor sentiment",
+            lambda: self.checkpoint.cached(
+                "investor_sentiment",
+                lambda: self.llm.generate(
+                    ChatRequest(
+                        messages=[
+                            Message(role="user", content=investor_sentiment_query)
+                        ]
+                    ),
+                    priority=CallPriority.OPTIONAL,
+                ),
+            ),
+            default="",
         )
 
         print("Investor insights:", investor_insights)
@@ -205,10 +318,21 @@ class CustomerDiscoverer:
         5. Technology adoption levels
         6. Decision-making process
         """
-        ideal_customer_insights = self.llm.generate(
-            ChatRequest(
-                messages=[Message(role="user", content=ideal_customer_profile_query)]
-            )
+        ideal_customer_insights = run_within_budget(
+            self.budget,
+            "customer discovery: ideal customer profile",
+            lambda: self.checkpoint.cached(
+                "ideal_customer_profile",
+                lambda: self.llm.generate(
+                    ChatRequest(
+                        messages=[
+                            Message(role="user", content=ideal_customer_profile_query)
+                        ]
+                    ),
+                    priority=CallPriority.HIGH,
+                ),
+            ),
+            default="",
         )
 
         print("Ideal customer profile:", ideal_customer_insights)
@@ -219,22 +343,47 @@ class CustomerDiscoverer:
             niches=self.niches,
             investor_sentiment={"insights": investor_insights},
             ideal_customer_profile={"insights": ideal_customer_insights},
+            partial=is_partial(self.budget, "customer discovery"),
         )
 
     def discover(self):
         """Execute full customer discovery workflow"""
         print(f"Initiating customer discovery for domain: {self.domain}...")
-        high_level_query = self.generate_high_level_query()
-        print(f"High-level query: {high_level_query}")
-        niches = self.identify_market_niches(high_level_query)
+
+        def find_niches() -> List[str]:
+            high_level_query = self.checkpoint.cached(
+                "high_level_query", self.generate_high_level_query
+            )
+            print(f"High-level query: {high_level_query}")
+            return self.checkpoint.cached(
+                "niches", lambda: self.identify_market_niches(high_level_query)
+            )
+
+        # A run out of budget before any niche is known still gets its report
+        niches = run_within_budget(
+            self.budget, "customer discovery: niches", find_niches, default=[]
+        )
         print(f"Identified niches: {niches}")
 
-        for niche in niches[:10]:  # Limit to 10 niches
-            search_query = self.generate_niche_search_query(niche)
-            print(f"Search query for '{niche}': {search_query}")
-            niche_details = self.search_niche_market(niche, search_query)
+        # Limit to 10 niches, fewer when the run budget is running low
+        niches = within_budget(self.budget, niches[:10], "customer discovery niche")
+
+        for niche in niches:
+            niche_details = run_within_budget(
+                self.budget,
+                f"customer discovery niche: {niche}",
+                lambda: self.checkpoint.cached(
+                    f"niche/{niche}",
+                    lambda: self.research_niche(niche),
+                    model=CustomerNiche,
+                ),
+            )
+            if niche_details is None:
+                continue
             print(f"Details for '{niche}': {niche_details}")
             self.niches.append(niche_details)
+            if self.on_progress:
+                self.on_progress("niche", niche_details)
 
         print("Compiling comprehensive report...")
 
@@ -246,7 +395,76 @@ router = APIRouter(prefix="/customer-discovery", tags=["customer_discovery"])
 
 
 @router.post("/discover")
-def customer_discovery_endpoint(domain: str):
+async def customer_discovery_endpoint(
+    domain: str,
+    run_id: Optional[str] = Query(
+        None, pattern=RUN_ID_PATTERN, description="Checkpoint under this id and resume"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which a partial report is returned"
+    ),
+    refresh: bool = Query(False, description="Ignore a previously stored report"),
+    view: ReportView = Query(
+        ReportView.FULL, description="summary, standard (no raw sources) or full"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated top-level fields, overrides view"
+    ),
+    wait: bool = Query(
+        True, description="Wait for the report instead of returning its job id"
+    ),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
+    services: ServiceContainer = Depends(get_services),
+    admission: AdmissionController = Depends(get_admission_controller),
+    runs: InFlightRuns = Depends(get_inflight_runs),
+):
     """FastAPI endpoint for customer discovery"""
-    discoverer = CustomerDiscoverer(domain)
-    return discoverer.discover()
+    if not refresh:
+        stored_report = await aload_customer_discovery(db, domain)
+        if stored_report is not None:
+            return report_response(stored_report, view, fields, CUSTOMER_DISCOVERY_VIEWS)
+
+    checkpoint = CheckpointStore(run_id).scoped("customer_discovery") if run_id else None
+    budget = default_run_budget(deadline_seconds=deadline)
+
+    def start():
+        # Claim a slot or a queue place before scheduling anything, so a caller
+        # over capacity gets 429 even when it does not wait for the report
+        ticket = admission.reserve()
+
+        async def run():
+            async with ticket:
+                discoverer = CustomerDiscoverer(
+                    domain, checkpoint=checkpoint, budget=budget, services=services
+                )
+                # Discovery blocks, so it runs off the event loop
+                report = await asyncio.to_thread(discoverer.discover)
+            # The run outlives the request when the caller does not wait for it
+            async with get_async_session_factory()() as session:
+                await asave_customer_discovery(session, report)
+            return report
+
+        task = asyncio.create_task(run())
+        # A run cancelled before it enters the ticket still gives its claim back
+        task.add_done_callback(lambda _: ticket.discard())
+        return task
+
+    try:
+        job, joined = runs.join_or_start(
+            "customer_discovery",
+            start,
+            domain,
+            options={"deadline": deadline, "run_id": run_id},
+            refresh=refresh,
+            idempotency_key=idempotency_key,
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not wait:
+        return accepted_response(job.info(), job.headers(joined))
+
+    report = await job.wait()
+    response = report_response(report, view, fields, CUSTOMER_DISCOVERY_VIEWS)
+    response.headers.update(job.headers(joined))
+    return response
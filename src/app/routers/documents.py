@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from src.app.services.document_service import DocumentStoreStats, get_document_store
+
+router = APIRouter(prefix="/documents", tags=["documents"])
+
+
+@router.get("/stats", response_model=DocumentStoreStats)
+def document_store_stats():
+    """Hit rate of the local document store and external searches it avoided"""
+    return get_document_store().stats()
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel
+
+from src.app.services.job_service import (
+    InFlightRuns,
+    JobInfo,
+    JobStatus,
+    RunJob,
+    get_inflight_runs,
+)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _get_job(job_id: str, runs: InFlightRuns) -> RunJob:
+    job = runs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired job: {job_id}")
+    return job
+
+
+@router.get("/{job_id}", response_model=JobInfo)
+def get_job(job_id: str, runs: InFlightRuns = Depends(get_inflight_runs)):
+    """Status of an analysis run started with wait=false or joined by a duplicate"""
+    return _get_job(job_id, runs).info()
+
+
+@router.get("/{job_id}/result")
+def get_job_result(job_id: str, runs: InFlightRuns = Depends(get_inflight_runs)):
+    """Report produced by a finished run"""
+    job = _get_job(job_id, runs)
+    info = job.info()
+    if info.status == JobStatus.RUNNING:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is still running")
+    if info.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=f"Job {job_id} failed: {info.error}")
+
+    result = job.task.result()
+    if isinstance(result, BaseModel):
+        return Response(content=result.model_dump_json(), media_type="application/json")
+    return result
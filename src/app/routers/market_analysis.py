@@ -1,23 +1,55 @@
 import asyncio
-import matplotlib.pyplot as plt
-import io
 import base64
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel, Field
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.app.llm import LiteLLMKit
-from src.app.jina import JinaReader
-from src.app.exa import ExaAPI
 from src.app.schemas.llm import ChatRequest, Message
-from src.app.config import get_settings
+from src.app.db import get_async_db, get_async_session_factory
+from src.app.dependencies import ServiceContainer, get_service_container, get_services
+from src.app.services.admission_service import (
+    AdmissionController,
+    get_admission_controller,
+)
+from src.app.services.chart_service import chart_spec, get_chart_renderer, trend_chart
+from src.app.services.checkpoint_service import (
+    RUN_ID_PATTERN,
+    CheckpointStore,
+    NullCheckpointStore,
+)
+from src.app.services.job_service import (
+    IdempotencyConflictError,
+    InFlightRuns,
+    get_inflight_runs,
+)
+from src.app.services.market_service import aload_market_analysis, asave_market_analysis
+from src.app.budget import (
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+    is_partial,
+    run_within_budget,
+    within_budget,
+)
+from src.app.utils.background import ProgressCallback
+from src.app.utils.responses import (
+    ChartFormat,
+    ReportView,
+    accepted_response,
+    report_response,
+)
 from src.app.schemas.visualization import (
+    TrendChartResponse,
     TrendVisualizationResponse,
     DetailedTrendVisualization,
 )
 
 router = APIRouter(prefix="/market-analysis", tags=["market_analysis"])
 
+TREND_CHART_TITLE = "Market Trend Analysis"
+
 
 class ProblemBreakdown(BaseModel):
     """Represents a breakdown of a complex problem into sub-problems"""
@@ -54,14 +86,53 @@ class MarketAnalysisReport(BaseModel):
     problem_breakdown: ProblemBreakdown
     search_results: Dict[str, Dict[str, Any]]
     comprehensive_report: str
+    partial: bool = Field(
+        False, description="True when work was skipped to meet the budget or deadline"
+    )
+
+
+# Raw search references and yearly source lists dominate the payload size
+MARKET_ANALYSIS_VIEWS = {
+    ReportView.SUMMARY: {"search_results": True},
+    ReportView.STANDARD: {
+        "search_results": {
+            "__all__": {
+                "search_results": True,
+                "yearly_insights": {"__all__": {"raw_search_results"}},
+            }
+        }
+    },
+    ReportView.FULL: None,
+}
 
 
 class MarketAnalyzer:
-    def __init__(self, llm_model: str = "gpt-4o", temperature: float = 0.7):
+    def __init__(
+        self,
+        llm_model: str = "gpt-4o",
+        temperature: float = 0.7,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[RunBudget] = None,
+        services: Optional[ServiceContainer] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
         """Initialize Market Analyzer with LLM and external search APIs"""
-        self.llm = LiteLLMKit(model_name=llm_model, temperature=temperature)
-        self.jina = JinaReader(get_settings().JINA_API_KEY)
-        self.exa = ExaAPI(get_settings().EXA_API_KEY)
+        self.checkpoint = checkpoint or NullCheckpointStore()
+        self.budget = budget
+        self.on_progress = on_progress
+        services = services or get_service_container()
+        self.llm = LiteLLMKit(
+            model_name=llm_model,
+            temperature=temperature,
+            budget=budget,
+            api_key_manager=services.api_key_manager,
+            completion_handler=services.completion_handler,
+        )
+        self.jina = services.jina
+        self.exa = services.exa
+        self.documents = services.documents
+        self.blobs = services.blobs
+        self.charts = services.charts
 
         self.original_query: str = ""
         self.questions: List[str] = []
@@ -87,7 +158,20 @@ class MarketAnalyzer:
         ]
 
         request = ChatRequest(messages=messages)
-        breakdown = self.llm.generate(request, response_format=ProblemBreakdown)
+        # A run out of budget before the breakdown still gets its (empty) report
+        breakdown = run_within_budget(
+            self.budget,
+            "market analysis: breakdown",
+            lambda: self.checkpoint.cached(
+                "breakdown",
+                lambda: self.llm.generate(
+                    request,
+                    response_format=ProblemBreakdown,
+                    priority=CallPriority.CRITICAL,
+                ),
+            ),
+            default={"questions": []},
+        )
 
         breakdown = ProblemBreakdown(**breakdown)
 
@@ -116,16 +200,41 @@ class MarketAnalyzer:
 
     def search_internet(self, search_query: str, fallback: bool = True) -> List[str]:
         """Search internet with fallback mechanism"""
+        # Previously fetched documents answer the query when they are fresh enough
+        local_results = self.documents.recall(search_query)
+        if local_results is not None:
+            return local_results
+
         try:
             # Try Exa first
             exa_results = self.exa.search_and_contents(search_query)
+            self.documents.store(
+                search_query,
+                [
+                    {"url": result.url, "title": result.title, "content": result.text}
+                    for result in exa_results.results
+                ],
+                source="exa",
+            )
             return [result.text for result in exa_results.results]
 
         except Exception as e:
             if fallback:
                 try:
                     # Fallback to Jina
-                    return [self.jina.search(search_query)]
+                    jina_results = self.jina.search(search_query)
+                    self.documents.store(
+                        search_query,
+                        [
+                            {
+                                "url": self.jina.base_search_url + search_query,
+                                "title": search_query,
+                                "content": jina_results,
+                            }
+                        ],
+                        source="jina",
+                    )
+                    return [jina_results]
                 except Exception:
                     return []
             return []
@@ -173,6 +282,7 @@ class MarketAnalyzer:
         except Exception as e:
             print(f"Exa search failed for {year}: {e}, falling back to Jina")
             search_results_str = self.jina.search(market_year_query)
+            search_results = [search_results_str]
 
         # Analyze and structure the search results
         analysis_prompt = f"""
@@ -198,7 +308,7 @@ class MarketAnalyzer:
             "year": year,
             "question": question,
             "analysis": year_analysis,
-            "raw_search_results": search_results,
+            "raw_search_results": self.text_refs(search_results),
         }
 
     def perform_analysis(self):
@@ -207,9 +317,27 @@ class MarketAnalyzer:
 
         # Year-by-year analysis for the original query (first question)
         if self.questions:
-            original_query_insights = [
-                self.search_market_for_year(year, self.original_query) for year in years
-            ]
+            # The most recent years are the most valuable, so they run first and
+            # are the ones kept when the budget or deadline is running low
+            years = within_budget(self.budget, years[::-1], "market analysis year")
+            original_query_insights = []
+            for year in years:
+                year_insight = run_within_budget(
+                    self.budget,
+                    f"market analysis year: {year}",
+                    lambda: self.checkpoint.cached(
+                        f"year/{year}",
+                        lambda: self.search_market_for_year(year, self.original_query),
+                    ),
+                )
+                if year_insight is not None:
+                    year_insight["raw_search_results"] = self.text_refs(
+                        year_insight.get("raw_search_results", [])
+                    )
+                    original_query_insights.append(year_insight)
+                    if self.on_progress:
+                        self.on_progress("year", year_insight)
+            original_query_insights.sort(key=lambda insight: insight["year"])
 
             print(f"Yearly insights for original query: {original_query_insights}")
 
@@ -222,47 +350,88 @@ class MarketAnalyzer:
                 insight["analysis"] for insight in original_query_insights
             ]
 
-            original_query_report = self.llm.generate(
-                ChatRequest(
-                    messages=[
-                        Message(
-                            role="user",
-                            content=f"""
-                        Synthesize the year-by-year market insights for the original query: '{self.original_query}'.
-                        Create a comprehensive analysis that:
-                        1. Identifies overarching trends
-                        2. Highlights key inflection points
-                        3. Provides predictive insights
-                        4. Suggests strategic recommendations
-                        """,
-                        ),
-                        Message(role="system", content=str(original_query_analysis)),
-                    ]
-                )
+            original_query_report = run_within_budget(
+                self.budget,
+                "market analysis: original query report",
+                lambda: self.checkpoint.cached(
+                    "original_query_report",
+                    lambda: self.synthesize_yearly_insights(original_query_analysis),
+                ),
+                default="\n\n".join(original_query_analysis),
             )
 
             self.reports[self.original_query] = original_query_report
 
         # Standard internet research for remaining questions
-        remaining_questions = self.questions[0:5]  # Limit to prevent excessive AI calls
+        remaining_questions = within_budget(
+            self.budget, self.questions[0:5], "market analysis question"
+        )  # Limit to prevent excessive AI calls
         for question in remaining_questions:
-            # Generate search query
-            search_query = self.generate_search_query(question)
-
-            # Perform internet search
-            search_results = self.search_internet(search_query)
-
-            # Analyze search results
-            question_analysis = self.analyze_search_results(question, search_results)
+            question_result = run_within_budget(
+                self.budget,
+                f"market analysis question: {question}",
+                lambda: self.checkpoint.cached(
+                    f"question/{question}", lambda: self.research_question(question)
+                ),
+            )
+            if question_result is None:
+                continue
 
             # Store results
             self.search_results[question] = {
-                "search_query": search_query,
-                "search_results": search_results,
+                "search_query": question_result["search_query"],
+                "search_results": self.text_refs(question_result["search_results"]),
             }
-            self.reports[question] = question_analysis
+            self.reports[question] = question_result["analysis"]
 
             print(f"Processed question: {question}")
+            if self.on_progress:
+                self.on_progress(
+                    "question", {"question": question, "analysis": self.reports[question]}
+                )
+
+    def synthesize_yearly_insights(self, yearly_analyses: List[str]) -> str:
+        """Combine the year-by-year analyses of the original query into one report"""
+        return self.llm.generate(
+            ChatRequest(
+                messages=[
+                    Message(
+                        role="user",
+                        content=f"""
+                        Synthesize the year-by-year market insights for the original query: '{self.original_query}'.
+                        Create a comprehensive analysis that:
+                        1. Identifies overarching trends
+                        2. Highlights key inflection points
+                        3. Provides predictive insights
+                        4. Suggests strategic recommendations
+                        """,
+                    ),
+                    Message(role="system", content=str(yearly_analyses)),
+                ]
+            ),
+            priority=CallPriority.HIGH,
+        )
+
+    def research_question(self, question: str) -> Dict[str, Any]:
+        """Search the internet for a sub-question and analyze what was found"""
+        # Generate search query
+        search_query = self.generate_search_query(question)
+
+        # Perform internet search
+        search_results = self.search_internet(search_query)
+
+        # Analyze search results
+        question_analysis = self.analyze_search_results(question, search_results)
+
+        return {
+            "search_query": search_query,
+            "search_results": self.text_refs(search_results),
+            "analysis": question_analysis,
+        }
+
+    def text_refs(self, texts: List[Any]) -> List[Dict[str, Any]]:
+        """Move raw search texts into the blob store, keeping hashes and excerpts"""
+        return [ref.model_dump() for ref in self.blobs.refs(texts)]
 
     async def generate_trend_visualization(self) -> MarketTrendVisualization:
         """Generate comprehensive trend visualization and analysis using async processing"""
@@ -359,33 +528,25 @@ class MarketAnalyzer:
         Returns:
             Optional[str]: Visualization in specified format
         """
-        plt.figure(figsize=(12, 6))
-
-        # Plot each trend line
-        for i, y_label in enumerate(trend_data.y_axis_labels):
-            plt.plot(
-                trend_data.x_axis_labels, trend_data.data[i], label=y_label, marker="o"
-            )
-
-        plt.title(f"Market Trend Analysis: {trend_data.y_axis_name}")
-        plt.xlabel(trend_data.x_axis_name)
-        plt.ylabel(trend_data.y_axis_name)
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-
-        # Save plot to a base64 encoded image
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format="png")
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        plt.close()
+        # Rendered off-thread with the Figure API and cached by the trend data
+        image = get_chart_renderer().render(
+            trend_chart(TREND_CHART_TITLE, trend_data)
+        )
+        image_base64 = base64.b64encode(image).decode("utf-8")
         return {
             "img": image_base64,
             "reason": trend_data.reasoning,
             "insights": trend_data.key_insights,
         }
 
+    def trend_chart_spec(self, trend_data: MarketTrendVisualization) -> TrendChartResponse:
+        """Trend data as a chart spec for the client to render"""
+        return TrendChartResponse(
+            chart=chart_spec(trend_chart(TREND_CHART_TITLE, trend_data), self.charts),
+            reason=trend_data.reasoning,
+            insights=trend_data.key_insights,
+        )
+
     def compile_comprehensive_report(self):
         """Compile individual reports into a comprehensive market analysis"""
         messages = [
@@ -404,10 +565,28 @@ class MarketAnalyzer:
         ]
 
         request = ChatRequest(messages=messages)
-        self.comprehensive_report = self.llm.generate(request)
+        # Past the deadline, the individual reports are the best available answer
+        self.comprehensive_report = run_within_budget(
+            self.budget,
+            "market analysis: comprehensive report",
+            lambda: self.checkpoint.cached(
+                "comprehensive_report",
+                lambda: self.llm.generate(request, priority=CallPriority.CRITICAL),
+            ),
+            default="\n\n".join(
+                f"{question}\n{report}" for question, report in self.reports.items()
+            ),
+        )
 
         return self.comprehensive_report
 
+    def analyze(self, query: str) -> MarketAnalysisReport:
+        """Run the whole analysis for a query and return its report"""
+        self.breakdown_problem(query)
+        self.perform_analysis()
+        self.compile_comprehensive_report()
+        return self.get_report()
+
     def get_report(self) -> MarketAnalysisReport:
         """Retrieve the complete market analysis report"""
         return MarketAnalysisReport(
@@ -415,27 +594,106 @@ class MarketAnalyzer:
             problem_breakdown=ProblemBreakdown(questions=self.questions),
             search_results=self.search_results,
             comprehensive_report=self.comprehensive_report,
+            partial=is_partial(self.budget, "market analysis"),
         )
 
 
 @router.post("/analyze")
-async def market_analysis(query: str):
+async def market_analysis(
+    query: str,
+    run_id: Optional[str] = Query(
+        None, pattern=RUN_ID_PATTERN, description="Checkpoint under this id and resume"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which a partial report is returned"
+    ),
+    refresh: bool = Query(False, description="Ignore a previously stored report"),
+    view: ReportView = Query(
+        ReportView.FULL, description="summary, standard (no raw sources) or full"
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated top-level fields, overrides view"
+    ),
+    wait: bool = Query(
+        True, description="Wait for the report instead of returning its job id"
+    ),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: AsyncSession = Depends(get_async_db),
+    services: ServiceContainer = Depends(get_services),
+    admission: AdmissionController = Depends(get_admission_controller),
+    runs: InFlightRuns = Depends(get_inflight_runs),
+):
     """Endpoint for market analysis"""
-    analyzer = MarketAnalyzer()
-    analyzer.breakdown_problem(query)
-    analyzer.perform_analysis()
-    analyzer.compile_comprehensive_report()
+    if not refresh:
+        stored_report = await aload_market_analysis(db, query)
+        if stored_report is not None:
+            return report_response(stored_report, view, fields, MARKET_ANALYSIS_VIEWS)
+
+    checkpoint = CheckpointStore(run_id).scoped("market_analysis") if run_id else None
+    budget = default_run_budget(deadline_seconds=deadline)
+
+    def start():
+        # Claim a slot or a queue place before scheduling anything, so a caller
+        # over capacity gets 429 even when it does not wait for the report
+        ticket = admission.reserve()
+
+        async def run():
+            async with ticket:
+                analyzer = MarketAnalyzer(
+                    checkpoint=checkpoint, budget=budget, services=services
+                )
+                # The analysis blocks, so it runs off the event loop
+                report = await asyncio.to_thread(analyzer.analyze, query)
+            # The run outlives the request when the caller does not wait for it
+            async with get_async_session_factory()() as session:
+                await asave_market_analysis(session, report)
+            return report
+
+        task = asyncio.create_task(run())
+        # A run cancelled before it enters the ticket still gives its claim back
+        task.add_done_callback(lambda _: ticket.discard())
+        return task
+
+    try:
+        job, joined = runs.join_or_start(
+            "market_analysis",
+            start,
+            query,
+            options={"deadline": deadline, "run_id": run_id},
+            refresh=refresh,
+            idempotency_key=idempotency_key,
+        )
+    except IdempotencyConflictError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not wait:
+        return accepted_response(job.info(), job.headers(joined))
 
-    return analyzer.get_report()
+    report = await job.wait()
+    response = report_response(report, view, fields, MARKET_ANALYSIS_VIEWS)
+    response.headers.update(job.headers(joined))
+    return response
 
 
-@router.post("/visualize-trend", response_model=TrendVisualizationResponse)
-async def visualize_market_trend(query: str):
+@router.post(
+    "/visualize-trend",
+    response_model=Union[TrendVisualizationResponse, TrendChartResponse],
+)
+async def visualize_market_trend(
+    query: str,
+    format: ChartFormat = Query(
+        ChartFormat.IMAGE,
+        description="image: embedded base64 PNG; spec: chart spec for client rendering",
+    ),
+    services: ServiceContainer = Depends(get_services),
+):
     """Endpoint for market trend visualization"""
-    analyzer = MarketAnalyzer()
+    analyzer = MarketAnalyzer(services=services)
     analyzer.breakdown_problem(query)
     trend_data = await analyzer.generate_trend_visualization()
 
-    visualization = analyzer.visualize_trend(trend_data)
+    if format == ChartFormat.SPEC:
+        return analyzer.trend_chart_spec(trend_data)
+
+    visualization = await asyncio.to_thread(analyzer.visualize_trend, trend_data)
 
     return visualization
@@ -1,15 +1,35 @@
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
 
 from pydantic import BaseModel, Field
 
 from app.routers.customer_discovery import CustomerDiscoverer, CustomerDiscoveryReport
 from app.routers.market_analysis import MarketAnalyzer, MarketAnalysisReport
-from app.llm import LiteLLMKit
-from app.schemas.llm import ChatRequest, Message
-from app.exa import ExaAPI
-from app.jina import JinaReader
-from app.config import get_settings
+from src.app.llm import LiteLLMKit
+from src.app.schemas.llm import ChatRequest, Message
+from src.app.config import get_settings
+from src.app.services.checkpoint_service import (
+    RUN_ID_PATTERN,
+    CheckpointStore,
+    NullCheckpointStore,
+)
+# Imported through the same root as main so the models share one declarative
+# Base and every router shares one service container
+from src.app.db import get_db
+from src.app.dependencies import ServiceContainer, get_service_container, get_services
+from src.app.services.expansion_service import (
+    load_market_expansion,
+    save_market_expansion,
+)
+from src.app.budget import (
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+    is_partial,
+    run_within_budget,
+    within_budget,
+)
 
 router = APIRouter(prefix="/market-expansion", tags=["market_expansion"])
 
@@ -38,6 +58,9 @@ class MarketExpansionStrategy(BaseModel):
     potential_synergies: List[str] = Field(
         ..., description="Potential synergies between current and expansion domains"
     )
+    partial: bool = Field(
+        False, description="True when work was skipped to meet the budget or deadline"
+    )
 
 
 class MarketExpander:
@@ -49,12 +72,24 @@ class MarketExpander:
         market_analysis_report: MarketAnalysisReport,
         llm_model: str = "gpt-4o",
         temperature: float = 0.7,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[RunBudget] = None,
+        services: Optional[ServiceContainer] = None,
     ):
         """Initialize Market Expander with pre-generated reports"""
         self.settings = get_settings()
-        self.llm = LiteLLMKit(model_name=llm_model, temperature=temperature)
-        self.jina = JinaReader(self.settings.JINA_API_KEY)
-        self.exa = ExaAPI(self.settings.EXA_API_KEY)
+        self.checkpoint = checkpoint or NullCheckpointStore()
+        self.budget = budget
+        services = services or get_service_container()
+        self.llm = LiteLLMKit(
+            model_name=llm_model,
+            temperature=temperature,
+            budget=budget,
+            api_key_manager=services.api_key_manager,
+            completion_handler=services.completion_handler,
+        )
+        self.jina = services.jina
+        self.exa = services.exa
 
         self.primary_domain = customer_discovery_report.primary_domain
         self.customer_discovery_report = customer_discovery_report
@@ -99,7 +134,10 @@ class MarketExpander:
         ]
 
         request = ChatRequest(messages=messages)
-        expansion_domains_response = self.llm.generate(request)
+        expansion_domains_response = self.checkpoint.cached(
+            "expansion_domains",
+            lambda: self.llm.generate(request, priority=CallPriority.HIGH),
+        )
 
         # Parse the response into a list of domains
         expansion_domains = [
@@ -110,6 +148,45 @@ class MarketExpander:
 
         return expansion_domains[:7]  # Limit to top 7 domains
 
+    def analyze_expansion_domain(self, domain: str) -> str:
+        """Search for and analyze the opportunity of expanding into a single domain"""
+        search_query = f"Market expansion opportunities in {domain} related to {self.primary_domain}"
+
+        # Use Exa and Jina for comprehensive search
+        try:
+            search_contents = self.exa.search_and_contents(search_query)
+            search_results = [result.text for result in search_contents.results]
+        except Exception:
+            search_results = [self.jina.search(search_query)]
+
+        search_results_str = " \n".join(search_results)
+
+        # Analyze expansion domain
+        expansion_analysis_prompt = f"""
+        Comprehensively analyze the potential for expanding from {self.primary_domain} into {domain}.
+
+        Provide detailed insights on:
+        1. Strategic Rationale
+        2. Competitive Landscape
+        3. Investment Requirements
+        4. Risk Assessment
+        5. Potential Synergies
+
+        Context from search results:
+        {search_results_str}
+        """
+
+        messages = [
+            Message(
+                role="system",
+                content="You are an expert market expansion strategist.",
+            ),
+            Message(role="user", content=expansion_analysis_prompt),
+        ]
+
+        request = ChatRequest(messages=messages)
+        return self.llm.generate(request)
+
     def analyze_expansion_domains(
         self, expansion_domains: List[str]
     ) -> MarketExpansionStrategy:
@@ -120,45 +197,22 @@ class MarketExpander:
         risk_assessment = {}
         potential_synergies = []
 
-        for domain in expansion_domains:
+        analyzed_domains = within_budget(
+            self.budget, expansion_domains, "market expansion domain"
+        )
+        for domain in analyzed_domains:
             # Perform targeted search and analysis for each domain
             try:
-                search_query = f"Market expansion opportunities in {domain} related to {self.primary_domain}"
-
-                # Use Exa and Jina for comprehensive search
-                try:
-                    search_contents = self.exa.search_and_contents(search_query)
-                    search_results = [result.text for result in search_contents.results]
-                except Exception:
-                    search_results = [self.jina.search(search_query)]
-
-                search_results_str = " \n".join(search_results)
-
-                # Analyze expansion domain
-                expansion_analysis_prompt = f"""
-                Comprehensively analyze the potential for expanding from {self.primary_domain} into {domain}.
-
-                Provide detailed insights on:
-                1. Strategic Rationale
-                2. Competitive Landscape
-                3. Investment Requirements
-                4. Risk Assessment
-                5. Potential Synergies
-
-                Context from search results:
-                {search_results_str}
-                """
-
-                messages = [
-                    Message(
-                        role="system",
-                        content="You are an expert market expansion strategist.",
+                domain_analysis = run_within_budget(
+                    self.budget,
+                    f"market expansion domain: {domain}",
+                    lambda: self.checkpoint.cached(
+                        f"domain/{domain}",
+                        lambda: self.analyze_expansion_domain(domain),
                     ),
-                    Message(role="user", content=expansion_analysis_prompt),
-                ]
-
-                request = ChatRequest(messages=messages)
-                domain_analysis = self.llm.generate(request)
+                )
+                if domain_analysis is None:
+                    continue
 
                 # Parse and structure the analysis
                 strategic_rationale[domain] = domain_analysis
@@ -180,6 +234,7 @@ class MarketExpander:
             investment_requirements=investment_requirements,
             risk_assessment=risk_assessment,
             potential_synergies=potential_synergies,
+            partial=is_partial(self.budget, "market expansion"),
         )
 
         return self.expansion_strategy
@@ -202,11 +257,36 @@ class MarketExpander:
 @router.post("/expand")
 def market_expansion_endpoint(
     customer_discovery_report: CustomerDiscoveryReport, 
-    market_analysis_report: MarketAnalysisReport
+    market_analysis_report: MarketAnalysisReport,
+    run_id: Optional[str] = Query(
+        None, pattern=RUN_ID_PATTERN, description="Checkpoint under this id and resume"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which a partial strategy is returned"
+    ),
+    refresh: bool = Query(False, description="Ignore a previously stored strategy"),
+    db: Session = Depends(get_db),
+    services: ServiceContainer = Depends(get_services),
 ):
     """FastAPI endpoint for market expansion analysis"""
+    if not refresh:
+        stored_strategy = load_market_expansion(
+            db,
+            customer_discovery_report.primary_domain,
+            market_analysis_report.original_query,
+        )
+        if stored_strategy is not None:
+            return stored_strategy
+
+    checkpoint = CheckpointStore(run_id).scoped("market_expansion") if run_id else None
+    budget = default_run_budget(deadline_seconds=deadline)
     expander = MarketExpander(
         customer_discovery_report, 
-        market_analysis_report
+        market_analysis_report,
+        checkpoint=checkpoint,
+        budget=budget,
+        services=services,
     )
-    return expander.expand_market()
+    strategy = expander.expand_market()
+    save_market_expansion(db, strategy, market_analysis_report.original_query)
+    return strategy
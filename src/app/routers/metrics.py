@@ -0,0 +1,14 @@
+from fastapi import APIRouter
+
+from src.app.services.admission_service import (
+    AdmissionMetrics,
+    get_admission_controller,
+)
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/admission", response_model=AdmissionMetrics)
+def admission_metrics():
+    """Running and queued analyses, rejections and recent wait times"""
+    return get_admission_controller().metrics()
@@ -0,0 +1,59 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.app.budget import default_run_budget
+from src.app.dependencies import ServiceContainer, get_services
+from src.app.services.checkpoint_service import RUN_ID_PATTERN
+from src.app.services.admission_service import (
+    AdmissionController,
+    get_admission_controller,
+)
+from src.app.services.pipeline_service import (
+    PipelineOrchestrator,
+    PipelineResult,
+    run_pipeline,
+)
+
+router = APIRouter(prefix="/pipeline", tags=["pipeline"])
+
+
+@router.post("/run", response_model=PipelineResult)
+async def run_pipeline_endpoint(
+    domain: str,
+    targets: Optional[List[str]] = Query(
+        None, description="Stages to produce; dependencies are included automatically"
+    ),
+    run_id: Optional[str] = Query(
+        None,
+        pattern=RUN_ID_PATTERN,
+        description="Checkpoint under this id and resume a previous attempt",
+    ),
+    max_calls: Optional[int] = Query(None, gt=0, description="LLM call budget"),
+    max_tokens: Optional[int] = Query(None, gt=0, description="LLM token budget"),
+    max_cost_usd: Optional[float] = Query(
+        None, gt=0, description="Estimated LLM spend budget in USD"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which partial reports are returned"
+    ),
+    services: ServiceContainer = Depends(get_services),
+    admission: AdmissionController = Depends(get_admission_controller),
+):
+    """Endpoint running the full market intelligence pipeline for a domain"""
+    try:
+        PipelineOrchestrator().resolve(targets)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The caller's limits replace the configured ones, the others still apply
+    budget = default_run_budget(
+        max_calls=max_calls,
+        max_tokens=max_tokens,
+        max_cost_usd=max_cost_usd,
+        deadline_seconds=deadline,
+    )
+
+    async with admission.slot():
+        return await run_pipeline(
+            domain, targets=targets, run_id=run_id, budget=budget, services=services
+        )
@@ -1,18 +1,35 @@
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
-import matplotlib.pyplot as plt
-import io
 import base64
 
 from app.routers.customer_discovery import CustomerDiscoveryReport
 from app.routers.market_analysis import MarketAnalysisReport
 from app.routers.market_expansion import MarketExpansionStrategy
-from app.llm import LiteLLMKit
-from app.schemas.llm import ChatRequest, Message
+from src.app.llm import LiteLLMKit
+from src.app.schemas.llm import ChatRequest, Message
+from src.app.services.checkpoint_service import (
+    RUN_ID_PATTERN,
+    CheckpointStore,
+    NullCheckpointStore,
+)
+from src.app.budget import (
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+    is_partial,
+    run_within_budget,
+)
+# Imported through the same root as main so every router shares one container
+from src.app.dependencies import ServiceContainer, get_service_container, get_services
+from src.app.schemas.visualization import TrendChartResponse
+from src.app.services.chart_service import chart_spec, get_chart_renderer, trend_chart
+from src.app.utils.responses import ChartFormat
 
 router = APIRouter(prefix="/product-evolution", tags=["product_evolution"])
 
+ADOPTION_CHART_TITLE = "User Adoption Trend"
+
 
 class ProductEvolutionPhase(BaseModel):
     """Detailed product evolution phase"""
@@ -50,6 +67,9 @@ class ProductEvolutionStrategy(BaseModel):
     long_term_goals: List[str] = Field(default_factory=list)
     competitive_differentiation: Dict[str, str] = Field(default_factory=dict)
     user_adoption_trend: Optional[UserAdoptionTrend] = None
+    partial: bool = Field(
+        False, description="True when work was skipped to meet the budget or deadline"
+    )
 
 
 class ProductEvolver:
@@ -62,9 +82,22 @@ class ProductEvolver:
         market_expansion: MarketExpansionStrategy,
         llm_model: str = "gpt-4o",
         temperature: float = 0.7,
+        checkpoint: Optional[CheckpointStore] = None,
+        budget: Optional[RunBudget] = None,
+        services: Optional[ServiceContainer] = None,
     ):
         """Initialize Product Evolver with comprehensive market insights"""
-        self.llm = LiteLLMKit(model_name=llm_model, temperature=temperature)
+        self.checkpoint = checkpoint or NullCheckpointStore()
+        self.budget = budget
+        services = services or get_service_container()
+        self.llm = LiteLLMKit(
+            model_name=llm_model,
+            temperature=temperature,
+            budget=budget,
+            api_key_manager=services.api_key_manager,
+            completion_handler=services.completion_handler,
+        )
+        self.charts = services.charts
 
         self.customer_discovery = customer_discovery
         self.market_analysis = market_analysis
@@ -139,8 +172,13 @@ class ProductEvolver:
         ]
 
         request = ChatRequest(messages=messages)
-        evolution_strategy_response = self.llm.generate(
-            request, response_format=ProductEvolutionStrategy
+        evolution_strategy_response = self.checkpoint.cached(
+            "evolution_strategy",
+            lambda: self.llm.generate(
+                request,
+                response_format=ProductEvolutionStrategy,
+                priority=CallPriority.HIGH,
+            ),
         )
 
         self.evolution_strategy = ProductEvolutionStrategy(
@@ -148,9 +186,16 @@ class ProductEvolver:
         )
 
         # Generate user adoption trend visualization
-        self.evolution_strategy.user_adoption_trend = (
-            self._generate_user_adoption_trend()
+        self.evolution_strategy.user_adoption_trend = run_within_budget(
+            self.budget,
+            "product evolution: user adoption trend",
+            lambda: self.checkpoint.cached(
+                "user_adoption_trend",
+                self._generate_user_adoption_trend,
+                model=UserAdoptionTrend,
+            ),
         )
+        self.evolution_strategy.partial = is_partial(self.budget, "product evolution")
 
         return self.evolution_strategy
 
@@ -180,7 +225,7 @@ class ProductEvolver:
 
         request = ChatRequest(messages=messages)
         user_adoption_response = self.llm.generate(
-            request, response_format=UserAdoptionTrend
+            request, response_format=UserAdoptionTrend, priority=CallPriority.OPTIONAL
         )
 
         return UserAdoptionTrend(**user_adoption_response)
@@ -197,27 +242,11 @@ class ProductEvolver:
         Returns:
             TrendVisualizationResponse: Visualization with image and insights
         """
-        plt.figure(figsize=(12, 6))
-
-        # Plot each trend line
-        for i, y_label in enumerate(trend_data.y_axis_labels):
-            plt.plot(
-                trend_data.x_axis_labels, trend_data.data[i], label=y_label, marker="o"
-            )
-
-        plt.title(f"User Adoption Trend: {trend_data.y_axis_name}")
-        plt.xlabel(trend_data.x_axis_name)
-        plt.ylabel(trend_data.y_axis_name)
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-
-        # Save plot to a base64 encoded image
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format="png")
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        plt.close()
+        # Rendered off-thread with the Figure API and cached by the trend data
+        image = get_chart_renderer().render(
+            trend_chart(ADOPTION_CHART_TITLE, trend_data)
+        )
+        image_base64 = base64.b64encode(image).decode("utf-8")
 
         return {
             "img": image_base64,
@@ -225,15 +254,41 @@ class ProductEvolver:
             "insights": trend_data.key_insights,
         }
 
+    def user_adoption_chart_spec(self, trend_data: UserAdoptionTrend) -> TrendChartResponse:
+        """User adoption trend as a chart spec for the client to render"""
+        return TrendChartResponse(
+            chart=chart_spec(
+                trend_chart(ADOPTION_CHART_TITLE, trend_data), self.charts
+            ),
+            reason=trend_data.reasoning,
+            insights=trend_data.key_insights,
+        )
+
 
 @router.post("/evolve")
 def product_evolution_endpoint(
     customer_discovery: CustomerDiscoveryReport,
     market_analysis: MarketAnalysisReport,
     market_expansion: MarketExpansionStrategy,
+    run_id: Optional[str] = Query(
+        None, pattern=RUN_ID_PATTERN, description="Checkpoint under this id and resume"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which optional work is skipped"
+    ),
+    services: ServiceContainer = Depends(get_services),
 ):
     """FastAPI endpoint for product evolution strategy generation"""
-    evolver = ProductEvolver(customer_discovery, market_analysis, market_expansion)
+    checkpoint = CheckpointStore(run_id).scoped("product_evolution") if run_id else None
+    budget = default_run_budget(deadline_seconds=deadline)
+    evolver = ProductEvolver(
+        customer_discovery,
+        market_analysis,
+        market_expansion,
+        checkpoint=checkpoint,
+        budget=budget,
+        services=services,
+    )
     return evolver.generate_product_evolution_strategy()
 
 
@@ -242,11 +297,33 @@ def user_adoption_trend_endpoint(
     customer_discovery: CustomerDiscoveryReport,
     market_analysis: MarketAnalysisReport,
     market_expansion: MarketExpansionStrategy,
+    run_id: Optional[str] = Query(
+        None, pattern=RUN_ID_PATTERN, description="Checkpoint under this id and resume"
+    ),
+    deadline: Optional[float] = Query(
+        None, gt=0, description="Seconds after which optional work is skipped"
+    ),
+    format: ChartFormat = Query(
+        ChartFormat.IMAGE,
+        description="image: embedded base64 PNG; spec: chart spec for client rendering",
+    ),
+    services: ServiceContainer = Depends(get_services),
 ):
     """FastAPI endpoint for user adoption trend visualization"""
-    evolver = ProductEvolver(customer_discovery, market_analysis, market_expansion)
+    checkpoint = CheckpointStore(run_id).scoped("product_evolution") if run_id else None
+    budget = default_run_budget(deadline_seconds=deadline)
+    evolver = ProductEvolver(
+        customer_discovery,
+        market_analysis,
+        market_expansion,
+        checkpoint=checkpoint,
+        budget=budget,
+        services=services,
+    )
     evolution_strategy = evolver.generate_product_evolution_strategy()
 
+    if evolution_strategy.user_adoption_trend and format == ChartFormat.SPEC:
+        return evolver.user_adoption_chart_spec(evolution_strategy.user_adoption_trend)
     if evolution_strategy.user_adoption_trend:
         return evolver.visualize_user_adoption_trend(
             evolution_strategy.user_adoption_trend
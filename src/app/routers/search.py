@@ -0,0 +1,45 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.db import get_async_db
+from src.app.services.search_service import search_reports
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+class SearchHit(BaseModel):
+    """A stored report fragment matching a search query"""
+
+    kind: str
+    ref_id: int
+    title: str
+    snippet: str
+    score: float
+
+
+@router.get("", response_model=List[SearchHit])
+async def search_endpoint(
+    q: str = Query(..., min_length=1, description="Words that must all appear"),
+    kind: Optional[str] = Query(
+        None,
+        description=(
+            "market_report, market_search_text, niche, niche_search_text, "
+            "expansion_rationale, or search_text for both kinds of search text"
+        ),
+    ),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ranked full-text search over previously stored reports"""
+    try:
+        return await search_reports(db, q, kind=kind, limit=limit, offset=offset)
+    except OperationalError:
+        # Only SQLite databases carry the FTS5 index
+        raise HTTPException(
+            status_code=501, detail="Full-text search is not available on this database"
+        )
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 class TrendVisualizationResponse(BaseModel):
@@ -27,3 +27,47 @@ class DetailedTrendVisualization(TrendVisualizationResponse):
         le=1, 
         description="Confidence score of the trend analysis (0-1)"
     )
+
+
+class ChartAxis(BaseModel):
+    """Axis of a declarative chart"""
+    
+    name: str = Field(..., description="Axis title")
+    labels: Optional[List[str]] = Field(None, description="Category labels, for a categorical axis")
+
+
+class ChartSeries(BaseModel):
+    """One line of a declarative chart"""
+    
+    name: str = Field(..., description="Series name shown in the legend")
+    values: List[float] = Field(..., description="One value per x-axis label")
+
+
+class ChartAnnotation(BaseModel):
+    """Point of a chart worth calling out"""
+    
+    series: str = Field(..., description="Name of the annotated series")
+    x: str = Field(..., description="x-axis label of the annotated point")
+    y: float = Field(..., description="Value of the annotated point")
+    text: str = Field(..., description="Annotation text")
+
+
+class ChartSpec(BaseModel):
+    """Declarative chart the client renders itself"""
+    
+    chart_id: str = Field(..., description="Content hash identifying the chart")
+    type: str = Field("line", description="Chart type")
+    title: str
+    x_axis: ChartAxis
+    y_axis: ChartAxis
+    series: List[ChartSeries]
+    annotations: List[ChartAnnotation] = Field(default_factory=list)
+    image_url: str = Field(..., description="Cacheable PNG rendering of the chart; use .svg for SVG")
+
+
+class TrendChartResponse(BaseModel):
+    """Trend visualization as a chart spec instead of an embedded image"""
+    
+    chart: ChartSpec
+    reason: str = Field(..., description="Detailed reasoning behind the trend visualization")
+    insights: List[str] = Field(..., description="Key strategic insights derived from the visualization")
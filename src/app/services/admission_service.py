@@ -0,0 +1,236 @@
+import asyncio
+import math
+import statistics
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+from pydantic import BaseModel
+
+from src.app.config import get_settings
+
+
+class QueueFullError(Exception):
+    """Raised when every run slot is busy and the wait queue is full"""
+
+    def __init__(self, queue_position: int, retry_after: int):
+        super().__init__(
+            f"Too many analyses in progress; queue position would be {queue_position}"
+        )
+        self.queue_position = queue_position
+        self.retry_after = retry_after
+
+
+class AdmissionMetrics(BaseModel):
+    """Current load and recent queueing behaviour of expensive runs"""
+
+    max_concurrent_runs: int
+    max_queued_runs: int
+    running: int
+    queued: int
+    admitted_total: int
+    rejected_total: int
+    mean_wait_seconds: float
+    p95_wait_seconds: float
+    mean_run_seconds: float
+
+
+class AdmissionController:
+    """
+    Caps concurrent pipeline runs and queues a bounded number of callers.
+
+    Callers beyond max_concurrent_runs wait in FIFO order; once max_queued_runs
+    callers are already waiting, new ones are rejected with an estimate of
+    when capacity frees up.
+    """
+
+    def __init__(
+        self,
+        max_concurrent_runs: int,
+        max_queued_runs: int,
+        default_retry_after: int = 30,
+        history: int = 200,
+    ):
+        """
+        Args:
+            max_concurrent_runs (int): Runs allowed to execute at once
+            max_queued_runs (int): Callers allowed to wait for a slot
+            default_retry_after (int): Retry-After seconds before any run finished
+            history (int): Number of recent waits and runs kept for the metrics
+        """
+        self.max_concurrent_runs = max_concurrent_runs
+        self.max_queued_runs = max_queued_runs
+        self.default_retry_after = default_retry_after
+
+        self.running = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._wait_times: Deque[float] = deque(maxlen=history)
+        self._run_times: Deque[float] = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def retry_after(self, queue_position: int) -> int:
+        """Seconds until roughly queue_position runs have finished"""
+        with self._lock:
+            run_times = list(self._run_times)
+        if not run_times:
+            return self.default_retry_after
+        rounds = queue_position / self.max_concurrent_runs
+        return max(1, math.ceil(statistics.mean(run_times) * rounds))
+
+    def _reserve(self) -> Optional[asyncio.Future]:
+        """Take a free slot (None) or a place in the queue (its waiter)"""
+        with self._lock:
+            if self.running < self.max_concurrent_runs and not self._waiters:
+                self.running += 1
+                self.admitted_total += 1
+                self._wait_times.append(0.0)
+                return None
+
+            if len(self._waiters) >= self.max_queued_runs:
+                self.rejected_total += 1
+                queue_position = len(self._waiters) + 1
+                rejected = True
+            else:
+                rejected = False
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+
+        if rejected:
+            raise QueueFullError(queue_position, self.retry_after(queue_position))
+        return waiter
+
+    async def _wait(self, waiter: asyncio.Future, queued_at: float):
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            # The slot was handed over just as the caller went away
+            self._release()
+            raise
+
+        with self._lock:
+            self.admitted_total += 1
+            self._wait_times.append(time.monotonic() - queued_at)
+
+    def _release(self):
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.done():
+                    # Hand the slot straight to the next caller in line
+                    waiter.get_loop().call_soon_threadsafe(_wake, waiter)
+                    return
+            self.running -= 1
+
+    def _finish(self, started: float):
+        with self._lock:
+            self._run_times.append(time.monotonic() - started)
+        self._release()
+
+    def reserve(self) -> "AdmissionTicket":
+        """
+        Claim a run slot, or a place in the queue, without waiting for it.
+
+        Lets a caller that starts the run in the background be turned away
+        before it schedules anything; entering the ticket waits for the slot.
+
+        Raises:
+            QueueFullError: If the caller can neither run nor wait
+        """
+        return AdmissionTicket(self, self._reserve())
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold one run slot for the duration of the block.
+
+        Raises:
+            QueueFullError: If the caller can neither run nor wait
+        """
+        async with self.reserve():
+            yield
+
+    def metrics(self) -> AdmissionMetrics:
+        """Snapshot of the controller's load"""
+        with self._lock:
+            waits = sorted(self._wait_times)
+            runs = list(self._run_times)
+            return AdmissionMetrics(
+                max_concurrent_runs=self.max_concurrent_runs,
+                max_queued_runs=self.max_queued_runs,
+                running=self.running,
+                queued=len(self._waiters),
+                admitted_total=self.admitted_total,
+                rejected_total=self.rejected_total,
+                mean_wait_seconds=round(statistics.mean(waits), 3) if waits else 0.0,
+                p95_wait_seconds=(
+                    round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0
+                ),
+                mean_run_seconds=round(statistics.mean(runs), 3) if runs else 0.0,
+            )
+
+
+class AdmissionTicket:
+    """A slot, or a queue place for one, claimed by AdmissionController.reserve"""
+
+    def __init__(
+        self, controller: AdmissionController, waiter: Optional[asyncio.Future]
+    ):
+        self._controller = controller
+        self._waiter = waiter
+        self._queued_at = time.monotonic()
+        self._started: Optional[float] = None
+        self._used = False
+
+    def discard(self):
+        """Give the slot or queue place back unless the ticket was entered"""
+        if self._used:
+            return
+        self._used = True
+        if self._waiter is not None:
+            with self._controller._lock:
+                if self._waiter in self._controller._waiters:
+                    self._controller._waiters.remove(self._waiter)
+                    return
+        # Either a free slot was taken or one was already handed to this ticket
+        self._controller._release()
+
+    async def __aenter__(self):
+        # From here on a cancelled wait or the exit gives the slot back
+        self._used = True
+        if self._waiter is not None:
+            await self._controller._wait(self._waiter, self._queued_at)
+        self._started = time.monotonic()
+
+    async def __aexit__(self, *exc_info):
+        self._controller._finish(self._started)
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_admission_controller: Optional[AdmissionController] = None
+_admission_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Process-wide controller shared by every expensive endpoint"""
+    global _admission_controller
+    with _admission_controller_lock:
+        if _admission_controller is None:
+            settings = get_settings()
+            _admission_controller = AdmissionController(
+                settings.MAX_CONCURRENT_RUNS,
+                settings.MAX_QUEUED_RUNS,
+                settings.ADMISSION_RETRY_AFTER_SECONDS,
+            )
+        return _admission_controller
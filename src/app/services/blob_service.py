@@ -0,0 +1,142 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from pydantic import BaseModel
+
+from src.app.config import get_settings
+
+# Blobs are named by the lowercase hex SHA-256 of their text
+DIGEST_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+def is_digest(value: str) -> bool:
+    """Whether a value is a blob hash, and so safe to turn into a path"""
+    return DIGEST_PATTERN.fullmatch(value) is not None
+
+
+class TextRef(BaseModel):
+    """Pointer to a raw text kept in the blob store"""
+
+    hash: str
+    excerpt: str
+    length: int
+
+
+class BlobStore:
+    """
+    Content-addressed, zlib-compressed storage for raw search texts.
+
+    A text is written once under the SHA-256 of its content, so the same
+    page fetched for many reports is stored a single time. Reports carry a
+    TextRef and the full text is read back only when someone asks for it.
+    """
+
+    def __init__(self, root: Optional[str] = None, excerpt_chars: Optional[int] = None):
+        """
+        Args:
+            root (str, optional): Blob directory. Defaults to BLOB_DIR.
+            excerpt_chars (int, optional): Length of the excerpt kept in a TextRef.
+                Defaults to BLOB_EXCERPT_CHARS.
+        """
+        settings = get_settings()
+        self.root = Path(root or settings.BLOB_DIR)
+        self.excerpt_chars = excerpt_chars or settings.BLOB_EXCERPT_CHARS
+
+    def _path(self, digest: str) -> Path:
+        if not is_digest(digest):
+            raise KeyError(digest)
+        # Fan out over sub-directories so no single directory grows too large
+        return self.root / digest[:2] / f"{digest[2:]}.z"
+
+    def has(self, digest: str) -> bool:
+        """Check whether a blob is stored"""
+        return is_digest(digest) and self._path(digest).exists()
+
+    def put(self, text: str) -> str:
+        """Store a text if it is not already present and return its hash"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if path.exists():
+            return digest
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return digest
+
+    def get(self, digest: str) -> str:
+        """
+        Read a stored text back.
+
+        Raises:
+            KeyError: If the hash is malformed, or no readable blob is stored
+                under it
+        """
+        try:
+            with open(self._path(digest), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except (FileNotFoundError, zlib.error, UnicodeDecodeError):
+            raise KeyError(digest) from None
+
+    def ref(self, text: Union[str, TextRef, Dict[str, Any]]) -> TextRef:
+        """Store a raw text and return its reference; existing references pass through"""
+        if isinstance(text, TextRef):
+            return text
+        if isinstance(text, dict):
+            return TextRef(**text)
+        return TextRef(
+            hash=self.put(text),
+            excerpt=" ".join(text[: self.excerpt_chars].split()),
+            length=len(text),
+        )
+
+    def refs(self, texts: Iterable[Union[str, TextRef, Dict[str, Any]]]) -> List[TextRef]:
+        """Reference every text of a list"""
+        return [self.ref(text) for text in texts]
+
+    def _full_text(self, ref: TextRef) -> str:
+        try:
+            return self.get(ref.hash)
+        except KeyError:
+            return ref.excerpt
+
+    def resolve(self, value: Any) -> Any:
+        """
+        Replace every TextRef nested in a JSON-like value with its full text.
+        A reference whose blob is missing resolves to its excerpt.
+        """
+        if isinstance(value, TextRef):
+            return self._full_text(value)
+        if isinstance(value, dict):
+            if set(value) == set(TextRef.model_fields):
+                return self._full_text(TextRef(**value))
+            return {key: self.resolve(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        return value
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store"""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+        return _blob_store
@@ -0,0 +1,305 @@
+import asyncio
+import hashlib
+import io
+import json
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from src.app.config import get_settings
+from src.app.schemas.visualization import (
+    ChartAnnotation,
+    ChartAxis,
+    ChartSeries,
+    ChartSpec,
+)
+from src.app.services.blob_service import BlobStore
+
+CHART_FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def line_chart(
+    title: str,
+    x_axis_name: str,
+    y_axis_name: str,
+    x_axis_labels: List[str],
+    series_names: List[str],
+    data: List[List[float]],
+) -> Dict[str, Any]:
+    """Plain, picklable description of a line chart with one line per series"""
+    return {
+        "title": title,
+        "x_axis_name": x_axis_name,
+        "y_axis_name": y_axis_name,
+        "x_axis_labels": list(x_axis_labels),
+        "series": [
+            {"name": name, "values": list(values)}
+            for name, values in zip(series_names, data)
+        ],
+    }
+
+
+def trend_chart(title_prefix: str, trend: Any) -> Dict[str, Any]:
+    """Line chart of a MarketTrendVisualization or UserAdoptionTrend"""
+    return line_chart(
+        f"{title_prefix}: {trend.y_axis_name}",
+        trend.x_axis_name,
+        trend.y_axis_name,
+        trend.x_axis_labels,
+        trend.y_axis_labels,
+        trend.data,
+    )
+
+
+def chart_digest(chart: Dict[str, Any], fmt: str = "png") -> str:
+    """Cache key of a chart: SHA-256 of its canonical JSON and the output format"""
+    return hashlib.sha256(f"{fmt}\n{_canonical(chart)}".encode("utf-8")).hexdigest()
+
+
+def _canonical(chart: Dict[str, Any]) -> str:
+    return json.dumps(chart, sort_keys=True, separators=(",", ":"))
+
+
+def chart_annotations(chart: Dict[str, Any]) -> List[ChartAnnotation]:
+    """The peak of every series and the steepest single-step change of the chart"""
+    labels = chart["x_axis_labels"]
+    annotations = []
+    steepest = None
+    for series in chart["series"]:
+        values = series["values"][: len(labels)]
+        if not values:
+            continue
+        peak = max(range(len(values)), key=values.__getitem__)
+        annotations.append(
+            ChartAnnotation(
+                series=series["name"],
+                x=labels[peak],
+                y=values[peak],
+                text=f"Peak {series['name']}: {values[peak]:g}",
+            )
+        )
+        for i in range(1, len(values)):
+            change = values[i] - values[i - 1]
+            if steepest is None or abs(change) > abs(steepest[0]):
+                steepest = (change, series["name"], i, values[i])
+
+    if steepest is not None and steepest[0]:
+        change, name, i, value = steepest
+        annotations.append(
+            ChartAnnotation(
+                series=name,
+                x=labels[i],
+                y=value,
+                text=f"Largest change: {name} {change:+g} from {labels[i - 1]}",
+            )
+        )
+    return annotations
+
+
+# Keys every stored chart has, see line_chart
+CHART_KEYS = {"title", "x_axis_name", "y_axis_name", "x_axis_labels", "series"}
+
+
+def chart_spec(chart: Dict[str, Any], charts: Optional[BlobStore] = None) -> ChartSpec:
+    """
+    Declarative spec of a chart for client-side rendering.
+
+    The chart is kept in the chart store under its content hash, which is
+    also its id, so the image endpoint can render it later on request.
+    """
+    chart_id = (charts or get_chart_store()).put(_canonical(chart))
+    return ChartSpec(
+        chart_id=chart_id,
+        title=chart["title"],
+        x_axis=ChartAxis(name=chart["x_axis_name"], labels=chart["x_axis_labels"]),
+        y_axis=ChartAxis(name=chart["y_axis_name"]),
+        series=[ChartSeries(**series) for series in chart["series"]],
+        annotations=chart_annotations(chart),
+        image_url=f"/charts/{chart_id}.png",
+    )
+
+
+def load_chart(chart_id: str, charts: Optional[BlobStore] = None) -> Dict[str, Any]:
+    """
+    Chart stored by chart_spec.
+
+    Raises:
+        KeyError: If no chart with this id is stored, or what is stored under
+            it is not a chart
+    """
+    try:
+        chart = json.loads((charts or get_chart_store()).get(chart_id))
+    except ValueError:
+        raise KeyError(chart_id) from None
+    if not isinstance(chart, dict) or not CHART_KEYS <= set(chart):
+        raise KeyError(chart_id)
+    return chart
+
+
+def render_chart(chart: Dict[str, Any], fmt: str = "png") -> bytes:
+    """
+    Render a line chart to PNG or SVG bytes.
+
+    Uses an explicit Figure on the Agg canvas rather than pyplot, so no
+    global figure state is shared between concurrent renders. Module-level
+    so it can run in a worker process.
+    """
+    import matplotlib
+
+    matplotlib.use("Agg")
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(12, 6))
+    axes = figure.subplots()
+    labels = chart["x_axis_labels"]
+    for series in chart["series"]:
+        # Tolerate series whose length does not match the axis labels
+        points = min(len(labels), len(series["values"]))
+        axes.plot(labels[:points], series["values"][:points], label=series["name"], marker="o")
+
+    axes.set_title(chart["title"])
+    axes.set_xlabel(chart["x_axis_name"])
+    axes.set_ylabel(chart["y_axis_name"])
+    if chart["series"]:
+        axes.legend()
+    axes.grid(True)
+    figure.tight_layout()
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """
+    Renders charts off the request thread and caches the output by data hash.
+
+    Identical charts are rendered once: later requests are served from an
+    in-memory LRU cache, and requests arriving while the same chart is being
+    rendered wait for that render instead of starting another.
+    """
+
+    def __init__(self, workers: Optional[int] = None, cache_size: Optional[int] = None):
+        """
+        Args:
+            workers (int, optional): Rendering processes; 0 renders in the calling
+                thread. Defaults to CHART_RENDER_WORKERS.
+            cache_size (int, optional): Rendered charts kept in memory.
+                Defaults to CHART_CACHE_SIZE.
+        """
+        settings = get_settings()
+        self.workers = settings.CHART_RENDER_WORKERS if workers is None else workers
+        self.cache_size = cache_size or settings.CHART_CACHE_SIZE
+
+        self.hits = 0
+        self.renders = 0
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            # spawn: forking a threaded server process is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _submit(self, chart: Dict[str, Any], fmt: str) -> Future:
+        """Future of the chart's bytes, shared by everyone asking for the same chart"""
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Unsupported chart format: {fmt}")
+        digest = chart_digest(chart, fmt)
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                self.hits += 1
+                future: Future = Future()
+                future.set_result(self._cache[digest])
+                return future
+            if digest in self._inflight:
+                self.hits += 1
+                return self._inflight[digest]
+
+            self.renders += 1
+            executor = self._executor()
+            if executor is None:
+                future = Future()
+                self._inflight[digest] = future
+            else:
+                future = executor.submit(render_chart, chart, fmt)
+                self._inflight[digest] = future
+
+        if executor is None:
+            try:
+                future.set_result(render_chart(chart, fmt))
+            except Exception as e:
+                future.set_exception(e)
+        future.add_done_callback(lambda done: self._store(digest, done))
+        return future
+
+    def _store(self, digest: str, future: Future):
+        with self._lock:
+            self._inflight.pop(digest, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[digest] = future.result()
+            self._cache.move_to_end(digest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def render(self, chart: Dict[str, Any], fmt: str = "png") -> bytes:
+        """Rendered chart, blocking until it is available"""
+        return self._submit(chart, fmt).result()
+
+    async def arender(self, chart: Dict[str, Any], fmt: str = "png") -> bytes:
+        """Rendered chart, awaited without blocking the event loop"""
+        return await asyncio.wrap_future(self._submit(chart, fmt))
+
+    def shutdown(self):
+        """Stop the rendering processes"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+_chart_store: Optional[BlobStore] = None
+_chart_store_lock = threading.Lock()
+
+
+def get_chart_store() -> BlobStore:
+    """Process-wide store of the charts returned as specs"""
+    global _chart_store
+    with _chart_store_lock:
+        if _chart_store is None:
+            _chart_store = BlobStore(root=get_settings().CHART_DIR)
+        return _chart_store
+
+
+_chart_renderer: Optional[ChartRenderer] = None
+_chart_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer() -> ChartRenderer:
+    """Process-wide chart renderer"""
+    global _chart_renderer
+    with _chart_renderer_lock:
+        if _chart_renderer is None:
+            _chart_renderer = ChartRenderer()
+        return _chart_renderer
+
+
+def shutdown_chart_renderer():
+    """Stop the process-wide renderer's workers, used at application shutdown"""
+    global _chart_renderer
+    with _chart_renderer_lock:
+        renderer, _chart_renderer = _chart_renderer, None
+    if renderer is not None:
+        renderer.shutdown()
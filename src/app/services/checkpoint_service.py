@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Optional, Type
+
+from pydantic import BaseModel
+
+from src.app.config import get_settings
+
+# Run ids name a checkpoint directory, so only plain identifiers are accepted
+RUN_ID_PATTERN = r"^[A-Za-z0-9_-]{1,64}$"
+
+
+def is_valid_run_id(run_id: str) -> bool:
+    """Check that a run id cannot escape the checkpoint directory"""
+    return re.fullmatch(RUN_ID_PATTERN, run_id) is not None
+
+
+# Returned by restore for a unit that is missing or cannot be read back
+MISSING = object()
+
+
+class CheckpointStore:
+    """
+    Persists intermediate pipeline results on local disk under a run id.
+
+    Every unit of work (a stage output, a niche, a year, a sub-question) is
+    stored under its own key, so re-running with the same run id only
+    recomputes the units that never completed.
+    """
+
+    def __init__(self, run_id: str, root: Optional[str] = None, prefix: str = ""):
+        """
+        Args:
+            run_id (str): Identifier shared by every attempt of the same run
+            root (str, optional): Checkpoint directory. Defaults to CHECKPOINT_DIR.
+            prefix (str): Namespace prepended to every key
+
+        Raises:
+            ValueError: If run_id does not match RUN_ID_PATTERN
+        """
+        if not is_valid_run_id(run_id):
+            raise ValueError(f"Invalid run id {run_id!r}: expected {RUN_ID_PATTERN}")
+        self.run_id = run_id
+        self.root = Path(root or get_settings().CHECKPOINT_DIR)
+        self.directory = self.root / run_id
+        self.prefix = prefix
+
+    def scoped(self, namespace: str) -> "CheckpointStore":
+        """Return a view of this store whose keys live under the given namespace"""
+        return CheckpointStore(
+            self.run_id, str(self.root), prefix=f"{self.prefix}{namespace}/"
+        )
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(f"{self.prefix}{key}".encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def has(self, key: str) -> bool:
+        """Check whether a unit has already been checkpointed"""
+        return self._path(key).exists()
+
+    def load(self, key: str, default: Any = None) -> Any:
+        """Load a checkpointed value, or return default if it does not exist"""
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)["value"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            # Truncated or corrupt files (bad JSON or encoding) count as missing
+            return default
+
+    def restore(self, key: str, model: Optional[Type[BaseModel]] = None) -> Any:
+        """
+        Read a unit back, rebuilt with model if given.
+
+        Returns:
+            Any: The stored value, or MISSING if it is absent, damaged or no
+                longer valid for model, so the caller recomputes it
+        """
+        value = self.load(key, MISSING)
+        if value is MISSING or model is None:
+            return value
+        try:
+            return model(**value)
+        except (TypeError, ValueError):
+            return MISSING
+
+    def save(self, key: str, value: Any) -> None:
+        """Atomically persist a value so a crash never leaves a partial checkpoint"""
+        if isinstance(value, BaseModel):
+            value = value.model_dump(mode="json")
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": f"{self.prefix}{key}", "value": value}, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def cached(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        model: Optional[Type[BaseModel]] = None,
+    ) -> Any:
+        """
+        Return the checkpointed value for key, computing and saving it if missing.
+
+        Args:
+            key (str): Unit identifier within this store
+            compute (Callable): Produces the value when no checkpoint exists
+            model (Type[BaseModel], optional): Model used to rebuild a stored value
+
+        Returns:
+            Any: The stored or freshly computed value
+        """
+        value = self.restore(key, model)
+        if value is not MISSING:
+            return value
+
+        # A damaged checkpoint is recomputed and overwritten
+        value = compute()
+        self.save(key, value)
+        return value
+
+
+class NullCheckpointStore(CheckpointStore):
+    """Checkpoint store that never persists anything, used when no run id is given"""
+
+    def __init__(self):
+        self.run_id = None
+        self.prefix = ""
+
+    def scoped(self, namespace: str) -> "NullCheckpointStore":
+        return self
+
+    def has(self, key: str) -> bool:
+        return False
+
+    def load(self, key: str, default: Any = None) -> Any:
+        return default
+
+    def save(self, key: str, value: Any) -> None:
+        return None
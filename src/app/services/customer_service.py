@@ -0,0 +1,185 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.app.models.customer import CustomerProfile, ProfileNiche
+from src.app.services.blob_service import get_blob_store
+from src.app.services.search_service import (
+    NICHE,
+    NICHE_SEARCH_TEXT,
+    index_documents,
+    remove_documents,
+    text_of,
+)
+from src.app.utils.helpers import lookup_key
+
+
+def externalize(report):
+    """Copy of a report whose niches reference their raw texts in the blob store"""
+    blobs = get_blob_store()
+    return report.model_copy(
+        update={
+            "niches": [
+                niche.model_copy(
+                    update={"search_results": blobs.refs(niche.search_results)}
+                )
+                for niche in report.niches
+            ]
+        }
+    )
+
+
+def search_texts(report) -> List[Tuple[str, str]]:
+    """Search query and full raw text of every niche, read from the blob store"""
+    blobs = get_blob_store()
+    return [
+        (niche.search_query, text_of(blobs.resolve(niche.search_results)))
+        for niche in report.niches
+    ]
+
+
+def save_customer_discovery(
+    db: Session,
+    report,
+    user_id: Optional[int] = None,
+    texts: Optional[List[Tuple[str, str]]] = None,
+) -> CustomerProfile:
+    """
+    Persist a customer discovery report and its niches in one transaction.
+
+    Args:
+        db (Session): Database session
+        report (CustomerDiscoveryReport): Report to store
+        user_id (int, optional): Owner of the report
+        texts (List[Tuple[str, str]], optional): Result of search_texts(report),
+            read beforehand by callers that must not block on file reads. Such
+            callers also pass the report through externalize first.
+
+    Returns:
+        CustomerProfile: The stored profile row
+    """
+    if texts is None:
+        report = externalize(report)
+        texts = search_texts(report)
+    profile = CustomerProfile(
+        user_id=user_id,
+        segment_name=report.primary_domain[:255],
+        lookup_key=lookup_key(report.primary_domain),
+        total_market_size=report.total_market_size,
+        ideal_customer_profile=report.ideal_customer_profile,
+        investor_sentiment=report.investor_sentiment,
+        partial=report.partial,
+    )
+    try:
+        # Only the latest report of a domain stays searchable
+        superseded = db.scalars(
+            select(CustomerProfile.id).where(
+                CustomerProfile.lookup_key == profile.lookup_key
+            )
+        ).all()
+        remove_documents(db, [NICHE, NICHE_SEARCH_TEXT], superseded)
+        db.add(profile)
+        db.flush()
+        niches = [
+            {
+                **niche.model_dump(mode="json"),
+                "profile_id": profile.id,
+                "name": niche.name[:255],
+                "search_query": niche.search_query[:500],
+            }
+            for niche in report.niches
+        ]
+        if niches:
+            db.execute(insert(ProfileNiche), niches)
+        index_documents(
+            db,
+            [
+                {
+                    "kind": NICHE,
+                    "ref_id": profile.id,
+                    "title": niche.name,
+                    "body": text_of([niche.description, niche.key_characteristics]),
+                }
+                for niche in report.niches
+            ]
+            + [
+                {
+                    "kind": NICHE_SEARCH_TEXT,
+                    "ref_id": profile.id,
+                    "title": title,
+                    "body": body,
+                }
+                for title, body in texts
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return profile
+
+
+def load_customer_discovery(db: Session, domain: str):
+    """
+    Return the latest complete report stored for a domain.
+
+    Args:
+        db (Session): Database session
+        domain (str): Domain that was researched
+
+    Returns:
+        Optional[CustomerDiscoveryReport]: Stored report, or None if there is none
+    """
+    from src.app.routers.customer_discovery import (
+        CustomerDiscoveryReport,
+        CustomerNiche,
+    )
+
+    profile = db.scalars(
+        select(CustomerProfile)
+        .where(
+            CustomerProfile.lookup_key == lookup_key(domain),
+            CustomerProfile.partial.is_(False),
+        )
+        .order_by(CustomerProfile.created_at.desc(), CustomerProfile.id.desc())
+        .limit(1)
+    ).first()
+    if profile is None:
+        return None
+
+    niches = db.scalars(
+        select(ProfileNiche)
+        .where(ProfileNiche.profile_id == profile.id)
+        .order_by(ProfileNiche.id)
+    ).all()
+    return CustomerDiscoveryReport(
+        primary_domain=profile.segment_name,
+        total_market_size=profile.total_market_size or 0,
+        niches=[
+            CustomerNiche(
+                **{field: getattr(niche, field) for field in CustomerNiche.model_fields}
+            )
+            for niche in niches
+        ],
+        ideal_customer_profile=profile.ideal_customer_profile or {},
+        investor_sentiment=profile.investor_sentiment or {},
+        partial=profile.partial,
+    )
+
+
+async def asave_customer_discovery(
+    db: AsyncSession, report, user_id: Optional[int] = None
+) -> CustomerProfile:
+    """Async version of save_customer_discovery"""
+    # Blob files are written and read in a worker thread, not on the event loop
+    report = await asyncio.to_thread(externalize, report)
+    texts = await asyncio.to_thread(search_texts, report)
+    return await db.run_sync(save_customer_discovery, report, user_id, texts)
+
+
+async def aload_customer_discovery(db: AsyncSession, domain: str):
+    """Async version of load_customer_discovery"""
+    return await db.run_sync(load_customer_discovery, domain)
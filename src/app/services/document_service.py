@@ -0,0 +1,272 @@
+import hashlib
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from pydantic import BaseModel
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.app.config import get_settings
+from src.app.db import get_session_factory
+from src.app.models.document import Document
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_TABLE = "document_search"
+
+# Words too common to tell two research queries apart
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "how",
+    "in", "into", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+    "this", "to", "what", "which", "who", "with",
+}
+
+
+def ensure_document_index(connection: Connection) -> bool:
+    """
+    Create the FTS5 index over stored documents if the database supports it.
+    Index rows share their rowid with the documents table.
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {DOCUMENT_TABLE} USING fts5("
+            "title, content, tokenize='porter unicode61')"
+        )
+    )
+    return True
+
+
+def content_hash(content: str) -> str:
+    """SHA-256 of a document's text"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct significant words of a query, in order"""
+    words = re.findall(r"[a-z0-9]+", query.lower())
+    return list(
+        dict.fromkeys(w for w in words if len(w) > 1 and w not in STOPWORDS)
+    )
+
+
+class DocumentStoreStats(BaseModel):
+    """How often research queries were answered from the local corpus"""
+
+    documents: int
+    lookups: int
+    hits: int
+    misses: int
+    hit_rate: float
+    avoided_external_calls: int
+
+
+class DocumentStore:
+    """
+    Persistent corpus of fetched search documents, consulted before external search.
+
+    A lookup is answered locally when enough fresh documents cover most of
+    the query's significant words; otherwise the caller searches externally
+    and stores what it fetched for next time.
+    """
+
+    def __init__(self, session_factory: Optional[sessionmaker] = None, settings=None):
+        settings = settings or get_settings()
+        self._session_factory = session_factory
+        self.enabled = settings.DOCUMENT_STORE_ENABLED
+        self.max_age = timedelta(days=settings.DOCUMENT_STORE_MAX_AGE_DAYS)
+        self.min_results = settings.DOCUMENT_STORE_MIN_RESULTS
+        self.min_coverage = settings.DOCUMENT_STORE_MIN_COVERAGE
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def session_factory(self) -> sessionmaker:
+        return self._session_factory or get_session_factory()
+
+    def _searchable(self, session) -> bool:
+        return self.enabled and session.get_bind().dialect.name == "sqlite"
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def recall(self, query: str, limit: int = 10) -> Optional[List[str]]:
+        """
+        Answer a search query from stored documents.
+
+        Args:
+            query (str): Search query that would be sent to Exa
+            limit (int): Maximum number of documents to return
+
+        Returns:
+            Optional[List[str]]: Document texts, or None when local recall or
+                freshness is insufficient and an external search is needed
+        """
+        terms = query_terms(query)
+        if not terms:
+            return None
+
+        with self.session_factory() as session:
+            if not self._searchable(session):
+                return None
+
+            match = " OR ".join(f'"{term}"' for term in terms)
+            rows = session.execute(
+                text(
+                    "SELECT d.title, d.content FROM documents d "
+                    f"JOIN {DOCUMENT_TABLE} ON {DOCUMENT_TABLE}.rowid = d.id "
+                    f"WHERE {DOCUMENT_TABLE} MATCH :match "
+                    "AND d.fetched_at >= :fresh_after "
+                    f"ORDER BY bm25({DOCUMENT_TABLE}) LIMIT :candidates"
+                ),
+                {
+                    "match": match,
+                    "fresh_after": datetime.utcnow() - self.max_age,
+                    "candidates": limit * 5,
+                },
+            ).all()
+
+        relevant = []
+        for row in rows:
+            document_terms = set(query_terms(f"{row.title or ''} {row.content}"))
+            coverage = sum(term in document_terms for term in terms) / len(terms)
+            if coverage >= self.min_coverage:
+                relevant.append(row.content)
+            if len(relevant) == limit:
+                break
+
+        hit = len(relevant) >= self.min_results
+        self._record(hit)
+        return relevant if hit else None
+
+    def store(self, query: str, documents: Iterable[Dict[str, str]], source: str):
+        """
+        Add fetched documents to the corpus, refreshing ones already stored.
+
+        Args:
+            query (str): Search query the documents were fetched for
+            documents (Iterable[Dict[str, str]]): Items with url, content and
+                optionally title
+            source (str): Search provider, e.g. "exa" or "jina"
+        """
+        if not self.enabled:
+            return
+        documents = {
+            document["url"]: document for document in documents if document.get("content")
+        }
+        if not documents:
+            return
+
+        now = datetime.utcnow()
+        with self.session_factory() as session:
+            searchable = self._searchable(session)
+            try:
+                existing = {
+                    row.url: row
+                    for row in session.scalars(
+                        select(Document).where(Document.url.in_(documents))
+                    )
+                }
+                for url, document in documents.items():
+                    # A failing document, e.g. one stored concurrently under the
+                    # same url, only rolls back its own savepoint
+                    try:
+                        with session.begin_nested():
+                            self._upsert(
+                                session,
+                                existing.get(url),
+                                url,
+                                document,
+                                query,
+                                source,
+                                now,
+                                searchable,
+                            )
+                    except SQLAlchemyError as e:
+                        logger.warning(
+                            "Failed to store document %s for %r: %s", url, query, e
+                        )
+                session.commit()
+            except SQLAlchemyError:
+                session.rollback()
+                logger.exception("Failed to store documents for %r", query)
+
+    def _upsert(
+        self,
+        session: Session,
+        row: Optional[Document],
+        url: str,
+        document: Dict[str, str],
+        query: str,
+        source: str,
+        now: datetime,
+        searchable: bool,
+    ):
+        """Insert or refresh one document and its index row"""
+        digest = content_hash(document["content"])
+        if row is not None and row.content_hash == digest:
+            row.fetched_at = now
+            return
+        if row is None:
+            row = Document(url=url)
+            session.add(row)
+        row.title = (document.get("title") or "")[:500]
+        row.source = source
+        row.query = query[:1000]
+        row.content = document["content"]
+        row.content_hash = digest
+        row.fetched_at = now
+        session.flush()
+
+        if searchable:
+            session.execute(
+                text(f"DELETE FROM {DOCUMENT_TABLE} WHERE rowid = :id"), {"id": row.id}
+            )
+            session.execute(
+                text(
+                    f"INSERT INTO {DOCUMENT_TABLE} (rowid, title, content) "
+                    "VALUES (:id, :title, :content)"
+                ),
+                {"id": row.id, "title": row.title, "content": row.content},
+            )
+
+    def stats(self) -> DocumentStoreStats:
+        """Hit rate of this process's lookups and size of the corpus"""
+        with self.session_factory() as session:
+            documents = session.scalar(select(func.count(Document.id)))
+        with self._lock:
+            lookups = self.hits + self.misses
+            return DocumentStoreStats(
+                documents=documents,
+                lookups=lookups,
+                hits=self.hits,
+                misses=self.misses,
+                hit_rate=round(self.hits / lookups, 4) if lookups else 0.0,
+                # Every hit replaces one external search round trip
+                avoided_external_calls=self.hits,
+            )
+
+
+_document_store: Optional[DocumentStore] = None
+_document_store_lock = threading.Lock()
+
+
+def get_document_store() -> DocumentStore:
+    """Process-wide document store shared by every analyzer"""
+    global _document_store
+    with _document_store_lock:
+        if _document_store is None:
+            _document_store = DocumentStore()
+        return _document_store
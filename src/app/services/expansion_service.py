@@ -0,0 +1,162 @@
+from typing import Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.app.models.expansion import ExpansionDomain, MarketExpansion
+from src.app.services.search_service import (
+    EXPANSION_RATIONALE,
+    index_documents,
+    remove_documents,
+)
+from src.app.utils.helpers import lookup_key
+
+# Per-domain fields of MarketExpansionStrategy and their ExpansionDomain columns
+_DOMAIN_FIELDS = {
+    "strategic_rationale": "strategic_rationale",
+    "competitive_landscape": "competitive_landscape",
+    "investment_requirements": "investment_requirement",
+    "risk_assessment": "risk_score",
+}
+
+
+def expansion_lookup_key(domain: str, market_query: str) -> str:
+    """Key of a strategy built from a customer discovery and a market analysis"""
+    return lookup_key(domain, market_query)
+
+
+def save_market_expansion(
+    db: Session, strategy, market_query: str, user_id: Optional[int] = None
+) -> MarketExpansion:
+    """
+    Persist a market expansion strategy and one row per domain in one transaction.
+
+    Args:
+        db (Session): Database session
+        strategy (MarketExpansionStrategy): Strategy to store
+        market_query (str): Query of the market analysis the strategy was built from
+        user_id (int, optional): Owner of the strategy
+
+    Returns:
+        MarketExpansion: The stored expansion row
+    """
+    expansion = MarketExpansion(
+        user_id=user_id,
+        target_market=strategy.primary_domain[:255],
+        lookup_key=expansion_lookup_key(strategy.primary_domain, market_query),
+        potential_synergies=strategy.potential_synergies,
+        partial=strategy.partial,
+    )
+
+    # Domains may appear in the per-domain mappings without being listed
+    domains = list(dict.fromkeys(strategy.expansion_domains))
+    listed = len(domains)
+    for field in _DOMAIN_FIELDS:
+        for domain in getattr(strategy, field):
+            if domain not in domains:
+                domains.append(domain)
+
+    try:
+        # Only the latest strategy of a domain and query stays searchable
+        superseded = db.scalars(
+            select(MarketExpansion.id).where(
+                MarketExpansion.lookup_key == expansion.lookup_key
+            )
+        ).all()
+        remove_documents(db, [EXPANSION_RATIONALE], superseded)
+        db.add(expansion)
+        db.flush()
+        rows = [
+            {
+                "expansion_id": expansion.id,
+                "name": domain[:255],
+                "position": position if position < listed else None,
+                **{
+                    column: getattr(strategy, field).get(domain)
+                    for field, column in _DOMAIN_FIELDS.items()
+                },
+            }
+            for position, domain in enumerate(domains)
+        ]
+        if rows:
+            db.execute(insert(ExpansionDomain), rows)
+        index_documents(
+            db,
+            [
+                {
+                    "kind": EXPANSION_RATIONALE,
+                    "ref_id": expansion.id,
+                    "title": f"{strategy.primary_domain} -> {domain}",
+                    "body": rationale,
+                }
+                for domain, rationale in strategy.strategic_rationale.items()
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return expansion
+
+
+def load_market_expansion(db: Session, domain: str, market_query: str):
+    """
+    Return the latest complete strategy stored for a domain and market query.
+
+    Args:
+        db (Session): Database session
+        domain (str): Primary domain of the customer discovery report
+        market_query (str): Query of the market analysis report
+
+    Returns:
+        Optional[MarketExpansionStrategy]: Stored strategy, or None if there is none
+    """
+    from src.app.routers.market_expansion import MarketExpansionStrategy
+
+    expansion = db.scalars(
+        select(MarketExpansion)
+        .where(
+            MarketExpansion.lookup_key == expansion_lookup_key(domain, market_query),
+            MarketExpansion.partial.is_(False),
+        )
+        .order_by(MarketExpansion.created_at.desc(), MarketExpansion.id.desc())
+        .limit(1)
+    ).first()
+    if expansion is None:
+        return None
+
+    rows = db.scalars(
+        select(ExpansionDomain)
+        .where(ExpansionDomain.expansion_id == expansion.id)
+        .order_by(ExpansionDomain.id)
+    ).all()
+    per_domain = {field: {} for field in _DOMAIN_FIELDS}
+    for row in rows:
+        for field, column in _DOMAIN_FIELDS.items():
+            value = getattr(row, column)
+            if value is not None:
+                per_domain[field][row.name] = value
+    listed = sorted(
+        (row for row in rows if row.position is not None), key=lambda row: row.position
+    )
+
+    return MarketExpansionStrategy(
+        primary_domain=expansion.target_market,
+        expansion_domains=[row.name for row in listed],
+        potential_synergies=expansion.potential_synergies or [],
+        partial=expansion.partial,
+        **per_domain,
+    )
+
+
+async def asave_market_expansion(
+    db: AsyncSession, strategy, market_query: str, user_id: Optional[int] = None
+) -> MarketExpansion:
+    """Async version of save_market_expansion"""
+    return await db.run_sync(save_market_expansion, strategy, market_query, user_id)
+
+
+async def aload_market_expansion(db: AsyncSession, domain: str, market_query: str):
+    """Async version of load_market_expansion"""
+    return await db.run_sync(load_market_expansion, domain, market_query)
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.app.config import get_settings
+from src.app.utils.helpers import lookup_key
+
+
+class IdempotencyConflictError(ValueError):
+    """Raised when an Idempotency-Key is reused for a different request"""
+
+
+class JobStatus(str, Enum):
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobInfo(BaseModel):
+    """Public state of a shared analysis run"""
+
+    job_id: str
+    kind: str
+    status: JobStatus
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class RunJob:
+    """One analysis run that every identical request attaches to"""
+
+    def __init__(self, kind: str, key: str, fingerprint: str, task: asyncio.Task):
+        self.job_id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.fingerprint = fingerprint
+        self.task = task
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.expires_at: Optional[float] = None
+
+    @property
+    def status(self) -> JobStatus:
+        if not self.task.done():
+            return JobStatus.RUNNING
+        if self.task.cancelled() or self.task.exception() is not None:
+            return JobStatus.FAILED
+        return JobStatus.SUCCEEDED
+
+    def info(self) -> JobInfo:
+        error = None
+        if self.task.done():
+            error = "cancelled" if self.task.cancelled() else self.task.exception()
+        return JobInfo(
+            job_id=self.job_id,
+            kind=self.kind,
+            status=self.status,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            error=str(error) if error else None,
+        )
+
+    async def wait(self) -> Any:
+        """
+        Wait for the run's result. A caller going away does not cancel the run
+        for the other callers attached to it.
+        """
+        return await asyncio.shield(self.task)
+
+    def headers(self, joined: bool) -> Dict[str, str]:
+        """Response headers telling a caller which run answered it"""
+        return {"X-Job-Id": self.job_id, "Idempotent-Replayed": str(joined).lower()}
+
+
+class InFlightRuns:
+    """
+    Registry deduplicating expensive runs by idempotency key.
+
+    A request carrying an Idempotency-Key header is keyed by that header;
+    otherwise by a fingerprint of its normalized inputs and of every option
+    that changes the result. While a run is in flight, and for window_seconds
+    after it succeeded, identical requests attach to it instead of starting
+    another one. Failed runs are forgotten right away so a retry starts afresh.
+
+    Runs are asyncio tasks, so the registry belongs to the API's event loop.
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._by_key: Dict[Tuple[str, str], RunJob] = {}
+        self._by_id: Dict[str, RunJob] = {}
+
+    def _purge(self):
+        now = time.monotonic()
+        for job in [
+            job for job in self._by_id.values() if job.expires_at and job.expires_at <= now
+        ]:
+            del self._by_id[job.job_id]
+            if self._by_key.get((job.kind, job.key)) is job:
+                del self._by_key[(job.kind, job.key)]
+
+    def _finished(self, job: RunJob):
+        job.finished_at = datetime.now(timezone.utc)
+        job.expires_at = time.monotonic() + self.window_seconds
+        if job.status == JobStatus.FAILED and self._by_key.get((job.kind, job.key)) is job:
+            del self._by_key[(job.kind, job.key)]
+
+    def join_or_start(
+        self,
+        kind: str,
+        start: Callable[[], Awaitable[Any]],
+        *parts: str,
+        options: Optional[Dict[str, Any]] = None,
+        refresh: bool = False,
+        idempotency_key: Optional[str] = None,
+    ) -> Tuple[RunJob, bool]:
+        """
+        Attach to an identical run or start a new one.
+
+        Args:
+            kind (str): Kind of run, e.g. "market_analysis"
+            start (Callable[[], Awaitable[Any]]): Coroutine function, or function
+                returning a task, performing the run; it is called right away, so
+                it may raise to refuse the run
+            *parts (str): Inputs identifying the run, normalized for the fingerprint
+            options (Dict[str, Any], optional): Settings that change the result,
+                e.g. the deadline or run id, also part of the fingerprint
+            refresh (bool): The caller wants a new report, so only a run still
+                in flight is joined, never one that already finished
+            idempotency_key (str, optional): Client supplied key replacing the fingerprint
+
+        Returns:
+            Tuple[RunJob, bool]: The run and whether the caller joined an existing one
+
+        Raises:
+            IdempotencyConflictError: If the key was used for different inputs
+        """
+        self._purge()
+        # Options are hashed as given: run ids, unlike queries, are case-sensitive
+        settings = json.dumps({**(options or {}), "refresh": refresh}, sort_keys=True)
+        fingerprint = (
+            lookup_key(*parts) + hashlib.sha256(settings.encode("utf-8")).hexdigest()
+        )
+        key = f"key:{idempotency_key}" if idempotency_key else f"query:{fingerprint}"
+
+        job = self._by_key.get((kind, key))
+        if job is not None:
+            if job.fingerprint != fingerprint:
+                raise IdempotencyConflictError(
+                    f"Idempotency-Key '{idempotency_key}' was already used "
+                    "for a different request"
+                )
+            # A replayed key returns its run; a refresh does not reuse a stale one
+            if idempotency_key or not (refresh and job.task.done()):
+                return job, True
+
+        job = RunJob(kind, key, fingerprint, asyncio.ensure_future(start()))
+        job.task.add_done_callback(lambda task: self._finished(job))
+        self._by_key[(kind, key)] = job
+        self._by_id[job.job_id] = job
+        return job, False
+
+    def get(self, job_id: str) -> Optional[RunJob]:
+        """Look a run up by its job id"""
+        self._purge()
+        return self._by_id.get(job_id)
+
+
+_inflight_runs: Optional[InFlightRuns] = None
+_inflight_runs_lock = threading.Lock()
+
+
+def get_inflight_runs() -> InFlightRuns:
+    """Process-wide registry of deduplicated runs"""
+    global _inflight_runs
+    with _inflight_runs_lock:
+        if _inflight_runs is None:
+            _inflight_runs = InFlightRuns(get_settings().IDEMPOTENCY_WINDOW_SECONDS)
+        return _inflight_runs
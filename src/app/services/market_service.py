@@ -0,0 +1,166 @@
+import asyncio
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.app.models.market import (
+    MarketAnalysis,
+    MarketSearchResult,
+    ResearchQuestion,
+)
+from src.app.services.blob_service import get_blob_store
+from src.app.services.search_service import (
+    MARKET_REPORT,
+    MARKET_SEARCH_TEXT,
+    index_documents,
+    remove_documents,
+    text_of,
+)
+from src.app.utils.helpers import lookup_key
+
+
+def search_texts(report) -> List[Tuple[str, str]]:
+    """Search query and full raw text of every search result, read from the blob store"""
+    blobs = get_blob_store()
+    return [
+        (query, text_of(blobs.resolve(result)))
+        for query, result in report.search_results.items()
+    ]
+
+
+def save_market_analysis(
+    db: Session,
+    report,
+    user_id: Optional[int] = None,
+    texts: Optional[List[Tuple[str, str]]] = None,
+) -> MarketAnalysis:
+    """
+    Persist a market analysis report, its questions and search results in one transaction.
+
+    Args:
+        db (Session): Database session
+        report (MarketAnalysisReport): Report to store
+        user_id (int, optional): Owner of the report
+        texts (List[Tuple[str, str]], optional): Result of search_texts(report),
+            read beforehand by callers that must not block on file reads
+
+    Returns:
+        MarketAnalysis: The stored analysis row
+    """
+    analysis = MarketAnalysis(
+        user_id=user_id,
+        query=report.original_query,
+        lookup_key=lookup_key(report.original_query),
+        comprehensive_report=report.comprehensive_report,
+        partial=report.partial,
+    )
+    if texts is None:
+        texts = search_texts(report)
+    try:
+        # Only the latest report of a query stays searchable
+        superseded = db.scalars(
+            select(MarketAnalysis.id).where(
+                MarketAnalysis.lookup_key == analysis.lookup_key
+            )
+        ).all()
+        remove_documents(db, [MARKET_REPORT, MARKET_SEARCH_TEXT], superseded)
+        db.add(analysis)
+        db.flush()
+        # One executemany per child table instead of a row-by-row add
+        questions = [
+            {"analysis_id": analysis.id, "position": position, "question": question}
+            for position, question in enumerate(report.problem_breakdown.questions)
+        ]
+        if questions:
+            db.execute(insert(ResearchQuestion), questions)
+        search_results = [
+            {"analysis_id": analysis.id, "search_query": query, "result": result}
+            for query, result in report.search_results.items()
+        ]
+        if search_results:
+            db.execute(insert(MarketSearchResult), search_results)
+        index_documents(
+            db,
+            [
+                {
+                    "kind": MARKET_REPORT,
+                    "ref_id": analysis.id,
+                    "title": report.original_query,
+                    "body": report.comprehensive_report,
+                }
+            ]
+            + [
+                {
+                    "kind": MARKET_SEARCH_TEXT,
+                    "ref_id": analysis.id,
+                    "title": title,
+                    "body": body,
+                }
+                for title, body in texts
+            ],
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return analysis
+
+
+def load_market_analysis(db: Session, query: str):
+    """
+    Return the latest complete report stored for a query.
+
+    Args:
+        db (Session): Database session
+        query (str): Market research query
+
+    Returns:
+        Optional[MarketAnalysisReport]: Stored report, or None if there is none
+    """
+    from src.app.routers.market_analysis import MarketAnalysisReport, ProblemBreakdown
+
+    analysis = db.scalars(
+        select(MarketAnalysis)
+        .where(
+            MarketAnalysis.lookup_key == lookup_key(query),
+            MarketAnalysis.partial.is_(False),
+        )
+        .order_by(MarketAnalysis.created_at.desc(), MarketAnalysis.id.desc())
+        .limit(1)
+    ).first()
+    if analysis is None:
+        return None
+
+    questions = db.scalars(
+        select(ResearchQuestion.question)
+        .where(ResearchQuestion.analysis_id == analysis.id)
+        .order_by(ResearchQuestion.position)
+    ).all()
+    search_results = db.scalars(
+        select(MarketSearchResult)
+        .where(MarketSearchResult.analysis_id == analysis.id)
+        .order_by(MarketSearchResult.id)
+    ).all()
+    return MarketAnalysisReport(
+        original_query=analysis.query,
+        problem_breakdown=ProblemBreakdown(questions=list(questions)),
+        search_results={row.search_query: row.result for row in search_results},
+        comprehensive_report=analysis.comprehensive_report,
+        partial=analysis.partial,
+    )
+
+
+async def asave_market_analysis(
+    db: AsyncSession, report, user_id: Optional[int] = None
+) -> MarketAnalysis:
+    """Async version of save_market_analysis"""
+    # Blob files are read in a worker thread, not on the event loop
+    texts = await asyncio.to_thread(search_texts, report)
+    return await db.run_sync(save_market_analysis, report, user_id, texts)
+
+
+async def aload_market_analysis(db: AsyncSession, query: str):
+    """Async version of load_market_analysis"""
+    return await db.run_sync(load_market_analysis, query)
@@ -0,0 +1,145 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from src.app.config import get_settings
+from src.app.llm import LiteLLMKit
+from src.app.schemas.llm import ChatRequest, Message
+
+logger = logging.getLogger(__name__)
+
+# Takes the current summary and the turns to fold into it, returns the new summary
+Summarizer = Callable[[str, List[Message]], str]
+
+# Summaries are written off the request path, one at a time per process
+_summary_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chat-summary")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, about four characters per token for English text"""
+    return len(text) // 4 + 1
+
+
+def llm_summarizer(llm: LiteLLMKit) -> Summarizer:
+    """Summarizer folding older chat turns into the running summary with an LLM"""
+
+    def summarize(summary: str, turns: List[Message]) -> str:
+        transcript = "\n".join(f"{turn.role}: {turn.content}" for turn in turns)
+        prompt = f"""
+        Update the summary of a conversation about market insights reports.
+
+        Current summary:
+        {summary or "(empty)"}
+
+        New turns:
+        {transcript}
+
+        Return a concise summary, at most 200 words, that keeps the user's
+        goals, the facts and figures discussed and any decisions or open
+        questions. Return only the summary.
+        """
+        return llm.generate(ChatRequest(messages=[Message(role="user", content=prompt)]))
+
+    return summarize
+
+
+class ConversationMemory:
+    """
+    Chat history that keeps recent turns verbatim and older ones as a summary.
+
+    Once more than recent_turns exchanges are held, the oldest are folded
+    into a rolling summary on a background thread, so a reply never waits on
+    the summarizer. Every request is built to fit token_budget: the system
+    prompt and question always go in, then the summary, then as many recent
+    turns as still fit, newest first.
+    """
+
+    def __init__(
+        self,
+        summarizer: Summarizer,
+        recent_turns: Optional[int] = None,
+        token_budget: Optional[int] = None,
+    ):
+        """
+        Args:
+            summarizer (Summarizer): Folds turns into the summary
+            recent_turns (int, optional): Exchanges kept verbatim.
+                Defaults to CHAT_MEMORY_RECENT_TURNS.
+            token_budget (int, optional): Estimated tokens allowed per request.
+                Defaults to CHAT_TOKEN_BUDGET.
+        """
+        settings = get_settings()
+        self.summarizer = summarizer
+        self.recent_turns = recent_turns or settings.CHAT_MEMORY_RECENT_TURNS
+        self.token_budget = token_budget or settings.CHAT_TOKEN_BUDGET
+
+        self.summary = ""
+        self.turns: List[Message] = []
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+
+    def add_exchange(self, question: str, answer: str):
+        """Record a question and its answer, compacting older turns if needed"""
+        with self._lock:
+            self.turns.append(Message(role="user", content=question))
+            self.turns.append(Message(role="assistant", content=answer))
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        with self._lock:
+            if self._pending is not None or len(self.turns) <= 2 * self.recent_turns:
+                return
+            older = self.turns[: len(self.turns) - 2 * self.recent_turns]
+            summary = self.summary
+            self._pending = _summary_executor.submit(self.summarizer, summary, older)
+        self._pending.add_done_callback(lambda future: self._compacted(future, older))
+
+    def _compacted(self, future: Future, older: List[Message]):
+        error = future.exception()
+        if error is not None:
+            # The turns stay verbatim and the next exchange tries again
+            logger.warning("Failed to summarize chat history: %s", error)
+        with self._lock:
+            self._pending = None
+            if error is not None:
+                return
+            self.summary = future.result()
+            # Older turns are always the head of the list, later turns only append
+            del self.turns[: len(older)]
+        self._maybe_compact()
+
+    def messages(self, system_prompt: str, question: str) -> List[Message]:
+        """
+        Messages for the next request, trimmed to the token budget.
+
+        Turns waiting to be summarized are still included verbatim while they
+        fit, so nothing is lost before the summary catches up.
+        """
+        with self._lock:
+            summary, turns = self.summary, list(self.turns)
+
+        remaining = self.token_budget - estimate_tokens(system_prompt) - estimate_tokens(
+            question
+        )
+        if summary and estimate_tokens(summary) <= remaining:
+            system_prompt = f"{system_prompt}\n\nConversation so far:\n{summary}"
+            remaining -= estimate_tokens(summary)
+
+        history: List[Message] = []
+        for turn in reversed(turns):
+            cost = estimate_tokens(turn.content)
+            if cost > remaining:
+                break
+            history.append(turn)
+            remaining -= cost
+        history.reverse()
+        # Never start the history with a dangling answer
+        if history and history[0].role == "assistant":
+            history.pop(0)
+
+        return [
+            Message(role="system", content=system_prompt),
+            *history,
+            Message(role="user", content=question),
+        ]
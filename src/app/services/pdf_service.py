@@ -0,0 +1,251 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+from xml.sax.saxutils import escape
+
+from pydantic import BaseModel
+
+from src.app.config import get_settings
+from src.app.services.blob_service import TextRef
+from src.app.services.chart_service import get_chart_renderer, trend_chart
+from src.app.services.retrieval_service import SKIPPED_KEYS
+from src.app.utils.background import ProgressCallback
+
+# Reports of a session in the order they appear in the PDF, with their titles
+PDF_SECTIONS = {
+    "customer_discovery": "Customer Discovery Report",
+    "market_analysis": "Market Analysis Report",
+    "market_expansion": "Market Expansion Strategy",
+    "product_evolution": "Product Evolution Strategy",
+}
+
+# Bumped whenever the layout changes, so cached PDFs are regenerated
+PDF_LAYOUT_VERSION = 1
+
+# Heading style by nesting depth; deeper entries use a bold label instead
+HEADING_STYLES = ["Heading1", "Heading2", "Heading3", "Heading4"]
+
+
+def _as_data(report: Any) -> Any:
+    return report.model_dump(mode="json") if isinstance(report, BaseModel) else report
+
+
+def report_digest(reports: Dict[str, Any]) -> str:
+    """SHA-256 of the reports' canonical JSON, the cache key of their PDF"""
+    data = {name: _as_data(reports.get(name)) for name in PDF_SECTIONS}
+    canonical = json.dumps(
+        [PDF_LAYOUT_VERSION, data], sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _label(key: Any) -> str:
+    return str(key).replace("_", " ").strip().capitalize()
+
+
+def _is_text_ref(value: Any) -> bool:
+    return isinstance(value, dict) and set(value) == set(TextRef.model_fields)
+
+
+class _StoryBuilder:
+    """Turns report data into reportlab flowables, one section at a time"""
+
+    def __init__(self, styles, width: float):
+        from reportlab.lib.styles import ParagraphStyle
+
+        self.styles = styles
+        self.width = width
+        self.bullet = ParagraphStyle("ReportBullet", parent=styles["Normal"], leftIndent=12)
+
+    def heading(self, text: str, depth: int):
+        from reportlab.platypus import Paragraph
+
+        if depth < len(HEADING_STYLES):
+            return Paragraph(escape(text), self.styles[HEADING_STYLES[depth]])
+        return Paragraph(f"<b>{escape(text)}</b>", self.styles["Normal"])
+
+    def text(self, text: str) -> Iterable:
+        """Paragraphs of a long text, with markdown headings and bullets kept"""
+        from reportlab.platypus import Paragraph
+
+        for block in re.split(r"\n\s*\n", text.strip()):
+            for line in block.splitlines() or [block]:
+                line = line.strip()
+                if not line:
+                    continue
+                heading = re.match(r"(#{1,6})\s+(.*)", line)
+                bullet = re.match(r"[-*•]\s+(.*)", line)
+                if heading:
+                    yield Paragraph(
+                        f"<b>{escape(heading.group(2).strip('*'))}</b>", self.styles["Normal"]
+                    )
+                elif bullet:
+                    yield Paragraph(f"• {escape(bullet.group(1))}", self.bullet)
+                else:
+                    yield Paragraph(escape(line), self.styles["Normal"])
+
+    def bullets(self, items: List[Any]) -> Iterable:
+        from reportlab.platypus import Paragraph
+
+        for item in items:
+            yield Paragraph(f"• {escape(str(item))}", self.bullet)
+
+    def table(self, data: Dict[str, Any]):
+        from reportlab.lib import colors
+        from reportlab.platypus import Paragraph, Table, TableStyle
+
+        rows = [
+            [
+                Paragraph(f"<b>{escape(_label(key))}</b>", self.styles["Normal"]),
+                Paragraph(escape(str(value)), self.styles["Normal"]),
+            ]
+            for key, value in data.items()
+        ]
+        table = Table(rows, colWidths=[self.width * 0.35, self.width * 0.65])
+        table.setStyle(
+            TableStyle(
+                [
+                    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ]
+            )
+        )
+        return table
+
+    def chart(self, chart: Dict[str, Any]):
+        """The chart as an image, taken from the renderer's cache when available"""
+        from reportlab.platypus import Image
+
+        image = get_chart_renderer().render(chart)
+        # Charts are rendered at a 2:1 aspect ratio
+        return Image(io.BytesIO(image), width=self.width, height=self.width / 2)
+
+    def value(self, key: Any, value: Any, depth: int) -> Iterable:
+        """Flowables of one report entry, nested entries under deeper headings"""
+        from reportlab.platypus import Paragraph, Spacer
+
+        if value in (None, "", [], {}) or key in SKIPPED_KEYS or _is_text_ref(value):
+            return
+        if isinstance(value, (int, float)):
+            yield Paragraph(
+                f"<b>{escape(_label(key))}:</b> {escape(str(value))}", self.styles["Normal"]
+            )
+        elif isinstance(value, str):
+            yield self.heading(_label(key), depth)
+            yield from self.text(value)
+        elif isinstance(value, dict):
+            yield self.heading(_label(key), depth)
+            if all(not isinstance(item, (dict, list)) for item in value.values()):
+                yield self.table(value)
+            else:
+                for item_key, item in value.items():
+                    yield from self.value(item_key, item, depth + 1)
+        elif isinstance(value, list):
+            if all(_is_text_ref(item) for item in value):
+                return
+            yield self.heading(_label(key), depth)
+            if all(not isinstance(item, (dict, list)) for item in value):
+                yield from self.bullets(value)
+            else:
+                for index, item in enumerate(value, start=1):
+                    name = item.get("name") if isinstance(item, dict) else None
+                    title = f"{index}. {name}" if name else f"{_label(key)} {index}"
+                    if isinstance(item, dict):
+                        yield self.heading(title, depth + 1)
+                        for item_key, entry in item.items():
+                            if item_key != "name":
+                                yield from self.value(item_key, entry, depth + 2)
+                    else:
+                        yield from self.value(title, item, depth + 1)
+        yield Spacer(1, 6)
+
+    def section(self, name: str, report: Any) -> Iterable:
+        """Flowables of a whole report, its charts first"""
+        from reportlab.platypus import PageBreak, Paragraph
+
+        data = _as_data(report)
+        yield self.heading(PDF_SECTIONS[name], 1)
+        trend = getattr(report, "user_adoption_trend", None)
+        if trend is not None:
+            yield self.chart(trend_chart("User Adoption Trend", trend))
+            yield Paragraph(escape(trend.reasoning), self.styles["Italic"])
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key != "user_adoption_trend":
+                    yield from self.value(key, value, 2)
+        yield PageBreak()
+
+
+def build_pdf(
+    reports: Dict[str, Any],
+    output_path: str,
+    on_progress: Optional[ProgressCallback] = None,
+):
+    """
+    Write the reports to a PDF.
+
+    Each report is laid out from its fields, section by section, rather
+    than as one paragraph of its repr; chart images come from the shared
+    chart renderer, so a chart already shown by the app is not drawn again.
+
+    Args:
+        reports (Dict[str, Any]): Session reports keyed as in PDF_SECTIONS
+        output_path (str): Where the PDF is written
+        on_progress (ProgressCallback, optional): Called with "section" and
+            the title of each report once it is laid out
+    """
+    # reportlab is only needed on export, so keep it out of app startup
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+    doc = SimpleDocTemplate(output_path, pagesize=letter, title="Market Insights Report")
+    builder = _StoryBuilder(getSampleStyleSheet(), doc.width)
+
+    story = [Paragraph("Market Insights Report", builder.styles["Title"]), Spacer(1, 12)]
+    for name, title in PDF_SECTIONS.items():
+        report = reports.get(name)
+        if report is None:
+            continue
+        story.extend(builder.section(name, report))
+        if on_progress:
+            on_progress("section", title)
+    doc.build(story)
+
+
+def export_pdf(
+    reports: Dict[str, Any],
+    cache_dir: Optional[str] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Path:
+    """
+    PDF of the reports, generated once per distinct set of reports.
+
+    Args:
+        reports (Dict[str, Any]): Session reports keyed as in PDF_SECTIONS
+        cache_dir (str, optional): PDF directory. Defaults to PDF_CACHE_DIR.
+        on_progress (ProgressCallback, optional): Passed on to build_pdf
+
+    Returns:
+        Path: The cached PDF, named after the reports' digest
+    """
+    root = Path(cache_dir or get_settings().PDF_CACHE_DIR)
+    path = root / f"{report_digest(reports)}.pdf"
+    if path.exists():
+        return path
+
+    root.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".tmp")
+    os.close(fd)
+    try:
+        build_pdf(reports, tmp_path, on_progress)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return path
@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Type
+
+from pydantic import BaseModel, Field
+
+from src.app.budget import (
+    BudgetExceededError,
+    BudgetSummary,
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+)
+from src.app.config import get_settings
+from src.app.db import get_session_factory
+from src.app.dependencies import ServiceContainer, get_service_container
+from src.app.services.customer_service import save_customer_discovery
+from src.app.services.expansion_service import save_market_expansion
+from src.app.services.market_service import save_market_analysis
+from src.app.services.checkpoint_service import (
+    MISSING,
+    CheckpointStore,
+    NullCheckpointStore,
+)
+from src.app.utils.background import ProgressCallback
+from src.app.routers.customer_discovery import (
+    CustomerDiscoverer,
+    CustomerDiscoveryReport,
+)
+from src.app.routers.market_analysis import MarketAnalyzer, MarketAnalysisReport
+from src.app.routers.market_expansion import MarketExpander, MarketExpansionStrategy
+from src.app.routers.product_evolution import (
+    ProductEvolver,
+    ProductEvolutionStrategy,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class StageContext:
+    """Per-run resources handed to every stage"""
+
+    def __init__(
+        self,
+        checkpoint: CheckpointStore,
+        budget: Optional[RunBudget],
+        services: Optional[ServiceContainer] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ):
+        self.checkpoint = checkpoint
+        self.budget = budget
+        self.services = services or get_service_container()
+        # Only the discovery and analysis stages report progress within a stage
+        self.on_progress = on_progress
+
+    def analyzer_options(self) -> Dict[str, Any]:
+        """Keyword arguments accepted by every analyzer constructor"""
+        return {
+            "checkpoint": self.checkpoint,
+            "budget": self.budget,
+            "services": self.services,
+        }
+
+
+StageCallback = Callable[[str, Any], None]
+StageRunner = Callable[[str, Dict[str, Any], StageContext], Any]
+
+
+class PipelineStage:
+    """A single named step of the market intelligence pipeline"""
+
+    def __init__(
+        self,
+        name: str,
+        run: StageRunner,
+        depends_on: Iterable[str] = (),
+        output_model: Optional[Type[BaseModel]] = None,
+        optional: bool = False,
+    ):
+        """
+        Args:
+            name (str): Unique stage name, also the key of its result
+            run (Callable): Blocking function receiving the domain, the results
+                of the stages it depends on and the stage's context
+            depends_on (Iterable[str]): Names of the stages that must finish first
+            output_model (Type[BaseModel], optional): Model used to restore a
+                checkpointed stage output
+            optional (bool): Whether the stage is dropped when the run budget is
+                running low
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.output_model = output_model
+        self.optional = optional
+
+
+class PipelineResult(BaseModel):
+    """Reports produced by a single pipeline run"""
+
+    domain: str
+    run_id: Optional[str] = None
+    customer_discovery: Optional[CustomerDiscoveryReport] = None
+    market_analysis: Optional[MarketAnalysisReport] = None
+    market_expansion: Optional[MarketExpansionStrategy] = None
+    product_evolution: Optional[ProductEvolutionStrategy] = None
+    stage_timings: Dict[str, float] = Field(
+        default_factory=dict, description="Wall-clock seconds spent in each stage"
+    )
+    budget: Optional[BudgetSummary] = None
+    partial: bool = Field(
+        False, description="True when any work was skipped to stay within budget"
+    )
+
+
+def _run_customer_discovery(
+    domain: str, results: Dict[str, Any], context: StageContext
+):
+    return CustomerDiscoverer(
+        domain, on_progress=context.on_progress, **context.analyzer_options()
+    ).discover()
+
+
+def _run_market_analysis(domain: str, results: Dict[str, Any], context: StageContext):
+    return MarketAnalyzer(
+        on_progress=context.on_progress, **context.analyzer_options()
+    ).analyze(domain)
+
+
+def _run_market_expansion(
+    domain: str, results: Dict[str, Any], context: StageContext
+):
+    expander = MarketExpander(
+        results["customer_discovery"],
+        results["market_analysis"],
+        **context.analyzer_options(),
+    )
+    return expander.expand_market()
+
+
+def _run_product_evolution(
+    domain: str, results: Dict[str, Any], context: StageContext
+):
+    evolver = ProductEvolver(
+        results["customer_discovery"],
+        results["market_analysis"],
+        results["market_expansion"],
+        **context.analyzer_options(),
+    )
+    return evolver.generate_product_evolution_strategy()
+
+
+DEFAULT_STAGES = [
+    PipelineStage(
+        "customer_discovery",
+        _run_customer_discovery,
+        output_model=CustomerDiscoveryReport,
+    ),
+    PipelineStage(
+        "market_analysis", _run_market_analysis, output_model=MarketAnalysisReport
+    ),
+    PipelineStage(
+        "market_expansion",
+        _run_market_expansion,
+        depends_on=("customer_discovery", "market_analysis"),
+        output_model=MarketExpansionStrategy,
+    ),
+    PipelineStage(
+        "product_evolution",
+        _run_product_evolution,
+        depends_on=("customer_discovery", "market_analysis", "market_expansion"),
+        output_model=ProductEvolutionStrategy,
+        optional=True,
+    ),
+]
+
+
+_stage_slots: Optional[threading.BoundedSemaphore] = None
+_stage_slots_lock = threading.Lock()
+
+
+def _get_stage_slots() -> threading.BoundedSemaphore:
+    """Process-wide limit on stages running at once, shared by every pipeline run"""
+    global _stage_slots
+    with _stage_slots_lock:
+        if _stage_slots is None:
+            _stage_slots = threading.BoundedSemaphore(
+                get_settings().PIPELINE_MAX_CONCURRENT_STAGES
+            )
+        return _stage_slots
+
+
+class PipelineOrchestrator:
+    """Runs pipeline stages as a DAG, overlapping stages that do not depend on each other"""
+
+    def __init__(self, stages: Optional[List[PipelineStage]] = None):
+        self.stages = {stage.name: stage for stage in (stages or DEFAULT_STAGES)}
+        self._validate()
+
+    def _validate(self):
+        """Reject unknown dependencies and dependency cycles"""
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(
+                        f"Stage '{stage.name}' depends on unknown stage '{dependency}'"
+                    )
+
+        visiting, visited = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at stage '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def resolve(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """Return the target stages plus everything they transitively depend on"""
+        if targets is None:
+            return list(self.stages)
+
+        required: List[str] = []
+
+        def collect(name: str):
+            if name not in self.stages:
+                raise ValueError(
+                    f"Unknown stage: {name}. Available stages: {list(self.stages)}"
+                )
+            if name in required:
+                return
+            for dependency in self.stages[name].depends_on:
+                collect(dependency)
+            required.append(name)
+
+        for target in targets:
+            collect(target)
+        return required
+
+    def _execute_stage(
+        self,
+        stage: PipelineStage,
+        domain: str,
+        results: Dict[str, Any],
+        context: StageContext,
+    ) -> Any:
+        """Run a blocking stage once a global concurrency slot is free"""
+        checkpoint = context.checkpoint
+        key = f"stage/{stage.name}"
+
+        # A finished stage is restored without waiting for a concurrency slot
+        output = checkpoint.restore(key, stage.output_model)
+        if output is not MISSING:
+            return output
+
+        stage_context = StageContext(
+            checkpoint.scoped(stage.name),
+            context.budget,
+            context.services,
+            context.on_progress,
+        )
+        with _get_stage_slots():
+            return checkpoint.cached(
+                key,
+                lambda: stage.run(domain, results, stage_context),
+                model=stage.output_model,
+            )
+
+    def _should_skip(
+        self, stage: PipelineStage, results: Dict[str, Any], context: StageContext
+    ) -> bool:
+        """Skip stages whose inputs were skipped, and optional stages on a low budget"""
+        if any(results.get(name) is None for name in stage.depends_on):
+            return True
+        if context.checkpoint.has(f"stage/{stage.name}"):
+            return False
+        return (
+            stage.optional
+            and context.budget is not None
+            and not context.budget.allows(CallPriority.OPTIONAL)
+        )
+
+    async def run(
+        self,
+        domain: str,
+        targets: Optional[Iterable[str]] = None,
+        on_stage_complete: Optional[StageCallback] = None,
+        run_id: Optional[str] = None,
+        budget: Optional[RunBudget] = None,
+        services: Optional[ServiceContainer] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute the requested stages, starting each as soon as its dependencies finish.
+
+        Args:
+            domain (str): Domain or industry being researched
+            targets (Iterable[str], optional): Stages to produce. Defaults to all stages.
+            on_stage_complete (Callable, optional): Called with the stage name and
+                result on the event loop thread whenever a stage finishes
+            run_id (str, optional): Checkpoint every unit of work under this id and
+                resume from whatever a previous run with the same id completed
+            budget (RunBudget, optional): Limit on the LLM spend of this run
+            services (ServiceContainer, optional): Shared clients handed to every
+                analyzer. Defaults to the process-wide container.
+            on_progress (Callable, optional): Called from worker threads with the
+                kind and result of every niche, year and question that finishes
+
+        Returns:
+            Dict[str, Any]: Stage results keyed by stage name, plus stage timings
+                under "stage_timings"
+        """
+        context = StageContext(
+            CheckpointStore(run_id) if run_id else NullCheckpointStore(),
+            budget,
+            services,
+            on_progress,
+        )
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: PipelineStage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+
+            if self._should_skip(stage, results, context):
+                results[stage.name] = None
+                if context.budget is not None:
+                    context.budget.skip(f"stage: {stage.name}")
+                return None
+
+            started = time.perf_counter()
+            try:
+                result = await asyncio.to_thread(
+                    self._execute_stage, stage, domain, dict(results), context
+                )
+            except BudgetExceededError:
+                # A refused essential call drops this stage and its dependents,
+                # while the stages that completed are still returned
+                results[stage.name] = None
+                if context.budget is not None:
+                    context.budget.skip(f"stage: {stage.name}")
+                return None
+            timings[stage.name] = time.perf_counter() - started
+            results[stage.name] = result
+
+            if on_stage_complete:
+                on_stage_complete(stage.name, result)
+            return result
+
+        # resolve() yields dependencies before dependents, so every awaited task exists
+        for name in self.resolve(targets):
+            tasks[name] = asyncio.create_task(run_stage(self.stages[name]))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+        results["stage_timings"] = timings
+        return results
+
+
+async def run_pipeline(
+    domain: str,
+    targets: Optional[Iterable[str]] = None,
+    on_stage_complete: Optional[StageCallback] = None,
+    run_id: Optional[str] = None,
+    budget: Optional[RunBudget] = None,
+    services: Optional[ServiceContainer] = None,
+    on_progress: Optional[ProgressCallback] = None,
+) -> PipelineResult:
+    """Single entry point for running the market intelligence pipeline"""
+    if budget is None:
+        budget = default_run_budget()
+
+    results = await PipelineOrchestrator().run(
+        domain,
+        targets=targets,
+        on_stage_complete=on_stage_complete,
+        run_id=run_id,
+        budget=budget,
+        services=services,
+        on_progress=on_progress,
+    )
+    summary = budget.summary() if budget else None
+    result = PipelineResult(
+        domain=domain,
+        run_id=run_id,
+        budget=summary,
+        partial=summary is not None and summary.partial,
+        **results,
+    )
+    await asyncio.to_thread(persist_pipeline_result, result)
+    return result
+
+
+def persist_pipeline_result(result: PipelineResult):
+    """Store the reports of a pipeline run, keeping the run's result if the write fails"""
+    try:
+        with get_session_factory()() as db:
+            if result.customer_discovery:
+                save_customer_discovery(db, result.customer_discovery)
+            if result.market_analysis:
+                save_market_analysis(db, result.market_analysis)
+                if result.market_expansion:
+                    save_market_expansion(
+                        db,
+                        result.market_expansion,
+                        result.market_analysis.original_query,
+                    )
+    except Exception:
+        logger.exception("Failed to persist pipeline reports for %s", result.domain)
@@ -0,0 +1,68 @@
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app.db import Base
+
+ModelT = TypeVar("ModelT", bound=Base)
+
+
+class AsyncRepository(Generic[ModelT]):
+    """Async data access for a single ORM model"""
+
+    def __init__(self, db: AsyncSession, model: Type[ModelT]):
+        self.db = db
+        self.model = model
+
+    async def get(self, id: int) -> Optional[ModelT]:
+        """Fetch a row by primary key"""
+        return await self.db.get(self.model, id)
+
+    async def list(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        **filters: Any,
+    ) -> List[ModelT]:
+        """
+        Fetch the newest rows matching the given column values.
+
+        Args:
+            limit (int): Maximum number of rows
+            offset (int): Number of rows to skip
+            **filters: Column equality filters, e.g. user_id=1
+
+        Returns:
+            List[ModelT]: Matching rows, newest first
+        """
+        statement = (
+            select(self.model)
+            .filter_by(**filters)
+            .order_by(self.model.created_at.desc(), self.model.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        return list(await self.db.scalars(statement))
+
+    async def add(self, **fields: Any) -> ModelT:
+        """Insert and commit a single row"""
+        row = self.model(**fields)
+        self.db.add(row)
+        await self.db.commit()
+        return row
+
+    async def add_all(self, rows: Sequence[Dict[str, Any]]):
+        """Insert many rows with one executemany and commit them together"""
+        if rows:
+            await self.db.execute(insert(self.model), list(rows))
+            await self.db.commit()
+
+    async def delete(self, id: int) -> bool:
+        """Delete a row by primary key, returning whether it existed"""
+        row = await self.get(id)
+        if row is None:
+            return False
+        await self.db.delete(row)
+        await self.db.commit()
+        return True
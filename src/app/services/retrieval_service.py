@@ -0,0 +1,305 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.app.services.blob_service import TextRef
+from src.app.services.document_service import STOPWORDS
+
+# Report entries that are not worth sending to a chat model
+SKIPPED_KEYS = {"raw_search_results", "partial"}
+
+# Report passages sent with each chat turn
+CHAT_PASSAGES = 6
+
+# Keys of the session's report dictionary that hold the four reports
+REPORT_KEYS = (
+    "customer_discovery",
+    "market_analysis",
+    "market_expansion",
+    "product_evolution",
+)
+
+
+class ReportChunk(BaseModel):
+    """A passage of a report that can be retrieved for a chat turn"""
+
+    report: str
+    section: str
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased significant words of a text, duplicates kept"""
+    return [
+        word
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if len(word) > 1 and word not in STOPWORDS
+    ]
+
+
+def _as_data(report: Any) -> Any:
+    return report.model_dump() if isinstance(report, BaseModel) else report
+
+
+def _is_text_ref(value: Any) -> bool:
+    return isinstance(value, dict) and set(value) == set(TextRef.model_fields)
+
+
+def _leaves(value: Any, path: str) -> Iterable[Tuple[str, str]]:
+    """(section path, text) of every scalar in a JSON-like report"""
+    if _is_text_ref(value):
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key not in SKIPPED_KEYS:
+                yield from _leaves(item, f"{path} > {key}" if path else str(key))
+    elif isinstance(value, list):
+        if value and all(isinstance(item, str) for item in value):
+            yield path, ", ".join(value)
+        else:
+            for index, item in enumerate(value):
+                yield from _leaves(item, f"{path} [{index + 1}]")
+    elif value not in (None, ""):
+        yield path, str(value)
+
+
+def _split(text: str, max_chars: int) -> List[str]:
+    """Split a long text at paragraph, then sentence, boundaries"""
+    if len(text) <= max_chars:
+        return [text]
+    pieces = re.split(r"\n\s*\n|(?<=[.!?])\s+", text)
+    parts, current = [], ""
+    for piece in pieces:
+        while len(piece) > max_chars:
+            parts.append(piece[:max_chars])
+            piece = piece[max_chars:]
+        if current and len(current) + len(piece) + 1 > max_chars:
+            parts.append(current)
+            current = ""
+        current = f"{current} {piece}" if current else piece
+    if current:
+        parts.append(current)
+    return parts
+
+
+def chunk_reports(reports: Dict[str, Any], max_chars: int = 1200) -> List[ReportChunk]:
+    """
+    Break the reports into passages of at most about max_chars.
+
+    Short entries of the same section are packed together; long texts such
+    as the comprehensive report are split at paragraph and sentence
+    boundaries. Raw search texts are left out.
+    """
+    chunks: List[ReportChunk] = []
+    for name in REPORT_KEYS:
+        data = _as_data(reports.get(name))
+        if not data:
+            continue
+
+        section, buffer = None, ""
+
+        def flush():
+            if buffer:
+                chunks.append(ReportChunk(report=name, section=section, text=buffer))
+
+        for path, text in _leaves(data, ""):
+            top = path.split(" > ")[0].split(" [")[0]
+            line = f"{path}: {text}"
+            if top != section or len(buffer) + len(line) + 1 > max_chars:
+                flush()
+                section, buffer = top, ""
+            for part in _split(line, max_chars):
+                if buffer and len(buffer) + len(part) + 1 > max_chars:
+                    flush()
+                    buffer = ""
+                buffer = f"{buffer}\n{part}" if buffer else part
+        flush()
+    return chunks
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedding by feature hashing.
+
+    Words and word pairs are hashed into a fixed number of signed buckets,
+    which captures enough topical overlap to complement lexical ranking
+    without a model download or an embedding API call per chunk.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+
+    def embed(self, text: str) -> Dict[int, float]:
+        """Sparse, L2-normalized vector of a text"""
+        words = tokenize(text)
+        features = Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+        vector: Dict[int, float] = {}
+        for feature, count in features.items():
+            digest = zlib.crc32(feature.encode("utf-8"))
+            bucket = digest % self.dimensions
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[bucket] = vector.get(bucket, 0.0) + sign * (1 + math.log(count))
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        return {bucket: weight / norm for bucket, weight in vector.items()} if norm else {}
+
+    @staticmethod
+    def similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(weight * b.get(bucket, 0.0) for bucket, weight in a.items())
+
+
+class ReportIndex:
+    """
+    In-memory hybrid index over report chunks.
+
+    Built once per set of reports; a search ranks chunks by a blend of BM25
+    and hashed-embedding similarity, so its cost depends on the number of
+    chunks rather than on the size of a prompt holding every report.
+    """
+
+    def __init__(
+        self,
+        chunks: List[ReportChunk],
+        embedder: Optional[HashingEmbedder] = None,
+        lexical_weight: float = 0.6,
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Args:
+            chunks (List[ReportChunk]): Passages to index
+            embedder (HashingEmbedder, optional): Embedding used for the semantic score
+            lexical_weight (float): Share of the BM25 score in the blended score
+            k1 (float): BM25 term frequency saturation
+            b (float): BM25 length normalization
+        """
+        self.chunks = chunks
+        self.embedder = embedder or HashingEmbedder()
+        self.lexical_weight = lexical_weight
+        self.k1 = k1
+        self.b = b
+
+        self._term_counts = [Counter(tokenize(chunk.text)) for chunk in chunks]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._average_length = (sum(self._lengths) / len(chunks) if chunks else 0.0) or 1.0
+        document_frequency = Counter(
+            term for counts in self._term_counts for term in counts
+        )
+        self._idf = {
+            term: math.log(1 + (len(chunks) - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+        self._vectors = [self.embedder.embed(chunk.text) for chunk in chunks]
+
+    @classmethod
+    def from_reports(cls, reports: Dict[str, Any], **kwargs) -> "ReportIndex":
+        return cls(chunk_reports(reports), **kwargs)
+
+    def _bm25(self, index: int, terms: List[str]) -> float:
+        counts = self._term_counts[index]
+        norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / self._average_length)
+        score = 0.0
+        for term in terms:
+            tf = counts.get(term)
+            if tf:
+                score += self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+        return score
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[ReportChunk, float]]:
+        """
+        Best matching chunks for a query.
+
+        Returns:
+            List[Tuple[ReportChunk, float]]: Up to k chunks with their blended
+                score, best first
+        """
+        if not self.chunks:
+            return []
+        terms = list(dict.fromkeys(tokenize(query)))
+        lexical = [self._bm25(index, terms) for index in range(len(self.chunks))]
+        top_lexical = max(lexical) or 1.0
+        query_vector = self.embedder.embed(query)
+
+        scored = []
+        for index, chunk in enumerate(self.chunks):
+            semantic = self.embedder.similarity(query_vector, self._vectors[index])
+            score = (
+                self.lexical_weight * lexical[index] / top_lexical
+                + (1 - self.lexical_weight) * max(semantic, 0.0)
+            )
+            if score > 0:
+                scored.append((chunk, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+
+def _summary_lines(name: str, data: Dict[str, Any], max_chars: int) -> List[str]:
+    lines = []
+    for key, value in data.items():
+        if key in SKIPPED_KEYS:
+            continue
+        label = f"{name} > {key}"
+        if isinstance(value, str) and value:
+            short = value if len(value) <= max_chars else value[:max_chars] + "..."
+            lines.append(f"{label}: {' '.join(short.split())}")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            lines.append(f"{label}: {value}")
+        elif isinstance(value, list) and value:
+            if all(isinstance(item, str) for item in value):
+                lines.append(f"{label}: {', '.join(value[:8])}")
+            elif all(isinstance(item, dict) and "name" in item for item in value):
+                lines.append(f"{label}: {', '.join(item['name'] for item in value[:10])}")
+    return lines
+
+
+def report_summary(reports: Dict[str, Any], max_chars: int = 400) -> str:
+    """
+    Compact overview of the reports sent with every chat turn: the session's
+    inputs, headline figures and the names of niches, domains and phases.
+    """
+    lines = [
+        f"{label}: {reports[key]}"
+        for key, label in (
+            ("domain", "Domain"),
+            ("problem_statement", "Problem Statement"),
+            ("solution_approach", "Solution Approach"),
+        )
+        if reports.get(key)
+    ]
+    for name in REPORT_KEYS:
+        data = _as_data(reports.get(name))
+        if isinstance(data, dict):
+            lines.extend(_summary_lines(name, data, max_chars))
+    return "\n".join(lines)
+
+
+CHAT_SYSTEM_PROMPT = """
+You are an expert market strategy consultant analyzing the following market insights.
+
+Report Summary:
+{summary}
+
+Report Passages Relevant to the Question:
+{passages}
+
+Base your answer on these passages and the summary; say so when they do not cover the question.
+Provide insightful, strategic, and actionable responses to user queries.
+"""
+
+
+def chat_system_prompt(
+    index: ReportIndex, summary: str, question: str, k: int = CHAT_PASSAGES
+) -> str:
+    """System prompt holding the report summary and the k passages best matching a question"""
+    passages = "\n\n".join(
+        f"[{chunk.report} / {chunk.section}]\n{chunk.text}"
+        for chunk, _ in index.search(question, k=k)
+    )
+    return CHAT_SYSTEM_PROMPT.format(
+        summary=summary, passages=passages or "No passage matched the question."
+    )
@@ -0,0 +1,161 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+SEARCH_TABLE = "report_search"
+
+# Kinds of indexed documents; ref_id points at the parent report row, so every
+# kind belongs to exactly one report table
+MARKET_REPORT = "market_report"
+MARKET_SEARCH_TEXT = "market_search_text"
+NICHE = "niche"
+NICHE_SEARCH_TEXT = "niche_search_text"
+EXPANSION_RATIONALE = "expansion_rationale"
+
+# Filter matching the raw search texts of every report, including those
+# indexed before they were told apart by report table
+SEARCH_TEXT = "search_text"
+KIND_GROUPS = {SEARCH_TEXT: [SEARCH_TEXT, MARKET_SEARCH_TEXT, NICHE_SEARCH_TEXT]}
+
+
+def ensure_search_index(connection: Connection) -> bool:
+    """
+    Create the FTS5 index if the database supports it.
+
+    Args:
+        connection (Connection): Connection to the app database
+
+    Returns:
+        bool: Whether the full-text index is available
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            "kind UNINDEXED, ref_id UNINDEXED, title, body, "
+            "tokenize='porter unicode61')"
+        )
+    )
+    return True
+
+
+def text_of(value: Any) -> str:
+    """Flatten the strings nested in a JSON-like value into one searchable text"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return "\n".join(filter(None, (text_of(item) for item in value.values())))
+    if isinstance(value, (list, tuple)):
+        return "\n".join(filter(None, (text_of(item) for item in value)))
+    return str(value)
+
+
+def index_documents(db: Session, documents: List[Dict[str, Any]]):
+    """
+    Add documents to the full-text index inside the caller's transaction.
+
+    Args:
+        db (Session): Session whose transaction also writes the reports
+        documents (List[Dict[str, Any]]): Rows with kind, ref_id, title and body
+    """
+    documents = [document for document in documents if document["body"]]
+    if not documents or db.get_bind().dialect.name != "sqlite":
+        return
+    db.execute(
+        text(
+            f"INSERT INTO {SEARCH_TABLE} (kind, ref_id, title, body) "
+            "VALUES (:kind, :ref_id, :title, :body)"
+        ),
+        documents,
+    )
+
+
+def remove_documents(db: Session, kinds: List[str], ref_ids: List[int]):
+    """
+    Drop the indexed documents of earlier reports inside the caller's transaction.
+
+    Called before indexing a report that supersedes them, so a re-saved
+    report does not appear twice in search results.
+
+    Args:
+        db (Session): Session whose transaction also writes the reports
+        kinds (List[str]): Kinds indexed for the superseded reports
+        ref_ids (List[int]): Ids of the superseded report rows
+    """
+    if not ref_ids or db.get_bind().dialect.name != "sqlite":
+        return
+    db.execute(
+        text(
+            f"DELETE FROM {SEARCH_TABLE} WHERE kind IN :kinds AND ref_id IN :ref_ids"
+        ).bindparams(
+            bindparam("kinds", expanding=True), bindparam("ref_ids", expanding=True)
+        ),
+        {"kinds": list(kinds), "ref_ids": list(ref_ids)},
+    )
+
+
+def _match_expression(query: str) -> str:
+    """Quote every term so user input is never parsed as FTS5 query syntax"""
+    terms = query.replace('"', " ").split()
+    return " ".join(f'"{term}"' for term in terms)
+
+
+async def search_reports(
+    db: AsyncSession,
+    query: str,
+    kind: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[Dict[str, Any]]:
+    """
+    Rank indexed documents against a query with BM25.
+
+    Args:
+        db (AsyncSession): Database session
+        query (str): Words to search for; every word must match
+        kind (str, optional): Restrict results to one document kind, or to
+            every kind of its group in KIND_GROUPS
+        limit (int): Maximum number of results
+        offset (int): Number of results to skip
+
+    Returns:
+        List[Dict[str, Any]]: Matches, best first, with highlighted snippets
+    """
+    match = _match_expression(query)
+    if not match:
+        return []
+
+    # Titles weigh more than bodies in the ranking
+    statement = (
+        f"SELECT kind, ref_id, title, "
+        f"snippet({SEARCH_TABLE}, 3, '[', ']', '...', 24) AS snippet, "
+        f"bm25({SEARCH_TABLE}, 0, 0, 5.0, 1.0) AS score "
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match "
+    )
+    params = {"match": match, "limit": limit, "offset": offset}
+    if kind:
+        statement += "AND kind IN :kinds "
+        params["kinds"] = KIND_GROUPS.get(kind, [kind])
+    statement += "ORDER BY score LIMIT :limit OFFSET :offset"
+
+    statement = text(statement)
+    if kind:
+        statement = statement.bindparams(bindparam("kinds", expanding=True))
+    rows = await db.execute(statement, params)
+    return [
+        {
+            "kind": row.kind,
+            "ref_id": row.ref_id,
+            "title": row.title,
+            "snippet": row.snippet,
+            # bm25 is lower-is-better; expose higher-is-better scores
+            "score": round(-row.score, 4),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# The app is imported both as "app" (routers, UI) and as "src.app" (services)
+SRC_DIR = Path(__file__).resolve().parents[2]
+ROOT_DIR = SRC_DIR.parent
+for path in (str(SRC_DIR), str(ROOT_DIR)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+# Every file the app writes goes to a scratch directory, set before settings load
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="market-intelligence-tests-"))
+os.environ.update(
+    {
+        "DATABASE_URL": f"sqlite:///{SCRATCH_DIR / 'test.db'}",
+        "CHECKPOINT_DIR": str(SCRATCH_DIR / "checkpoints"),
+        "BLOB_DIR": str(SCRATCH_DIR / "blobs"),
+        "CHART_DIR": str(SCRATCH_DIR / "charts"),
+        "PDF_CACHE_DIR": str(SCRATCH_DIR / "pdf_cache"),
+        "CHART_RENDER_WORKERS": "0",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+    }
+)
+
+from src.app.config import reload_settings  # noqa: E402
+from src.app.dependencies import ServiceContainer  # noqa: E402
+from src.app.services.blob_service import BlobStore  # noqa: E402
+from src.app.services.document_service import DocumentStore  # noqa: E402
+
+reload_settings()
+
+
+def _structured_response(response_format, call_number):
+    """Minimal valid payload for each response model the analyzers ask for"""
+    name = getattr(response_format, "__name__", "")
+    if name == "IdentifyMarketNiche":
+        return {"niches": ["Solo founders", "Agencies", "Enterprise teams"]}
+    if name == "ProblemBreakdown":
+        return {"questions": ["Market size?", "Key competitors?", "Buyer needs?"]}
+    if name in ("MarketTrendVisualization", "UserAdoptionTrend"):
+        return {
+            "x_axis_labels": ["2022", "2023", "2024"],
+            "y_axis_labels": ["Users"],
+            "x_axis_name": "Year",
+            "y_axis_name": "Users",
+            "data": [[10.0, 40.0, 90.0]],
+            "reasoning": "Adoption compounds",
+            "key_insights": ["Growth accelerates"],
+        }
+    if name == "ProductEvolutionStrategy":
+        return {
+            "primary_domain": "test",
+            "phases": [],
+            "overall_vision": "Vision",
+            "long_term_goals": ["Grow"],
+            "competitive_differentiation": {"speed": "fast"},
+        }
+    raise AssertionError(f"No fake response for {name}")
+
+
+class FakeCompletionHandler:
+    """Stands in for litellm: records every call and answers instantly"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _answer(self, model_config, messages, response_format, on_usage, timeout):
+        with self._lock:
+            self.calls.append(
+                SimpleNamespace(
+                    model=model_config.name,
+                    response_format=response_format,
+                    timeout=timeout,
+                    messages=messages,
+                )
+            )
+            call_number = len(self.calls)
+        if self.delay:
+            if timeout is not None and timeout < self.delay:
+                time.sleep(timeout)
+                raise Exception("Request timed out")
+            time.sleep(self.delay)
+        if on_usage:
+            on_usage({"prompt_tokens": 100, "completion_tokens": 50})
+        if response_format is not None:
+            return _structured_response(response_format, call_number)
+        return f"Insight {call_number}\nDetail {call_number}"
+
+    def generate(
+        self, model_config, messages, api_key, response_format=None, on_usage=None, timeout=None
+    ):
+        return self._answer(model_config, messages, response_format, on_usage, timeout)
+
+    async def agenerate(
+        self, model_config, messages, api_key, response_format=None, on_usage=None, timeout=None
+    ):
+        return await asyncio.to_thread(
+            self._answer, model_config, messages, response_format, on_usage, timeout
+        )
+
+    def stream(self, model_config, messages, api_key, on_usage=None, timeout=None):
+        yield from self._answer(model_config, messages, None, on_usage, timeout).split(" ")
+
+    async def astream(self, model_config, messages, api_key, on_usage=None, timeout=None):
+        text = self._answer(model_config, messages, None, on_usage, timeout)
+        for word in text.split(" "):
+            yield word
+
+
+class FakeAPIKeyManager:
+    def get_key(self, provider):
+        return "test-key"
+
+
+class FakeExa:
+    """Exa client returning two pages per query"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.queries = []
+
+    def search_and_contents(self, query, **kwargs):
+        self.queries.append(query)
+        if self.fail:
+            raise Exception("Exa unavailable")
+        slug = abs(hash(query)) % 10**8
+        return SimpleNamespace(
+            results=[
+                SimpleNamespace(
+                    url=f"https://example.com/{slug}/{n}",
+                    title=f"Page {n} about {query[:40]}",
+                    text=f"Page {n} text about {query}. " * 20,
+                )
+                for n in range(2)
+            ]
+        )
+
+
+class FakeJina:
+    base_search_url = "https://s.jina.ai/"
+
+    def __init__(self):
+        self.queries = []
+
+    def search(self, query):
+        self.queries.append(query)
+        return f"Jina results for {query}"
+
+
+@pytest.fixture
+def completion_handler():
+    return FakeCompletionHandler()
+
+
+@pytest.fixture
+def services(tmp_path, completion_handler):
+    """Service container whose external clients are fakes and whose stores are scratch"""
+    container = ServiceContainer()
+    container.api_key_manager = FakeAPIKeyManager()
+    container.completion_handler = completion_handler
+    container.exa = FakeExa()
+    container.jina = FakeJina()
+    container.blobs = BlobStore(root=str(tmp_path / "blobs"))
+    container.charts = BlobStore(root=str(tmp_path / "charts"))
+    container.documents = DocumentStore()
+    # The local corpus would answer repeated queries and hide the search fakes
+    container.documents.enabled = False
+    return container
+
+
+@pytest.fixture
+def client(services):
+    """Test client of the whole API, its lifespan replaced by the scratch resources"""
+    from fastapi.testclient import TestClient
+
+    from app.main import create_application
+    from src.app.db import init_async_database, init_database
+
+    init_database()
+    init_async_database()
+    application = create_application()
+    application.state.services = services
+    return TestClient(application)
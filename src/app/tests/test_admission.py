@@ -0,0 +1,169 @@
+import asyncio
+import importlib
+
+import pytest
+
+from src.app.services.admission_service import (
+    AdmissionController,
+    QueueFullError,
+    get_admission_controller,
+)
+
+
+async def _hold(controller, started, release, name):
+    async with controller.slot():
+        started.append(name)
+        await release.wait()
+
+
+def test_runs_beyond_the_limit_queue_in_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrent_runs=1, max_queued_runs=2)
+        started, release = [], asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, started, release, name))
+            for name in ("first", "second", "third")
+        ]
+        await asyncio.sleep(0.01)
+        queued = controller.metrics()
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return started, queued, controller.metrics()
+
+    started, queued, finished = asyncio.run(scenario())
+
+    assert started == ["first", "second", "third"]
+    assert (queued.running, queued.queued) == (1, 2)
+    assert (finished.running, finished.queued) == (0, 0)
+    assert finished.admitted_total == 3
+
+
+def test_full_queue_rejects_with_position_and_retry_after():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent_runs=1, max_queued_runs=1, default_retry_after=7
+        )
+        started, release = [], asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, started, release, name))
+            for name in ("running", "queued")
+        ]
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(QueueFullError) as rejected:
+                async with controller.slot():
+                    pass
+        finally:
+            release.set()
+            await asyncio.gather(*tasks)
+        return rejected.value, controller.metrics()
+
+    error, metrics = asyncio.run(scenario())
+
+    assert error.queue_position == 2
+    assert error.retry_after == 7
+    assert metrics.rejected_total == 1
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    async def scenario():
+        controller = AdmissionController(max_concurrent_runs=1, max_queued_runs=1)
+        started, release = [], asyncio.Event()
+        running = asyncio.create_task(_hold(controller, started, release, "running"))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(_hold(controller, started, release, "waiting"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await asyncio.sleep(0.01)
+        queued = controller.metrics().queued
+
+        release.set()
+        await running
+        return started, queued, controller.metrics()
+
+    started, queued, metrics = asyncio.run(scenario())
+
+    assert started == ["running"]
+    assert queued == 0
+    assert metrics.running == 0
+
+
+def test_tickets_never_entered_give_their_claims_back():
+    async def scenario():
+        controller = AdmissionController(max_concurrent_runs=1, max_queued_runs=1)
+        running, queued = controller.reserve(), controller.reserve()
+        before = controller.metrics()
+
+        queued.discard()
+        running.discard()
+        running.discard()
+        return before, controller.metrics()
+
+    before, after = asyncio.run(scenario())
+
+    assert (before.running, before.queued) == (1, 1)
+    assert (after.running, after.queued) == (0, 0)
+
+
+@pytest.mark.parametrize(
+    "path, params, module, analyzer",
+    [
+        (
+            "/market-analysis/analyze",
+            {"query": "pet care"},
+            "market_analysis",
+            "MarketAnalyzer",
+        ),
+        (
+            "/customer-discovery/discover",
+            {"domain": "pet care"},
+            "customer_discovery",
+            "CustomerDiscoverer",
+        ),
+    ],
+)
+def test_a_run_failing_to_start_releases_its_slot(
+    client, monkeypatch, path, params, module, analyzer
+):
+    controller = AdmissionController(max_concurrent_runs=1, max_queued_runs=0)
+    client.app.dependency_overrides[get_admission_controller] = lambda: controller
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("no client configured")
+
+    router = importlib.import_module(f"app.routers.{module}")
+    monkeypatch.setattr(router, analyzer, broken)
+
+    with pytest.raises(RuntimeError):
+        client.post(path, params={**params, "refresh": True})
+
+    assert controller.metrics().running == 0
+
+
+def test_retry_after_follows_recent_run_times():
+    controller = AdmissionController(max_concurrent_runs=2, max_queued_runs=0)
+    controller._run_times.extend([10.0, 20.0])
+
+    assert controller.retry_after(1) == 8
+    assert controller.retry_after(4) == 30
+
+
+def test_over_capacity_request_gets_429(client):
+    client.app.dependency_overrides[get_admission_controller] = lambda: (
+        AdmissionController(max_concurrent_runs=0, max_queued_runs=0, default_retry_after=9)
+    )
+
+    response = client.post("/pipeline/run", params={"domain": "pet care"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "9"
+    assert response.headers["X-Queue-Position"] == "1"
+    assert response.json()["queue_position"] == 1
+
+
+def test_admission_metrics_endpoint(client):
+    response = client.get("/metrics/admission")
+
+    assert response.status_code == 200
+    assert {"running", "queued", "rejected_total"} <= set(response.json())
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+from src.app.db import get_async_session_factory
+from src.app.services import customer_service, market_service
+from src.app.services.pipeline_service import run_pipeline
+
+
+class ThreadRecordingBlobs:
+    """Blob store wrapper noting the thread of every file read and write"""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.threads = set()
+
+    def refs(self, texts):
+        self.threads.add(threading.get_ident())
+        return self.blobs.refs(texts)
+
+    def resolve(self, value):
+        self.threads.add(threading.get_ident())
+        return self.blobs.resolve(value)
+
+
+def test_async_saves_touch_blobs_off_the_event_loop(services, monkeypatch):
+    result = asyncio.run(run_pipeline("beekeeping", services=services))
+    blobs = ThreadRecordingBlobs(customer_service.get_blob_store())
+    monkeypatch.setattr(customer_service, "get_blob_store", lambda: blobs)
+    monkeypatch.setattr(market_service, "get_blob_store", lambda: blobs)
+
+    async def save_and_load():
+        loop_thread = threading.get_ident()
+        async with get_async_session_factory()() as db:
+            await customer_service.asave_customer_discovery(db, result.customer_discovery)
+            await market_service.asave_market_analysis(db, result.market_analysis)
+            stored = await customer_service.aload_customer_discovery(db, "beekeeping")
+        return loop_thread, stored
+
+    loop_thread, stored = asyncio.run(save_and_load())
+
+    assert blobs.threads and loop_thread not in blobs.threads
+    assert stored == result.customer_discovery
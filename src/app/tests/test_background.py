@@ -0,0 +1,28 @@
+from src.app.utils.background import ProgressEvent, progress_summary, start_background_run
+
+
+def test_background_run_collects_progress_and_result():
+    async def target(on_progress):
+        on_progress("question", {"question": "Who buys?", "analysis": "Owners"})
+        return "report"
+
+    run = start_background_run(target, name="test")
+
+    assert run.wait(timeout=5)
+    assert run.result == "report" and not run.failed
+    assert [event.kind for event in run.events()] == ["question"]
+    assert progress_summary(run.events()[0]) == ("Question answered: Who buys?", "Owners")
+
+
+def test_background_run_keeps_the_error():
+    def target(on_progress):
+        raise ValueError("no niches")
+
+    run = start_background_run(target)
+
+    assert run.wait(timeout=5)
+    assert run.failed and isinstance(run.error, ValueError)
+    assert progress_summary(ProgressEvent("market_expansion", None, 0.0)) == (
+        "Market expansion",
+        "",
+    )
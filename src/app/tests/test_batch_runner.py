@@ -0,0 +1,56 @@
+import asyncio
+import queue
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.app import batch_runner
+from src.app.services import pipeline_service
+from src.app.services.checkpoint_service import RUN_ID_PATTERN
+
+
+def test_run_ids_depend_on_the_run_tag():
+    today = batch_runner.domain_run_id("Pet  Care", "2026-01-01")
+
+    assert today == batch_runner.domain_run_id("pet care", "2026-01-01")
+    assert today != batch_runner.domain_run_id("pet care", "2026-01-02")
+    longest_tag = "t" * batch_runner.MAX_RUN_TAG_LENGTH
+    assert re.fullmatch(RUN_ID_PATTERN, batch_runner.domain_run_id("pet care", longest_tag))
+
+
+def test_invalid_run_tags_are_rejected(tmp_path):
+    domains_file = tmp_path / "domains.txt"
+    domains_file.write_text("pet care\n")
+
+    with pytest.raises(SystemExit):
+        batch_runner.main([str(domains_file), "--run-tag", "../x"])
+
+
+def test_workers_share_one_queue(monkeypatch):
+    run_ids = []
+
+    async def fake_run_pipeline(domain, targets=None, run_id=None):
+        run_ids.append(run_id)
+        # The slow domain must not hold back the rest of the queue
+        await asyncio.sleep(0.2 if domain == "slow" else 0)
+        return SimpleNamespace(model_dump=lambda mode: {"domain": domain})
+
+    monkeypatch.setattr(pipeline_service, "run_pipeline", fake_run_pipeline)
+    work, results = queue.Queue(), queue.Queue()
+    for domain in ["slow", "a", "b", "c", "d"]:
+        work.put(domain)
+
+    async def two_workers():
+        await asyncio.gather(
+            batch_runner._run_domains(work, results, 1, None, "tag"),
+            batch_runner._run_domains(work, results, 1, None, "tag"),
+        )
+
+    asyncio.run(two_workers())
+
+    records = [results.get_nowait() for _ in range(results.qsize())]
+    assert sorted(record["domain"] for record in records) == ["a", "b", "c", "d", "slow"]
+    assert all(record["status"] == "ok" for record in records)
+    assert [record["domain"] for record in records][-1] == "slow"
+    assert all(run_id.startswith("batch-tag-") for run_id in run_ids)
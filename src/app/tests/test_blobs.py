@@ -0,0 +1,77 @@
+import pytest
+
+from src.app.db import get_session_factory, init_database
+from src.app.routers.customer_discovery import CustomerDiscoveryReport, CustomerNiche
+from src.app.services.blob_service import BlobStore, TextRef, get_blob_store
+from src.app.services.customer_service import (
+    load_customer_discovery,
+    save_customer_discovery,
+)
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(root=str(tmp_path / "blobs"))
+
+
+def test_texts_are_stored_once_and_read_back(blobs):
+    digest = blobs.put("raw page text")
+
+    assert blobs.put("raw page text") == digest
+    assert blobs.get(digest) == "raw page text"
+    assert blobs.resolve({"results": [blobs.ref("other text").model_dump()]}) == {
+        "results": ["other text"]
+    }
+
+
+@pytest.mark.parametrize(
+    "digest", ["../../etc/passwd", "ABCDEF" + "0" * 58, "0" * 63, "0" * 64 + "/x"]
+)
+def test_malformed_digests_never_become_paths(blobs, digest):
+    assert not blobs.has(digest)
+    with pytest.raises(KeyError):
+        blobs.get(digest)
+
+
+def test_unreadable_blobs_count_as_missing(blobs):
+    digest = blobs.put("soon corrupted")
+    blobs._path(digest).write_bytes(b"not zlib data")
+
+    with pytest.raises(KeyError):
+        blobs.get(digest)
+    ref = TextRef(hash=digest, excerpt="soon", length=14)
+    assert blobs.resolve(ref) == "soon"
+
+
+def test_blob_endpoints_reject_malformed_digests(client):
+    assert client.get("/blobs/not-a-digest").status_code == 404
+    response = client.post("/blobs/resolve", json=["../../etc/passwd"])
+    assert response.json() == {"../../etc/passwd": None}
+
+
+def test_raw_texts_are_moved_to_the_blob_store_on_save():
+    init_database()
+    report = CustomerDiscoveryReport(
+        primary_domain="mushroom growing",
+        total_market_size=0,
+        niches=[
+            CustomerNiche(
+                name="Home growers",
+                description="Hobbyists",
+                search_query="home mushroom kits",
+                search_results=["an old report's raw text"],
+            )
+        ],
+        ideal_customer_profile={},
+        investor_sentiment={},
+    )
+    # Building a report has no side effects on the blob store
+    assert report.niches[0].search_results == ["an old report's raw text"]
+
+    with get_session_factory()() as db:
+        save_customer_discovery(db, report)
+        stored = load_customer_discovery(db, "mushroom growing")
+
+    (ref,) = stored.niches[0].search_results
+    assert isinstance(ref, TextRef)
+    assert get_blob_store().get(ref.hash) == "an old report's raw text"
@@ -0,0 +1,185 @@
+import asyncio
+import time
+
+import pytest
+
+from src.app.budget import (
+    BudgetExceededError,
+    CallPriority,
+    RunBudget,
+    default_run_budget,
+)
+from src.app.config import reload_settings
+from src.app.db import get_session_factory
+from src.app.routers.market_expansion import MarketExpander
+from src.app.routers.product_evolution import ProductEvolver
+from src.app.services.customer_service import load_customer_discovery
+from src.app.services.pipeline_service import (
+    PipelineOrchestrator,
+    PipelineStage,
+    run_pipeline,
+)
+
+
+@pytest.fixture
+def reports(services):
+    result = asyncio.run(run_pipeline("pet care", services=services))
+    return result.customer_discovery, result.market_analysis, result.market_expansion
+
+
+def drained_budget(used_fraction):
+    budget = RunBudget(max_calls=100)
+    budget.calls = int(100 * used_fraction)
+    return budget
+
+
+def test_expansion_skips_domains_the_budget_refuses(services, reports):
+    customer_discovery, market_analysis, _ = reports
+    # Only high priority calls fit below the critical reserve
+    budget = drained_budget(0.95)
+
+    strategy = MarketExpander(
+        customer_discovery, market_analysis, budget=budget, services=services
+    ).expand_market()
+
+    assert strategy.expansion_domains
+    assert strategy.strategic_rationale == {}
+    assert strategy.partial
+
+
+def test_expansion_domains_call_propagates_budget_errors(services, reports):
+    customer_discovery, market_analysis, _ = reports
+
+    with pytest.raises(BudgetExceededError):
+        MarketExpander(
+            customer_discovery,
+            market_analysis,
+            budget=drained_budget(1.0),
+            services=services,
+        ).expand_market()
+
+
+def test_product_evolution_is_marked_partial_when_the_trend_is_skipped(services, reports):
+    strategy = ProductEvolver(
+        *reports, budget=drained_budget(0.95), services=services
+    ).generate_product_evolution_strategy()
+
+    assert strategy.user_adoption_trend is None
+    assert strategy.partial
+
+
+def test_a_refused_stage_drops_its_dependents_only():
+    def refused(domain, results, context):
+        raise BudgetExceededError("exhausted")
+
+    orchestrator = PipelineOrchestrator(
+        [
+            PipelineStage("done", lambda domain, results, context: "ok"),
+            PipelineStage("refused", refused),
+            PipelineStage(
+                "dependent", lambda domain, results, context: "ran", depends_on=("refused",)
+            ),
+        ]
+    )
+    budget = RunBudget(max_calls=10)
+
+    results = asyncio.run(orchestrator.run("pets", budget=budget))
+
+    assert results["done"] == "ok"
+    assert results["refused"] is None and results["dependent"] is None
+    assert budget.summary().skipped == ["stage: refused", "stage: dependent"]
+
+
+def test_run_pipeline_returns_partial_results_when_the_budget_runs_out(services):
+    result = asyncio.run(
+        run_pipeline("pet care", budget=RunBudget(max_calls=4), services=services)
+    )
+
+    assert result.partial
+    assert result.customer_discovery is not None
+    assert result.market_analysis is not None
+    assert result.market_expansion is None and result.product_evolution is None
+    assert "stage: market_expansion" in result.budget.skipped
+    with get_session_factory()() as db:
+        assert load_customer_discovery(db, "pet care") is not None
+
+
+def test_call_timeout_is_capped_by_the_time_remaining():
+    budget = RunBudget(deadline_seconds=5)
+
+    assert budget.call_timeout() <= 5
+    assert RunBudget().call_timeout() is None
+
+
+def test_no_call_starts_when_too_little_time_is_left():
+    budget = RunBudget(deadline_seconds=0.5, min_call_timeout=1.0)
+
+    with pytest.raises(BudgetExceededError):
+        budget.admit("gpt-4o", CallPriority.CRITICAL)
+    assert budget.calls == 0
+
+
+def test_deadline_degrades_run_pipeline_to_a_partial_result(services, completion_handler):
+    # Every call takes longer than the whole run is allowed
+    completion_handler.delay = 3.0
+    started = time.monotonic()
+
+    result = asyncio.run(
+        run_pipeline("pet care", budget=RunBudget(deadline_seconds=2), services=services)
+    )
+
+    assert result.partial
+    assert time.monotonic() - started < 4
+    assert completion_handler.calls
+    assert all(0 < call.timeout <= 2 for call in completion_handler.calls)
+
+
+@pytest.fixture
+def configured_budget(monkeypatch):
+    monkeypatch.setenv("RUN_BUDGET_MAX_CALLS", "40")
+    monkeypatch.setenv("RUN_BUDGET_MAX_TOKENS", "50000")
+    reload_settings()
+    yield
+    monkeypatch.delenv("RUN_BUDGET_MAX_CALLS")
+    monkeypatch.delenv("RUN_BUDGET_MAX_TOKENS")
+    reload_settings()
+
+
+def test_caller_limits_replace_only_the_matching_configured_ones(configured_budget):
+    budget = default_run_budget(max_calls=5, deadline_seconds=30)
+
+    assert (budget.max_calls, budget.max_tokens) == (5, 50000)
+    assert budget.deadline_seconds == 30
+    assert default_run_budget().max_calls == 40
+
+
+def test_pipeline_deadline_keeps_the_configured_limits(client, configured_budget):
+    response = client.post(
+        "/pipeline/run",
+        params={"domain": "pet care", "targets": "customer_discovery", "deadline": 60},
+    )
+
+    summary = response.json()["budget"]
+    assert response.status_code == 200
+    assert (summary["max_calls"], summary["max_tokens"]) == (40, 50000)
+    assert summary["deadline_seconds"] == 60
+
+
+@pytest.mark.parametrize(
+    "path, params",
+    [
+        ("/market-analysis/analyze", {"query": "pet care"}),
+        ("/customer-discovery/discover", {"domain": "pet care"}),
+    ],
+)
+@pytest.mark.parametrize("deadline, delay", [(0.5, 0.0), (2, 3.0)])
+def test_deadline_before_the_first_call_returns_a_partial_report(
+    client, completion_handler, path, params, deadline, delay
+):
+    # Either no call may start at all, or the first one outlives the run
+    completion_handler.delay = delay
+
+    response = client.post(path, params={**params, "deadline": deadline, "refresh": True})
+
+    assert response.status_code == 200
+    assert response.json()["partial"]
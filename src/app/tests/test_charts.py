@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("matplotlib")
+
+from src.app.services.chart_service import (  # noqa: E402
+    ChartRenderer,
+    chart_annotations,
+    chart_digest,
+    chart_spec,
+    line_chart,
+    load_chart,
+    render_chart,
+)
+
+
+def _chart(title="Users"):
+    return line_chart(
+        title, "Year", "Users", ["2022", "2023", "2024"], ["Users"], [[10.0, 40.0, 90.0]]
+    )
+
+
+def test_render_chart_produces_png_and_svg():
+    assert render_chart(_chart(), "png").startswith(b"\x89PNG")
+    assert b"<svg" in render_chart(_chart(), "svg")
+
+
+def test_identical_charts_are_rendered_once():
+    renderer = ChartRenderer(workers=0, cache_size=8)
+
+    first = renderer.render(_chart())
+    again = asyncio.run(renderer.arender(_chart()))
+
+    assert first == again
+    assert (renderer.renders, renderer.hits) == (1, 1)
+
+    renderer.render(_chart(), "svg")
+    assert renderer.renders == 2
+
+
+def test_least_recently_used_charts_are_evicted():
+    renderer = ChartRenderer(workers=0, cache_size=1)
+
+    renderer.render(_chart("A"))
+    renderer.render(_chart("B"))
+    renderer.render(_chart("A"))
+
+    assert renderer.renders == 3
+    assert list(renderer._cache) == [chart_digest(_chart("A"))]
+
+
+def test_unsupported_formats_are_refused():
+    with pytest.raises(ValueError):
+        ChartRenderer(workers=0).render(_chart(), "gif")
+
+
+def test_digest_depends_on_the_data_and_format():
+    assert chart_digest(_chart()) == chart_digest(_chart())
+    assert chart_digest(_chart()) != chart_digest(_chart(), "svg")
+    assert chart_digest(_chart()) != chart_digest(_chart("Other"))
+
+
+
+def test_annotations_mark_the_peak_and_the_largest_change():
+    texts = [annotation.text for annotation in chart_annotations(_chart())]
+
+    assert texts == ["Peak Users: 90", "Largest change: Users +50 from 2023"]
+
+
+def test_chart_specs_live_apart_from_page_texts(services):
+    spec = chart_spec(_chart(), services.charts)
+    page = services.blobs.put('{"title": "A stored page, not a chart"}')
+
+    assert load_chart(spec.chart_id, services.charts) == _chart()
+    assert not services.blobs.has(spec.chart_id)
+    with pytest.raises(KeyError):
+        load_chart(page, services.charts)
+
+
+def test_trend_spec_image_is_served_with_an_etag(client):
+    response = client.post(
+        "/market-analysis/visualize-trend", params={"query": "pet care", "format": "spec"}
+    )
+    image_url = response.json()["chart"]["image_url"]
+
+    image = client.get(image_url)
+    cached = client.get(image_url, headers={"If-None-Match": image.headers["ETag"]})
+
+    assert image.status_code == 200
+    assert image.headers["content-type"] == "image/png"
+    assert cached.status_code == 304
+
+
+def test_page_texts_and_undecodable_charts_are_not_found(client, services):
+    page = services.blobs.put("Raw page text about pet care")
+    not_json = services.charts.put("not a chart")
+    not_a_chart = services.charts.put('["a", "list"]')
+
+    for chart_id in (page, not_json, not_a_chart, "not-a-digest"):
+        assert client.get(f"/charts/{chart_id}.png").status_code == 404
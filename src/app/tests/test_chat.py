@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.app.budget import RunBudget
+from src.app.llm import CompletionHandler, LiteLLMKit
+from src.app.schemas.llm import ChatRequest, Message
+
+
+def test_stream_yields_text_and_records_usage(services):
+    budget = RunBudget(max_calls=5)
+    llm = LiteLLMKit(
+        model_name="gpt-4o",
+        budget=budget,
+        api_key_manager=services.api_key_manager,
+        completion_handler=services.completion_handler,
+    )
+    request = ChatRequest(messages=[Message(role="user", content="Hi")])
+
+    parts = list(llm.stream(request))
+
+    async def collect():
+        return [text async for text in llm.astream(request)]
+
+    assert parts == ["Insight", "1\nDetail", "1"]
+    assert asyncio.run(collect()) == ["Insight", "2\nDetail", "2"]
+    assert budget.summary().calls == 2
+    assert budget.summary().tokens == 300
+
+
+def test_stream_chunks_report_text_and_final_usage():
+    usage = []
+    delta = SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="Hi"))])
+    final = SimpleNamespace(choices=[], usage={"prompt_tokens": 3, "completion_tokens": 1})
+
+    assert CompletionHandler._chunk_text(delta, usage.append) == "Hi"
+    assert CompletionHandler._chunk_text(final, usage.append) == ""
+    assert usage == [{"prompt_tokens": 3, "completion_tokens": 1}]
+
+
+@pytest.fixture
+def stored_domain(client):
+    domain = "chat pets"
+    client.post("/customer-discovery/discover", params={"domain": domain, "refresh": True})
+    client.post("/market-analysis/analyze", params={"query": domain, "refresh": True})
+    return domain
+
+
+def test_websocket_streams_a_reply_from_stored_reports(client, stored_domain):
+    with client.websocket_connect(f"/chat/ws?domain={stored_domain}") as websocket:
+        websocket.send_json({"type": "message", "content": "Which niches matter?"})
+        messages = [websocket.receive_json()]
+        while messages[-1]["type"] == "token":
+            messages.append(websocket.receive_json())
+
+        websocket.send_json({"type": "message", "content": "  "})
+        empty = websocket.receive_json()
+
+    tokens = [message["content"] for message in messages if message["type"] == "token"]
+    assert len(tokens) > 1
+    assert messages[-1] == {"type": "done", "content": "".join(tokens)}
+    assert empty == {"type": "error", "detail": "Empty message"}
+
+
+def test_websocket_refuses_a_domain_without_reports(client):
+    with client.websocket_connect("/chat/ws?domain=nothing stored") as websocket:
+        message = websocket.receive_json()
+
+    assert message["type"] == "error"
+    assert "nothing stored" in message["detail"]
@@ -0,0 +1,66 @@
+import pytest
+from pydantic import BaseModel
+
+from src.app.services.checkpoint_service import MISSING, CheckpointStore
+
+
+class Niches(BaseModel):
+    niches: list
+
+
+def test_checkpoint_resumes_completed_units(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"niches": ["a", "b"]}
+
+    first = CheckpointStore("run-1", root=str(tmp_path)).scoped("customer_discovery")
+    second = CheckpointStore("run-1", root=str(tmp_path)).scoped("customer_discovery")
+
+    assert first.cached("niches", compute) == {"niches": ["a", "b"]}
+    assert second.cached("niches", compute) == {"niches": ["a", "b"]}
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize(
+    "damage", ['{"key": "niches", "val', "\xff\xfe", '{"key": "niches"}', '[1, 2]']
+)
+def test_damaged_checkpoints_are_recomputed(tmp_path, damage):
+    store = CheckpointStore("run-1", root=str(tmp_path))
+    store.save("niches", {"niches": ["stale"]})
+    store._path("niches").write_bytes(damage.encode("latin-1"))
+
+    assert store.restore("niches", Niches) is MISSING
+    assert store.cached("niches", lambda: Niches(niches=["a"]), Niches) == Niches(
+        niches=["a"]
+    )
+    assert store.restore("niches", Niches) == Niches(niches=["a"])
+
+
+def test_checkpoints_no_longer_valid_for_the_model_are_recomputed(tmp_path):
+    store = CheckpointStore("run-1", root=str(tmp_path))
+    store.save("niches", {"names": ["old schema"]})
+
+    assert store.cached("niches", lambda: Niches(niches=["a"]), Niches).niches == ["a"]
+
+
+@pytest.mark.parametrize("run_id", ["../escape", "/etc", "a/b", "", "x" * 65, "run id"])
+def test_run_ids_outside_the_pattern_are_rejected(tmp_path, run_id):
+    with pytest.raises(ValueError):
+        CheckpointStore(run_id, root=str(tmp_path))
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/customer-discovery/discover?domain=pets",
+        "/market-analysis/analyze?query=pets",
+        "/pipeline/run?domain=pets",
+    ],
+)
+def test_endpoints_reject_path_like_run_ids(client, path):
+    response = client.post(f"{path}&run_id=../../etc")
+
+    assert response.status_code == 422
@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.app.config import get_settings, reload_settings
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+
+
+def test_settings_are_read_once_until_reloaded(monkeypatch):
+    settings = get_settings()
+    assert get_settings() is settings
+
+    monkeypatch.setenv("RESPONSE_COMPRESSION_MIN_BYTES", "4321")
+    assert get_settings() is settings
+    try:
+        assert reload_settings().RESPONSE_COMPRESSION_MIN_BYTES == 4321
+    finally:
+        monkeypatch.delenv("RESPONSE_COMPRESSION_MIN_BYTES")
+        reload_settings()
+
+
+def test_api_import_leaves_heavy_dependencies_unloaded():
+    heavy = ("litellm", "matplotlib", "reportlab", "exa_py")
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {heavy!r} if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(SRC_DIR.parent), str(SRC_DIR)])}
+
+    output = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+
+    assert output.stdout.strip() == ""
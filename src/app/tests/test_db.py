@@ -0,0 +1,37 @@
+from sqlalchemy import text
+
+from src.app.db import (
+    async_database_url,
+    create_database_engine,
+    get_engine,
+    init_database,
+)
+
+
+def test_engine_is_created_once_per_process():
+    assert init_database() is init_database()
+    assert get_engine() is init_database()
+
+
+def test_file_databases_use_wal_and_tuned_pragmas(tmp_path):
+    engine = create_database_engine(f"sqlite:///{tmp_path / 'tuned.db'}")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() > 0
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_databases_keep_their_memory_journal():
+    engine = create_database_engine("sqlite://")
+    try:
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "memory"
+    finally:
+        engine.dispose()
+
+
+def test_async_urls_swap_in_the_async_driver():
+    assert async_database_url("sqlite:///data.db") == "sqlite+aiosqlite:///data.db"
@@ -0,0 +1,61 @@
+import logging
+
+from sqlalchemy import select
+
+from src.app.db import get_session_factory, init_database
+from src.app.models.document import Document
+from src.app.services.document_service import DocumentStore
+
+
+def stored_urls(prefix):
+    with get_session_factory()() as db:
+        return set(
+            db.scalars(select(Document.url).where(Document.url.startswith(prefix)))
+        )
+
+
+def test_a_conflicting_document_does_not_roll_back_the_batch(monkeypatch, caplog):
+    init_database()
+    store = DocumentStore()
+    store.enabled = True
+    upsert = DocumentStore._upsert
+
+    def store_concurrently_first(self, session, row, url, *args):
+        # Another worker stores the same url between our lookup and insert
+        if url.endswith("/raced"):
+            with get_session_factory()() as other:
+                other.add(Document(url=url, content="theirs"))
+                other.commit()
+        return upsert(self, session, row, url, *args)
+
+    monkeypatch.setattr(DocumentStore, "_upsert", store_concurrently_first)
+
+    with caplog.at_level(logging.WARNING, logger="src.app.services.document_service"):
+        store.store(
+            "vertical farming",
+            [
+                {"url": "https://docs.test/raced", "content": "ours"},
+                {"url": "https://docs.test/fresh", "content": "vertical farming yields"},
+            ],
+            source="exa",
+        )
+
+    assert stored_urls("https://docs.test/") == {
+        "https://docs.test/raced",
+        "https://docs.test/fresh",
+    }
+    assert "https://docs.test/raced" in caplog.text
+
+
+def test_refetched_documents_are_refreshed_in_place():
+    init_database()
+    store = DocumentStore()
+    store.enabled = True
+    document = {"url": "https://docs.test/kelp", "content": "kelp farming basics"}
+
+    store.store("kelp farming", [document], source="exa")
+    store.store("kelp farming", [{**document, "content": "kelp farming, revised"}], "exa")
+
+    with get_session_factory()() as db:
+        rows = db.scalars(select(Document).where(Document.url == document["url"])).all()
+    assert [row.content for row in rows] == ["kelp farming, revised"]
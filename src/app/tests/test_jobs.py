@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+
+from src.app.services import job_service
+from src.app.services.admission_service import (
+    AdmissionController,
+    get_admission_controller,
+)
+from src.app.services.job_service import (
+    IdempotencyConflictError,
+    InFlightRuns,
+    JobStatus,
+    get_inflight_runs,
+)
+
+
+def _blocking_start(release, started):
+    def start():
+        started.append(True)
+
+        async def run():
+            await release.wait()
+            return "report"
+
+        return run()
+
+    return start
+
+
+def test_identical_requests_join_one_run():
+    async def scenario():
+        runs = InFlightRuns(window_seconds=60)
+        release, started = asyncio.Event(), []
+        start = _blocking_start(release, started)
+
+        first, joined_first = runs.join_or_start("market_analysis", start, "Pet Care")
+        second, joined_second = runs.join_or_start("market_analysis", start, " pet  care")
+        release.set()
+        return first, joined_first, second, joined_second, await second.wait(), started
+
+    first, joined_first, second, joined_second, report, started = asyncio.run(scenario())
+
+    assert second is first
+    assert (joined_first, joined_second) == (False, True)
+    assert report == "report"
+    assert len(started) == 1
+    assert first.info().status == JobStatus.SUCCEEDED
+    assert first.info().created_at.tzinfo is not None
+
+
+def test_options_that_change_the_result_start_separate_runs():
+    async def scenario():
+        runs = InFlightRuns(window_seconds=60)
+        release, started = asyncio.Event(), []
+        start = _blocking_start(release, started)
+
+        base, _ = runs.join_or_start("market_analysis", start, "pet care")
+        jobs = [
+            runs.join_or_start("market_analysis", start, "pet care", options=options)[0]
+            for options in ({"deadline": 5.0}, {"run_id": "Run-1"}, {"run_id": "run-1"})
+        ]
+        release.set()
+        await asyncio.gather(*(job.wait() for job in [base, *jobs]))
+        return base, jobs
+
+    base, jobs = asyncio.run(scenario())
+
+    assert len({job.job_id for job in [base, *jobs]}) == 4
+
+
+def test_refresh_only_joins_a_run_still_in_flight():
+    async def scenario():
+        runs = InFlightRuns(window_seconds=60)
+        release, started = asyncio.Event(), []
+        start = _blocking_start(release, started)
+
+        first, _ = runs.join_or_start("market_analysis", start, "pet care", refresh=True)
+        during, joined = runs.join_or_start(
+            "market_analysis", start, "pet care", refresh=True
+        )
+        release.set()
+        await first.wait()
+        after, joined_after = runs.join_or_start(
+            "market_analysis", start, "pet care", refresh=True
+        )
+        await after.wait()
+        return first, during, joined, after, joined_after
+
+    first, during, joined, after, joined_after = asyncio.run(scenario())
+
+    assert during is first and joined
+    assert after is not first and not joined_after
+
+
+def test_idempotency_key_reused_with_other_options_conflicts():
+    async def scenario():
+        runs = InFlightRuns(window_seconds=60)
+        release, started = asyncio.Event(), []
+        start = _blocking_start(release, started)
+
+        job, _ = runs.join_or_start(
+            "market_analysis", start, "pet care", idempotency_key="abc", refresh=True
+        )
+        try:
+            replay, replayed = runs.join_or_start(
+                "market_analysis", start, "pet care", idempotency_key="abc", refresh=True
+            )
+            with pytest.raises(IdempotencyConflictError):
+                runs.join_or_start(
+                    "market_analysis",
+                    start,
+                    "pet care",
+                    options={"deadline": 5.0},
+                    idempotency_key="abc",
+                    refresh=True,
+                )
+        finally:
+            release.set()
+            await job.wait()
+        return job, replay, replayed
+
+    job, replay, replayed = asyncio.run(scenario())
+
+    assert replay is job and replayed
+
+
+def test_refused_start_registers_no_run():
+    def start():
+        raise RuntimeError("refused")
+
+    async def scenario():
+        runs = InFlightRuns(window_seconds=60)
+        with pytest.raises(RuntimeError):
+            runs.join_or_start("market_analysis", start, "pet care")
+        return runs
+
+    runs = asyncio.run(scenario())
+
+    assert runs._by_key == {} and runs._by_id == {}
+
+
+def test_inflight_runs_registry_is_created_once(monkeypatch):
+    monkeypatch.setattr(job_service, "_inflight_runs", None)
+
+    assert get_inflight_runs() is get_inflight_runs()
+
+
+@pytest.fixture
+def runs(client):
+    registry = InFlightRuns(window_seconds=60)
+    client.app.dependency_overrides[get_inflight_runs] = lambda: registry
+    return registry
+
+
+def test_discover_replays_a_key_and_rejects_it_for_other_options(client, runs):
+    params = {"domain": "pet care", "refresh": True}
+    headers = {"Idempotency-Key": "discover-1"}
+
+    first = client.post("/customer-discovery/discover", params=params, headers=headers)
+    replay = client.post("/customer-discovery/discover", params=params, headers=headers)
+    conflict = client.post(
+        "/customer-discovery/discover", params={**params, "deadline": 30}, headers=headers
+    )
+
+    assert first.status_code == replay.status_code == 200
+    assert replay.headers["X-Job-Id"] == first.headers["X-Job-Id"]
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert conflict.status_code == 422
+
+    status = client.get(f"/jobs/{first.headers['X-Job-Id']}")
+    assert status.json()["status"] == "succeeded"
+
+
+def test_analyze_without_waiting_is_refused_before_it_is_scheduled(client, runs):
+    full = AdmissionController(max_concurrent_runs=0, max_queued_runs=0, default_retry_after=5)
+    client.app.dependency_overrides[get_admission_controller] = lambda: full
+
+    response = client.post(
+        "/market-analysis/analyze",
+        params={"query": "pet care", "refresh": True, "wait": False},
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "5"
+    assert runs._by_id == {}
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+
+from src.app.services.memory_service import ConversationMemory, estimate_tokens
+
+
+def _settled(memory, timeout=5.0):
+    """Wait until no summary is being written"""
+    deadline = time.monotonic() + timeout
+    while memory._pending is not None:
+        assert time.monotonic() < deadline, "summary was not written"
+        time.sleep(0.01)
+    return memory
+
+
+def test_older_turns_are_folded_into_the_summary():
+    folded = []
+
+    def summarizer(summary, turns):
+        folded.append([turn.content for turn in turns])
+        return f"{summary} {' '.join(turn.content for turn in turns)}".strip()
+
+    memory = ConversationMemory(summarizer, recent_turns=2, token_budget=10_000)
+    for n in range(3):
+        memory.add_exchange(f"question {n}", f"answer {n}")
+    _settled(memory)
+
+    assert folded == [["question 0", "answer 0"]]
+    assert memory.summary == "question 0 answer 0"
+    assert [turn.content for turn in memory.turns] == [
+        "question 1",
+        "answer 1",
+        "question 2",
+        "answer 2",
+    ]
+
+    messages = memory.messages("System", "question 3")
+    assert messages[0].role == "system"
+    assert "Conversation so far:\nquestion 0 answer 0" in messages[0].content
+    assert [message.content for message in messages[1:]] == [
+        "question 1",
+        "answer 1",
+        "question 2",
+        "answer 2",
+        "question 3",
+    ]
+
+
+def test_replies_do_not_wait_for_the_summarizer():
+    release = threading.Event()
+
+    def slow_summarizer(summary, turns):
+        release.wait(5)
+        return "summary"
+
+    memory = ConversationMemory(slow_summarizer, recent_turns=1, token_budget=10_000)
+    memory.add_exchange("question 0", "answer 0")
+    started = time.monotonic()
+    memory.add_exchange("question 1", "answer 1")
+    messages = memory.messages("System", "question 2")
+    elapsed = time.monotonic() - started
+    release.set()
+    _settled(memory)
+
+    assert elapsed < 1
+    # Turns still being summarized are sent verbatim meanwhile
+    assert [message.content for message in messages[1:3]] == ["question 0", "answer 0"]
+    assert memory.summary == "summary"
+
+
+def test_history_is_trimmed_to_the_token_budget():
+    memory = ConversationMemory(lambda summary, turns: summary, recent_turns=10)
+    for n in range(4):
+        memory.add_exchange(f"question {n} " + "x" * 400, f"answer {n} " + "y" * 400)
+    memory.token_budget = (
+        estimate_tokens("System") + estimate_tokens("next") + 3 * estimate_tokens("a" * 410)
+    )
+
+    messages = memory.messages("System", "next")
+
+    # Three turns fit, and the oldest of them, an answer, is dropped
+    assert [message.role for message in messages] == ["system", "user", "assistant", "user"]
+    assert messages[1].content.startswith("question 3")
+
+
+def test_a_failed_summary_keeps_the_turns(caplog):
+    def failing_summarizer(summary, turns):
+        raise RuntimeError("model unavailable")
+
+    memory = ConversationMemory(failing_summarizer, recent_turns=1, token_budget=10_000)
+    with caplog.at_level(logging.WARNING, logger="src.app.services.memory_service"):
+        memory.add_exchange("question 0", "answer 0")
+        memory.add_exchange("question 1", "answer 1")
+        _settled(memory)
+
+    assert memory.summary == ""
+    assert len(memory.turns) == 4
+    assert [record.getMessage() for record in caplog.records] == [
+        "Failed to summarize chat history: model unavailable"
+    ]
@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select, text
+
+from src.app.db import (
+    MIGRATIONS_DIR,
+    get_session_factory,
+    init_database,
+    migrate_database,
+)
+from src.app.models.customer import ProfileNiche
+from src.app.models.expansion import ExpansionDomain
+from src.app.models.market import MarketSearchResult, MarketTrend, ResearchQuestion
+from src.app.routers.market_analysis import MarketAnalysisReport, ProblemBreakdown
+from src.app.services.customer_service import (
+    load_customer_discovery,
+    save_customer_discovery,
+)
+from src.app.services.expansion_service import (
+    load_market_expansion,
+    save_market_expansion,
+)
+from src.app.services.market_service import load_market_analysis, save_market_analysis
+from src.app.services.pipeline_service import run_pipeline
+
+
+@pytest.fixture
+def result(services):
+    init_database()
+    return asyncio.run(run_pipeline("urban farming", services=services))
+
+
+def test_reports_round_trip_through_their_own_tables(result):
+    with get_session_factory()() as db:
+        profile = save_customer_discovery(db, result.customer_discovery)
+        analysis = save_market_analysis(db, result.market_analysis)
+        expansion = save_market_expansion(
+            db, result.market_expansion, result.market_analysis.original_query
+        )
+
+        assert db.scalar(
+            select(func.count()).where(ProfileNiche.profile_id == profile.id)
+        ) == len(result.customer_discovery.niches)
+        assert db.scalar(
+            select(func.count()).where(ResearchQuestion.analysis_id == analysis.id)
+        ) == len(result.market_analysis.problem_breakdown.questions)
+        assert db.scalar(
+            select(func.count()).where(MarketSearchResult.analysis_id == analysis.id)
+        ) == len(result.market_analysis.search_results)
+        assert db.scalar(
+            select(func.count()).where(MarketTrend.analysis_id == analysis.id)
+        ) == 0
+        assert db.scalar(
+            select(func.count()).where(ExpansionDomain.expansion_id == expansion.id)
+        ) == len(result.market_expansion.expansion_domains)
+
+        assert load_customer_discovery(db, "urban farming") == result.customer_discovery
+        assert load_market_analysis(db, "urban farming") == result.market_analysis
+        assert (
+            load_market_expansion(db, "urban farming", "urban farming")
+            == result.market_expansion
+        )
+
+
+def test_long_queries_round_trip():
+    init_database()
+    report = MarketAnalysisReport(
+        original_query="urban farming " + "in dense cities " * 60,
+        problem_breakdown=ProblemBreakdown(questions=["Who grows food indoors?"]),
+        search_results={},
+        comprehensive_report="Vertical farms are spreading",
+    )
+
+    with get_session_factory()() as db:
+        save_market_analysis(db, report)
+
+        assert load_market_analysis(db, report.original_query) == report
+
+
+OLD_PROFILE_COLUMNS = {
+    "id",
+    "user_id",
+    "segment_name",
+    "demographics",
+    "behaviors",
+    "needs",
+    "pain_points",
+    "created_at",
+    "updated_at",
+}
+
+
+def _earlier_schema(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE customer_profiles (id INTEGER PRIMARY KEY, user_id INTEGER, "
+                "segment_name VARCHAR(255), demographics JSON, behaviors JSON, "
+                "needs JSON, pain_points JSON, created_at DATETIME, updated_at DATETIME)"
+            )
+        )
+        connection.execute(
+            text("INSERT INTO customer_profiles (segment_name) VALUES ('x')")
+        )
+    return engine
+
+
+def _alembic(engine, step, revision):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(MIGRATIONS_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        getattr(command, step)(config, revision)
+
+
+def test_migration_upgrades_a_database_from_the_earlier_schema(tmp_path):
+    engine = _earlier_schema(tmp_path / "old.db")
+
+    migrate_database(engine)
+    # A second run finds nothing left to do
+    migrate_database(engine)
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("customer_profiles")}
+    assert {"lookup_key", "partial", "ideal_customer_profile"} <= columns
+    assert "profile_niches" in inspector.get_table_names()
+    assert "ix_customer_profiles_lookup_key" in {
+        index["name"] for index in inspector.get_indexes("customer_profiles")
+    }
+    with engine.connect() as connection:
+        version = connection.execute(text("SELECT version_num FROM alembic_version"))
+        assert version.scalar() == "0001"
+        partial = connection.execute(text("SELECT partial FROM customer_profiles"))
+        assert partial.scalar() == 0
+    engine.dispose()
+
+
+def test_downgrade_drops_only_what_the_upgrade_added(tmp_path):
+    engine = _earlier_schema(tmp_path / "old.db")
+    migrate_database(engine)
+
+    _alembic(engine, "downgrade", "base")
+    # A database marked as migrated without the upgrade having run
+    _alembic(engine, "stamp", "0001")
+    _alembic(engine, "downgrade", "base")
+
+    inspector = inspect(engine)
+    columns = {column["name"] for column in inspector.get_columns("customer_profiles")}
+    assert columns == OLD_PROFILE_COLUMNS
+    assert "profile_niches" not in inspector.get_table_names()
+    with engine.connect() as connection:
+        segment = connection.execute(text("SELECT segment_name FROM customer_profiles"))
+        assert segment.scalar() == "x"
+    engine.dispose()
+
+
+def test_expansion_and_evolution_endpoints_are_mounted(client, result, completion_handler):
+    reports = {
+        "customer_discovery_report": result.customer_discovery.model_dump(mode="json"),
+        "market_analysis_report": result.market_analysis.model_dump(mode="json"),
+    }
+
+    first = client.post("/market-expansion/expand", json=reports)
+    calls = len(completion_handler.calls)
+    second = client.post("/market-expansion/expand", json=reports)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert len(completion_handler.calls) == calls
+
+    evolved = client.post(
+        "/product-evolution/evolve",
+        json={
+            "customer_discovery": reports["customer_discovery_report"],
+            "market_analysis": reports["market_analysis_report"],
+            "market_expansion": first.json(),
+        },
+    )
+    assert evolved.status_code == 200
+    assert evolved.json()["phases"] == []
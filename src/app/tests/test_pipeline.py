@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import threading
+
+import pytest
+
+from src.app.services import pipeline_service
+from src.app.services.pipeline_service import (
+    PipelineOrchestrator,
+    PipelineStage,
+    run_pipeline,
+)
+
+
+def test_independent_stages_run_concurrently():
+    # Both stages must be inside run() at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(domain, results, context):
+        barrier.wait()
+        return domain
+
+    orchestrator = PipelineOrchestrator(
+        [
+            PipelineStage("a", meet),
+            PipelineStage("b", meet),
+            PipelineStage(
+                "c",
+                lambda domain, results, context: sorted(results),
+                depends_on=("a", "b"),
+            ),
+        ]
+    )
+
+    results = asyncio.run(orchestrator.run("fintech"))
+
+    assert results["a"] == results["b"] == "fintech"
+    assert results["c"] == ["a", "b"]
+    assert set(results["stage_timings"]) == {"a", "b", "c"}
+
+
+def test_resolve_includes_dependencies_in_order():
+    orchestrator = PipelineOrchestrator()
+
+    assert orchestrator.resolve(["market_expansion"]) == [
+        "customer_discovery",
+        "market_analysis",
+        "market_expansion",
+    ]
+    with pytest.raises(ValueError):
+        orchestrator.resolve(["unknown"])
+
+
+def test_dependency_cycles_are_rejected():
+    noop = lambda domain, results, context: None  # noqa: E731
+
+    with pytest.raises(ValueError, match="cycle"):
+        PipelineOrchestrator(
+            [
+                PipelineStage("a", noop, depends_on=("b",)),
+                PipelineStage("b", noop, depends_on=("a",)),
+            ]
+        )
+
+
+def test_run_pipeline_produces_every_report(services):
+    result = asyncio.run(run_pipeline("pet care", services=services))
+
+    assert result.customer_discovery.primary_domain == "pet care"
+    assert len(result.customer_discovery.niches) == 3
+    assert result.market_analysis.original_query == "pet care"
+    assert result.market_expansion.expansion_domains
+    assert result.product_evolution.user_adoption_trend is not None
+
+
+def test_progress_of_every_stage_reaches_the_caller(services):
+    events = []
+
+    asyncio.run(
+        run_pipeline(
+            "pet care",
+            targets=["customer_discovery", "market_analysis"],
+            services=services,
+            on_progress=lambda kind, payload: events.append(kind),
+        )
+    )
+
+    assert events.count("niche") == 3
+    assert {"year", "question"} <= set(events)
+
+
+def test_failed_persistence_is_logged_and_the_result_kept(services, monkeypatch, caplog):
+    def unavailable():
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(pipeline_service, "get_session_factory", unavailable)
+
+    with caplog.at_level(logging.ERROR, logger=pipeline_service.__name__):
+        result = asyncio.run(
+            run_pipeline("pet care", targets=["customer_discovery"], services=services)
+        )
+
+    assert result.customer_discovery is not None
+    assert "Failed to persist pipeline reports for pet care" in caplog.text
+    assert "database unavailable" in caplog.text
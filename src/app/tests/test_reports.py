@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def analyze(client):
+    def post(**params):
+        return client.post(
+            "/market-analysis/analyze",
+            params={"query": "cold brew coffee", **params},
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+    # The first request runs the analysis, later ones are served from the database
+    assert post().status_code == 200
+    return post
+
+
+def test_views_trim_the_stored_report(analyze):
+    full = analyze().json()
+    summary = analyze(view="summary").json()
+    standard = analyze(view="standard").json()
+
+    assert "search_results" in full and "search_results" not in summary
+    assert summary["comprehensive_report"] == full["comprehensive_report"]
+    assert len(json.dumps(summary)) < len(json.dumps(standard)) < len(json.dumps(full))
+
+
+def test_fields_select_top_level_fields(analyze):
+    assert set(analyze(fields="original_query, partial").json()) == {
+        "original_query",
+        "partial",
+    }
+    assert analyze(fields="nonexistent").status_code == 400
+
+
+def test_large_reports_are_compressed(analyze):
+    response = analyze()
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert analyze(fields="partial").headers.get("content-encoding") is None
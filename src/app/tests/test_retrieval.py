@@ -0,0 +1,72 @@
+from src.app.services.retrieval_service import (
+    ReportChunk,
+    ReportIndex,
+    chat_system_prompt,
+    chunk_reports,
+    report_summary,
+)
+
+REPORTS = {
+    "domain": "pet care",
+    "problem_statement": "Owners struggle to find vets",
+    "customer_discovery": {
+        "primary_domain": "pet care",
+        "niches": [
+            {"name": "Dog walkers", "description": "Walk dogs for busy owners in cities"},
+            {"name": "Cat sitters", "description": "Feed cats while owners travel"},
+        ],
+        "raw_search_results": ["secret raw page about dogs"],
+        "search_results": [{"hash": "ab" * 32, "excerpt": "stored page", "length": 10}],
+    },
+    "market_analysis": {
+        "original_query": "pet care",
+        "comprehensive_report": (
+            "Veterinary insurance adoption doubled. " * 40
+            + "\n\nSubscription pet food grows fastest in suburbs. " * 40
+        ),
+    },
+}
+
+
+def test_chunks_are_bounded_and_leave_raw_texts_out():
+    chunks = chunk_reports(REPORTS, max_chars=300)
+    text = "\n".join(chunk.text for chunk in chunks)
+
+    assert all(len(chunk.text) <= 300 for chunk in chunks)
+    assert {chunk.report for chunk in chunks} == {"customer_discovery", "market_analysis"}
+    assert "Walk dogs for busy owners" in text
+    assert "secret raw page" not in text
+    assert "stored page" not in text
+
+
+def test_search_ranks_the_matching_passage_first():
+    index = ReportIndex.from_reports(REPORTS)
+
+    chunk, score = index.search("who walks dogs for owners?", k=1)[0]
+
+    assert chunk.report == "customer_discovery"
+    assert "Dog walkers" in chunk.text
+    assert score > 0
+    assert index.search("zzzz qqqq") == []
+    assert ReportIndex([]).search("dogs") == []
+
+
+REPORT = "market_analysis"
+
+
+def test_chat_prompt_sends_the_summary_and_best_passages_only():
+    index = ReportIndex(
+        [
+            ReportChunk(report=REPORT, section="trends", text="Insurance doubled"),
+            ReportChunk(report=REPORT, section="food", text="Pet food subscriptions"),
+        ]
+    )
+    summary = report_summary(REPORTS)
+
+    prompt = chat_system_prompt(index, summary, "How fast is insurance growing?", k=1)
+
+    assert "Domain: pet care" in summary
+    assert "customer_discovery > niches: Dog walkers, Cat sitters" in summary
+    assert "[market_analysis / trends]\nInsurance doubled" in prompt
+    assert "Pet food subscriptions" not in prompt
+    assert "No passage matched" in chat_system_prompt(index, summary, "zzzz")
@@ -0,0 +1,35 @@
+import asyncio
+
+from src.app.db import get_async_session_factory, get_session_factory
+from src.app.services.customer_service import save_customer_discovery
+from src.app.services.market_service import save_market_analysis
+from src.app.services.pipeline_service import run_pipeline
+from src.app.services.search_service import search_reports
+
+
+def search(query, kind=None):
+    async def run():
+        async with get_async_session_factory()() as db:
+            return await search_reports(db, query, kind=kind)
+
+    return asyncio.run(run())
+
+
+def test_resaving_a_report_replaces_its_index_entries(services):
+    result = asyncio.run(run_pipeline("aquaponics", services=services))
+    with get_session_factory()() as db:
+        save_market_analysis(db, result.market_analysis)
+        latest = save_market_analysis(db, result.market_analysis).id
+        profile = save_customer_discovery(db, result.customer_discovery).id
+
+    hits = search("aquaponics", kind="market_report")
+    assert [hit["ref_id"] for hit in hits] == [latest]
+
+    search_texts = search("aquaponics", kind="market_search_text")
+    # Three saves of the same report leave one copy of its yearly insights
+    assert [hit["ref_id"] for hit in search_texts] == [latest]
+
+    # Both kinds of search text share the search_text filter
+    kinds = {hit["kind"] for hit in search("page text", kind="search_text")}
+    assert kinds == {"market_search_text", "niche_search_text"}
+    assert {hit["ref_id"] for hit in search("solo founders", kind="niche")} >= {profile}
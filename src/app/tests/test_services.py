@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from src.app import dependencies
+from src.app.dependencies import ServiceContainer, get_service_container, get_services
+
+
+def test_analyzers_borrow_the_containers_clients(services):
+    from src.app.routers.market_analysis import MarketAnalyzer
+
+    analyzer = MarketAnalyzer(services=services)
+
+    assert analyzer.exa is services.exa
+    assert analyzer.jina is services.jina
+    assert analyzer.blobs is services.blobs
+    assert analyzer.documents is services.documents
+
+
+def test_service_container_is_created_once(monkeypatch):
+    monkeypatch.setattr(dependencies, "_services", None)
+
+    container = get_service_container()
+
+    assert isinstance(container, ServiceContainer)
+    assert get_service_container() is container
+
+
+def test_get_services_prefers_the_lifespan_container(services, monkeypatch):
+    fallback = object()
+    monkeypatch.setattr(dependencies, "_services", fallback)
+
+    with_state = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(services=services)))
+    without_state = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace()))
+
+    assert get_services(with_state) is services
+    assert get_services(without_state) is fallback
+
+
+def test_lifespan_warms_up_one_shared_container(services, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import create_application
+
+    warmed = []
+    monkeypatch.setattr(dependencies, "_services", services)
+    monkeypatch.setattr(services, "warm_up", lambda: warmed.append(True), raising=False)
+
+    application = create_application()
+    with TestClient(application):
+        assert application.state.services is services
+
+    assert warmed == [True]
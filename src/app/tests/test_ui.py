@@ -0,0 +1,200 @@
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from src.app.utils.helpers import lookup_key  # noqa: E402
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+UI_DIR = SRC_DIR / "ui"
+
+
+def stage_app(src_dir, ui_dir):
+    """Script running one memoized stage whose compute is counted"""
+    import sys
+
+    for path in (src_dir, ui_dir):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import streamlit as st
+    from ui import MarketInsightUI
+
+    ui = MarketInsightUI()
+    domain = ui.reports["domain"] = st.session_state.get("domain", "pet care")
+    computed = st.session_state.setdefault("computed", [])
+
+    def compute(checkpoint, on_progress):
+        computed.append(checkpoint.prefix)
+        on_progress("question", {"question": "Who buys?", "analysis": "Owners"})
+        return {"run": len(computed), "domain": domain}
+
+    result = ui._run_stage("customer_discovery", "Working", compute)
+    if result is not None:
+        st.write(f"report {result['report']['run']}")
+    ui._recompute_control("customer_discovery")
+
+
+def _run_until_computed(app, timeout=5.0):
+    """Rerun the script until the stage's background run has been collected"""
+    deadline = time.monotonic() + timeout
+    app.run()
+    while app.session_state["background_runs"]:
+        assert time.monotonic() < deadline, "stage did not finish"
+        time.sleep(0.05)
+        app.run()
+    return app
+
+
+@pytest.fixture
+def app():
+    return AppTest.from_function(
+        stage_app, args=(str(SRC_DIR), str(UI_DIR)), default_timeout=10
+    )
+
+
+def test_stage_computes_once_per_domain(app):
+    _run_until_computed(app)
+    app.run()
+    app.run()
+
+    assert app.session_state["computed"] == ["customer_discovery/"]
+    assert app.session_state["reports"]["customer_discovery"]["run"] == 1
+    assert any("report 1" in block.value for block in app.markdown)
+    assert app.session_state["stage_results"][
+        ("customer_discovery", lookup_key("pet care"))
+    ]["log"] == "Question answered: Who buys?"
+
+    app.session_state["domain"] = "fintech"
+    _run_until_computed(app)
+
+    assert len(app.session_state["computed"]) == 2
+    assert app.session_state["reports"]["customer_discovery"]["domain"] == "fintech"
+
+
+def test_recompute_runs_the_stage_again_under_a_fresh_scope(app):
+    _run_until_computed(app)
+
+    app.button(key="recompute_customer_discovery").click()
+    _run_until_computed(app)
+
+    assert app.session_state["computed"] == [
+        "customer_discovery/",
+        "customer_discovery-1/",
+    ]
+    assert app.session_state["reports"]["customer_discovery"]["run"] == 2
+
+
+def export_app(src_dir, ui_dir):
+    """Script showing the PDF export status of reports that can be replaced"""
+    import sys
+    from types import SimpleNamespace
+
+    for path in (src_dir, ui_dir):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    import streamlit as st
+    from ui import MarketInsightUI
+
+    ui = MarketInsightUI()
+    version = st.session_state.get("version", 1)
+    if st.session_state.get("shown_version") != version:
+        ui.reports["customer_discovery"] = {"niches": [f"niche {version}"]}
+        st.session_state.shown_version = version
+    if "pdf_export" not in st.session_state:
+        pdf = SimpleNamespace(read_bytes=lambda: b"%PDF")
+        st.session_state.pdf_export = {
+            "digest": ui._reports_digest(),
+            "run": SimpleNamespace(done=True, failed=False, result=pdf),
+        }
+    ui._pdf_export_status()
+    st.write(f"digest {ui._reports_digest()}")
+
+
+def test_report_digest_is_recomputed_only_when_a_report_changes(monkeypatch):
+    monkeypatch.syspath_prepend(str(UI_DIR))
+    import ui
+
+    digests = []
+
+    def counting_digest(reports):
+        digests.append(reports["customer_discovery"])
+        return f"digest-{len(digests)}"
+
+    monkeypatch.setattr(ui, "report_digest", counting_digest)
+    app = AppTest.from_function(export_app, args=(str(SRC_DIR), str(UI_DIR)))
+
+    for _ in range(3):
+        app.run()
+    assert not app.exception
+    assert digests == [{"niches": ["niche 1"]}]
+
+    app.session_state["version"] = 2
+    app.run()
+    app.run()
+    assert digests == [{"niches": ["niche 1"]}, {"niches": ["niche 2"]}]
+    assert any("digest digest-2" in block.value for block in app.markdown)
+
+
+def viewer_app(src_dir, ui_dir):
+    """Script browsing a partial report with a long list of niches"""
+    import sys
+
+    for path in (src_dir, ui_dir):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    from typing import List
+
+    import streamlit as st
+    from pydantic import BaseModel
+    from report_viewer import ReportViewer
+
+    class Report(BaseModel):
+        summary: str
+        niches: List[dict]
+        competitors: List[str] = []
+        partial: bool = False
+
+    if "report" not in st.session_state:
+        st.session_state.report = Report(
+            summary="Pet care is growing",
+            niches=[
+                {"name": f"Niche {n}", "description": f"About niche {n}"}
+                for n in range(1, 26)
+            ],
+            partial=True,
+        )
+    ReportViewer("customer_discovery", st.session_state.report).render()
+
+
+def _viewer_cache(app):
+    return app.session_state["report_sections"]["customer_discovery"]
+
+
+def test_report_viewer_pages_through_one_section_at_a_time():
+    app = AppTest.from_function(viewer_app, args=(str(SRC_DIR), str(UI_DIR)))
+    app.run()
+
+    sections = app.selectbox(key="customer_discovery/section")
+    assert sections.options == ["Summary", "Niches"]
+    assert "Partial report" in app.warning[0].value
+    assert set(_viewer_cache(app)["sections"]) == {"summary"}
+
+    sections.select("niches").run()
+    page = app.number_input(key="customer_discovery/niches/page")
+    assert page.label == "Page (of 3, 25 items)"
+    assert [expander.label for expander in app.expander][:2] == ["1. Niche 1", "2. Niche 2"]
+    assert len(app.expander) == 10
+
+    page.set_value(3).run()
+    assert [expander.label for expander in app.expander] == [
+        f"{n}. Niche {n}" for n in range(21, 26)
+    ]
+    assert set(_viewer_cache(app)["sections"]) == {"summary", "niches"}
+    assert _viewer_cache(app)["selected"] == "niches"
@@ -0,0 +1,105 @@
+import asyncio
+import inspect
+import threading
+import time
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+# Called with the kind of work that finished (e.g. "niche", "year") and its result
+ProgressCallback = Callable[[str, Any], None]
+
+
+class ProgressEvent(NamedTuple):
+    kind: str
+    payload: Any
+    elapsed: float
+
+
+class BackgroundRun:
+    """
+    A long-running job executed on its own daemon thread.
+
+    The job receives a progress callback and may be a plain function or a
+    coroutine function. Nothing ties it to the caller, so a Streamlit session
+    can keep the run in its session state, poll it on every rerun and
+    navigate elsewhere without cancelling it.
+    """
+
+    def __init__(self, target: Callable[[ProgressCallback], Any], name: str = "run"):
+        """
+        Args:
+            target (Callable): Receives the progress callback and returns the result
+            name (str): Thread name, useful in logs and debuggers
+        """
+        self.name = name
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self._target = target
+        self._events: List[ProgressEvent] = []
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._started = time.monotonic()
+        self._finished: Optional[float] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "BackgroundRun":
+        self._thread.start()
+        return self
+
+    def report(self, kind: str, payload: Any = None):
+        """Progress callback handed to the job; safe to call from any thread"""
+        with self._lock:
+            self._events.append(
+                ProgressEvent(kind, payload, time.monotonic() - self._started)
+            )
+
+    def _run(self):
+        try:
+            result = self._target(self.report)
+            if inspect.isawaitable(result):
+                result = asyncio.run(result)
+            self.result = result
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._finished = time.monotonic()
+            self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def failed(self) -> bool:
+        return self.done and self.error is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self._finished or time.monotonic()) - self._started
+
+    def events(self, since: int = 0) -> List[ProgressEvent]:
+        """Progress events reported so far, optionally only those after index since"""
+        with self._lock:
+            return self._events[since:]
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the run finishes; returns whether it did within timeout"""
+        return self._done.wait(timeout)
+
+
+def start_background_run(
+    target: Callable[[ProgressCallback], Any], name: str = "run"
+) -> BackgroundRun:
+    """Start target on a daemon thread and return its handle"""
+    return BackgroundRun(target, name).start()
+
+
+def progress_summary(event: ProgressEvent) -> Tuple[str, str]:
+    """Headline and body text of a niche, year or question progress event"""
+    payload = event.payload
+    if event.kind == "niche":
+        return f"Niche researched: {payload.name}", payload.description
+    if event.kind == "year":
+        return f"Year analysed: {payload['year']}", payload["analysis"]
+    if event.kind == "question":
+        return f"Question answered: {payload['question']}", payload["analysis"]
+    return event.kind.replace("_", " ").capitalize(), "" if payload is None else str(payload)
@@ -0,0 +1,12 @@
+import hashlib
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case a query and collapse its whitespace"""
+    return " ".join(query.lower().split())
+
+
+def lookup_key(*parts: str) -> str:
+    """Stable key identifying a report by the normalized inputs it was built from"""
+    normalized = "\n".join(normalize_query(part) for part in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
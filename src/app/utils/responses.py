@@ -0,0 +1,72 @@
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+
+class ChartFormat(str, Enum):
+    """How an endpoint returns a chart"""
+
+    IMAGE = "image"
+    SPEC = "spec"
+
+
+class ReportView(str, Enum):
+    """How much of a report an endpoint returns"""
+
+    SUMMARY = "summary"
+    STANDARD = "standard"
+    FULL = "full"
+
+
+def report_response(
+    report: BaseModel,
+    view: ReportView = ReportView.FULL,
+    fields: Optional[str] = None,
+    view_excludes: Optional[Dict[ReportView, Any]] = None,
+) -> Response:
+    """
+    Project a report and serialize it straight to JSON bytes.
+
+    Args:
+        report (BaseModel): Report to return
+        view (ReportView): Predefined projection, applied when fields is not given
+        fields (str, optional): Comma-separated top-level fields to return
+        view_excludes (Dict[ReportView, Any], optional): Pydantic exclude spec of
+            every view of this report type
+
+    Returns:
+        Response: JSON response serialized by pydantic-core, skipping FastAPI's
+            jsonable_encoder pass over the whole report
+
+    Raises:
+        HTTPException: If fields names a field the report does not have
+    """
+    if fields:
+        include = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = include - set(type(report).model_fields)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {sorted(unknown)}. "
+                f"Available fields: {list(type(report).model_fields)}",
+            )
+        content = report.model_dump_json(include=include)
+    else:
+        exclude = (view_excludes or {}).get(view)
+        content = report.model_dump_json(exclude=exclude)
+
+    return Response(content=content, media_type="application/json")
+
+
+def accepted_response(
+    status: BaseModel, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """202 response for a run that continues in the background"""
+    return Response(
+        content=status.model_dump_json(),
+        status_code=202,
+        media_type="application/json",
+        headers=headers,
+    )
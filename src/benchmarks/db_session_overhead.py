@@ -0,0 +1,90 @@
+"""
+Per-request database overhead before and after sharing the engine.
+
+Usage (from the repository root):
+
+    python src/benchmarks/db_session_overhead.py --requests 500
+
+"before" reproduces the old get_db: settings, a new engine (with its
+database_exists round-trip) and a new sessionmaker for every request.
+"after" draws sessions from the process-wide factory created at startup.
+Each simulated request runs a single trivial query.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SRC_DIR, os.path.dirname(SRC_DIR)):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import argparse
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy_utils import create_database, database_exists
+
+from src.app import db
+from src.app.config import Settings
+
+
+def _per_request_engine(settings: Settings):
+    """The previous get_db implementation"""
+    engine = create_engine(settings.DATABASE_URL)
+    if not database_exists(engine.url):
+        create_database(engine.url)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    try:
+        session = SessionLocal()
+        yield session
+    finally:
+        session.close()
+
+
+def _measure(open_session, requests: int) -> list:
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        sessions = open_session()
+        session = next(sessions)
+        session.execute(text("SELECT 1"))
+        sessions.close()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list):
+    ordered = sorted(timings)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(
+        f"{label:<8} mean={statistics.mean(timings):.3f}ms "
+        f"p50={statistics.median(timings):.3f}ms p95={p95:.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings = Settings(DATABASE_URL=f"sqlite:///{tmp_dir}/bench.db")
+
+        before = _measure(lambda: _per_request_engine(settings), args.requests)
+
+        db.init_database(settings)
+        after = _measure(db.get_db, args.requests)
+        db.dispose_database()
+
+    print(f"Per-request DB overhead over {args.requests} requests")
+    _report("before", before)
+    _report("after", after)
+    print(f"speedup  {statistics.mean(before) / statistics.mean(after):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
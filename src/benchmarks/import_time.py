@@ -0,0 +1,84 @@
+"""
+Cold-start import time of the API and the Streamlit app.
+
+Usage (from the repository root):
+
+    python src/benchmarks/import_time.py --runs 5 --top 10
+
+Every run imports the entry module in a fresh interpreter, so nothing is
+shared between runs except the OS file cache. The slowest imports of the
+last run are listed from -X importtime, which makes a heavy dependency
+creeping back onto the startup path easy to spot.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SRC_DIR)
+
+# Entry module of each target and the paths its own launcher puts on sys.path
+TARGETS = {
+    "api": ("app.main", [ROOT_DIR, SRC_DIR]),
+    "streamlit": ("ui", [ROOT_DIR, SRC_DIR, os.path.join(SRC_DIR, "ui")]),
+}
+
+TIMER = """
+import sys, time
+sys.path[:0] = {paths!r}
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+
+def _run(module: str, paths: list, cwd: str, importtime: bool = False):
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += ["-c", TIMER.format(paths=paths, module=module)]
+    return subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=True)
+
+
+def _slowest_imports(stderr: str, top: int) -> list:
+    """Parse -X importtime output into (cumulative microseconds, module) pairs"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--targets", nargs="*", default=list(TARGETS))
+    args = parser.parse_args()
+
+    # Run from a scratch directory so nothing the imports write lands in the repo
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for target in args.targets:
+            module, paths = TARGETS[target]
+            timings = [
+                float(_run(module, paths, tmp_dir).stdout.strip().splitlines()[-1])
+                for _ in range(args.runs)
+            ]
+            print(
+                f"{target:<10} import {module}: "
+                f"mean={statistics.mean(timings):.3f}s min={min(timings):.3f}s"
+            )
+
+            profile = _run(module, paths, tmp_dir, importtime=True)
+            for cumulative, name in _slowest_imports(profile.stderr, args.top):
+                print(f"    {cumulative / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Full-text search latency over a synthetic corpus of stored reports.
+
+Usage (from the repository root):
+
+    python src/benchmarks/report_search.py --reports 20000 --queries 200
+
+Every synthetic report contributes a comprehensive report, a search text
+and a niche description to the FTS5 index. Queries go through the same
+search_reports helper as the /search endpoint.
+"""
+
+import os
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (SRC_DIR, os.path.dirname(SRC_DIR)):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import tempfile
+import time
+
+from src.app import db
+from src.app.config import Settings
+from src.app.services.search_service import (
+    MARKET_REPORT,
+    MARKET_SEARCH_TEXT,
+    NICHE,
+    index_documents,
+    search_reports,
+)
+
+# A few common domain words followed by a long tail of rarer terms, so word
+# frequencies fall off roughly like natural text
+WORDS = (
+    "market growth adoption pricing retail logistics farming energy battery "
+    "solar fintech payments lending insurance health clinic telemedicine "
+    "education tutoring robotics warehouse drone agriculture hydroponic "
+    "subscription enterprise consumer regulation europe asia investment "
+    "startup platform marketplace analytics security cloud mobile gaming"
+).split() + [f"term{i}" for i in range(20000)]
+CUM_WEIGHTS = list(
+    itertools.accumulate(1 / rank for rank in range(1, len(WORDS) + 1))
+)
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    return " ".join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=length))
+
+
+def _populate(reports: int, rng: random.Random):
+    documents = []
+    for ref_id in range(1, reports + 1):
+        documents += [
+            {
+                "kind": MARKET_REPORT,
+                "ref_id": ref_id,
+                "title": _sentence(rng, 3),
+                "body": _sentence(rng, 400),
+            },
+            {
+                "kind": MARKET_SEARCH_TEXT,
+                "ref_id": ref_id,
+                "title": _sentence(rng, 6),
+                "body": _sentence(rng, 150),
+            },
+            {
+                "kind": NICHE,
+                "ref_id": ref_id,
+                "title": _sentence(rng, 2),
+                "body": _sentence(rng, 40),
+            },
+        ]
+    with db.get_session_factory()() as session:
+        index_documents(session, documents)
+        session.commit()
+
+
+async def _measure(queries, kind=None) -> list:
+    timings = []
+    async with db.get_async_session_factory()() as session:
+        for query in queries:
+            started = time.perf_counter()
+            await search_reports(session, query, kind=kind, limit=20)
+            timings.append((time.perf_counter() - started) * 1000)
+    await db.dispose_async_database()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reports", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        settings = Settings(DATABASE_URL=f"sqlite:///{tmp_dir}/bench.db")
+        db.init_database(settings)
+        db.init_async_database(settings)
+
+        started = time.perf_counter()
+        _populate(args.reports, rng)
+        print(
+            f"Indexed {args.reports * 3} documents from {args.reports} reports "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        queries = [_sentence(rng, rng.randint(1, 3)) for _ in range(args.queries)]
+        timings = asyncio.run(_measure(queries))
+        db.dispose_database()
+
+    ordered = sorted(timings)
+    print(
+        f"Search over {args.queries} queries: "
+        f"mean={statistics.mean(timings):.2f}ms "
+        f"p50={statistics.median(timings):.2f}ms "
+        f"p95={ordered[int(0.95 * (len(ordered) - 1))]:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,7 +12,7 @@ from src.app.schemas.llm import ChatRequest, Message
 from src.app.llm import LiteLLMKit
 from src.analysis.market_analysis import get_market_report
 from src.analysis.customer_discoverer import get_customer_discoverer
-import asyncio
+from src.app.utils.background import progress_summary, start_background_run
 
 # Load environment variables
 load_dotenv()
@@ -30,17 +30,36 @@ if "messages" not in st.session_state:
     st.session_state.messages = []
     st.session_state.awaiting_input = False  # Track whether we're waiting for user input
 
+# Analysis running in the background for this session, if any
+if "analysis_run" not in st.session_state:
+    st.session_state.analysis_run = None
+
 # Steps for the flow
-async def analysis_step(analysis_topic: str):
+async def analysis_step(analysis_topic: str, on_progress=None):
     # Asynchronous calls to fetch data
-    customer_analysis = await get_customer_discoverer(analysis_topic)
-    report, graph = await get_market_report(analysis_topic)
+    customer_analysis = await get_customer_discoverer(analysis_topic, on_progress)
+    report, graph = await get_market_report(analysis_topic, on_progress)
     combined_analysis = (
         f"**Customer Insights:** {customer_analysis}\n\n"
         f"**Market Analysis Report:** {report}"
     )
     return combined_analysis, graph
 
+
+@st.fragment(run_every=2)
+def show_analysis_progress(run):
+    """Poll the running analysis and show every niche and year finished so far"""
+    if run.done:
+        # Rerun the whole script so the result lands in the chat history
+        st.rerun()
+
+    with st.chat_message("assistant"):
+        st.markdown(f"Analysing the market... ({run.elapsed:.0f}s)")
+        for event in run.events():
+            headline, body = progress_summary(event)
+            with st.expander(headline):
+                st.markdown(body)
+
 # Display chat history
 for message in st.session_state.messages:
     with st.chat_message(message["role"]):
@@ -58,6 +77,11 @@ if not st.session_state.awaiting_input:
 
 # Accept user input
 if prompt := st.chat_input("Your response here..."):
+    if st.session_state.analysis_run is not None:
+        st.warning("An analysis is still running, please wait for it to finish.")
+        prompt = None
+
+if prompt:
     try:
         # Add user message to chat history
         st.session_state.messages.append({"role": "user", "content": prompt})
@@ -72,14 +96,31 @@ if prompt := st.chat_input("Your response here..."):
         with st.chat_message("assistant"):
             st.markdown("Please wait while we analyse the market for you!")
 
-        # Proceed to analysis
-        response_text, graph = asyncio.run(analysis_step(prompt))  # Perform analysis
+        # Proceed to analysis on a background thread, so the session stays
+        # responsive and the run survives reruns and navigation
+        st.session_state.analysis_run = start_background_run(
+            lambda on_progress: analysis_step(prompt, on_progress), name="analysis"
+        )
+    except Exception as e:
+        # Restart conversation on error
+        st.error("An error occurred. Restarting conversation.")
+        st.session_state.messages.clear()
+
+# Show the running analysis, or its result once it has finished
+run = st.session_state.analysis_run
+if run is not None:
+    if not run.done:
+        show_analysis_progress(run)
+    elif run.failed:
+        # Restart conversation on error
+        st.session_state.analysis_run = None
+        st.error("An error occurred. Restarting conversation.")
+        st.session_state.messages.clear()
+    else:
+        st.session_state.analysis_run = None
+        response_text, graph = run.result
         with st.chat_message("assistant"):
             st.markdown(response_text)
             if graph:
                 st.image(graph, caption="Market Analysis Graph")
         st.session_state.messages.append({"role": "assistant", "content": response_text, "graph": graph})
-    except Exception as e:
-        # Restart conversation on error
-        st.error("An error occurred. Restarting conversation.")
-        st.session_state.messages.clear()
@@ -0,0 +1,56 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from src.app.config import get_settings
+from src.app.db import Base, create_database_engine
+from src.app import models  # noqa: F401  registers the tables on Base
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit the migration SQL for DATABASE_URL without connecting"""
+    context.configure(
+        url=get_settings().DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        render_as_batch=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Migrate the connection handed over by init_database, or DATABASE_URL"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(
+            connection=connection, target_metadata=target_metadata, render_as_batch=True
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    # Only the command line configures logging; the app keeps its own
+    if config.config_file_name is not None:
+        fileConfig(config.config_file_name)
+    engine = create_database_engine(get_settings().DATABASE_URL)
+    try:
+        with engine.connect() as connection:
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                render_as_batch=True,
+            )
+            with context.begin_transaction():
+                context.run_migrations()
+    finally:
+        engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
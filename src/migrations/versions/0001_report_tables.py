@@ -0,0 +1,204 @@
+"""Store report details in dedicated tables and columns
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Reports used to be squeezed into unrelated columns: niches into
+customer_journeys, questions into market_analyses.market_trends, search
+results into market_trends rows and expansion domains into
+market_expansions.entry_strategy and expansion_milestones. They now have
+tables of their own, and the report rows gained the columns they are looked
+up and served by.
+
+Databases created by init_database already have this schema, so every step
+only adds what is missing. Tables missing altogether are left to
+init_database, which creates them from the models.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Columns added to existing report tables
+NEW_COLUMNS = {
+    "customer_profiles": [
+        sa.Column("lookup_key", sa.String(64)),
+        sa.Column("total_market_size", sa.Integer(), server_default="0"),
+        sa.Column("ideal_customer_profile", sa.JSON()),
+        sa.Column("investor_sentiment", sa.JSON()),
+        sa.Column("partial", sa.Boolean(), server_default=sa.false()),
+    ],
+    "market_analyses": [
+        sa.Column("query", sa.Text()),
+        sa.Column("lookup_key", sa.String(64)),
+        sa.Column("comprehensive_report", sa.Text()),
+        sa.Column("partial", sa.Boolean(), server_default=sa.false()),
+    ],
+    "market_expansions": [
+        sa.Column("lookup_key", sa.String(64)),
+        sa.Column("potential_synergies", sa.JSON()),
+        sa.Column("partial", sa.Boolean(), server_default=sa.false()),
+    ],
+}
+
+# Indexed columns, by table
+NEW_INDEXES = {
+    "customer_profiles": ["lookup_key", "user_id", "created_at"],
+    "customer_journeys": ["profile_id", "created_at"],
+    "market_analyses": ["lookup_key", "user_id", "created_at"],
+    "market_trends": ["analysis_id", "created_at"],
+    "market_expansions": ["lookup_key", "user_id", "created_at"],
+    "expansion_milestones": ["expansion_id", "created_at"],
+    "competitor_analyses": ["user_id", "created_at"],
+    "market_positions": ["analysis_id", "created_at"],
+    "products": ["user_id", "created_at"],
+    "product_feedback": ["product_id", "created_at"],
+    "product_iterations": ["product_id", "created_at"],
+    "users": ["created_at"],
+}
+
+
+def _timestamps():
+    return [
+        sa.Column("created_at", sa.DateTime(), index=True),
+        sa.Column("updated_at", sa.DateTime()),
+    ]
+
+
+def _new_tables():
+    """Child tables of the reports as (parent table, table, columns)"""
+    return [
+        (
+            "customer_profiles",
+            "profile_niches",
+            [
+                sa.Column("id", sa.Integer(), primary_key=True),
+                sa.Column(
+                    "profile_id",
+                    sa.Integer(),
+                    sa.ForeignKey("customer_profiles.id"),
+                    index=True,
+                ),
+                sa.Column("name", sa.String(255)),
+                sa.Column("description", sa.Text()),
+                sa.Column("search_query", sa.String(500)),
+                sa.Column("search_results", sa.JSON()),
+                sa.Column("market_size", sa.Integer()),
+                sa.Column("growth_potential", sa.Float()),
+                sa.Column("key_characteristics", sa.JSON()),
+            ],
+        ),
+        (
+            "market_analyses",
+            "research_questions",
+            [
+                sa.Column("id", sa.Integer(), primary_key=True),
+                sa.Column(
+                    "analysis_id",
+                    sa.Integer(),
+                    sa.ForeignKey("market_analyses.id"),
+                    index=True,
+                ),
+                sa.Column("position", sa.Integer()),
+                sa.Column("question", sa.Text()),
+            ],
+        ),
+        (
+            "market_analyses",
+            "market_search_results",
+            [
+                sa.Column("id", sa.Integer(), primary_key=True),
+                sa.Column(
+                    "analysis_id",
+                    sa.Integer(),
+                    sa.ForeignKey("market_analyses.id"),
+                    index=True,
+                ),
+                sa.Column("search_query", sa.Text()),
+                sa.Column("result", sa.JSON()),
+            ],
+        ),
+        (
+            "market_expansions",
+            "expansion_domains",
+            [
+                sa.Column("id", sa.Integer(), primary_key=True),
+                sa.Column(
+                    "expansion_id",
+                    sa.Integer(),
+                    sa.ForeignKey("market_expansions.id"),
+                    index=True,
+                ),
+                sa.Column("name", sa.String(255)),
+                sa.Column("position", sa.Integer()),
+                sa.Column("strategic_rationale", sa.Text()),
+                sa.Column("competitive_landscape", sa.JSON()),
+                sa.Column("investment_requirement", sa.Float()),
+                sa.Column("risk_score", sa.Float()),
+            ],
+        ),
+    ]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for table, columns in NEW_COLUMNS.items():
+        if table not in tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        missing = [column for column in columns if column.name not in existing]
+        if missing:
+            with op.batch_alter_table(table) as batch:
+                for column in missing:
+                    batch.add_column(column)
+
+    for parent, table, columns in _new_tables():
+        if parent in tables and table not in tables:
+            op.create_table(table, *columns, *_timestamps())
+
+    for table, columns in NEW_INDEXES.items():
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for column in columns:
+            name = f"ix_{table}_{column}"
+            if name not in existing:
+                op.create_index(name, table, [column])
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    for table, columns in NEW_INDEXES.items():
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for column in columns:
+            name = f"ix_{table}_{column}"
+            if name in existing:
+                op.drop_index(name, table_name=table)
+
+    for _, table, _ in reversed(_new_tables()):
+        if table in tables:
+            op.drop_table(table)
+
+    for table, columns in NEW_COLUMNS.items():
+        if table not in tables:
+            continue
+        # None of these columns predate this revision, so those present were added
+        # by its upgrade or by init_database; columns never added are skipped
+        existing = {column["name"] for column in inspector.get_columns(table)}
+        added = [column for column in columns if column.name in existing]
+        if added:
+            with op.batch_alter_table(table) as batch:
+                for column in added:
+                    batch.drop_column(column.name)
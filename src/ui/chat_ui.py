@@ -1,6 +1,13 @@
 import streamlit as st
 from app.llm import LiteLLMKit
-from app.schemas.llm import ChatRequest, Message
+from app.schemas.llm import ChatRequest
+from app.services.memory_service import ConversationMemory, llm_summarizer
+from app.services.retrieval_service import (
+    REPORT_KEYS,
+    ReportIndex,
+    chat_system_prompt,
+    report_summary,
+)
 
 
 class MarketInsightsChatUI:
@@ -12,38 +19,30 @@ class MarketInsightsChatUI:
         self.llm = LiteLLMKit(model_name="gpt-4o", temperature=0.7)
         self.chat_history = []
 
-    def _generate_system_context(self):
-        """Create a comprehensive system context from reports"""
-        context = """
-        You are an expert market strategy consultant analyzing the following comprehensive market insights:
-
-        Domain: {domain}
-        Problem Statement: {problem_statement}
-        Solution Approach: {solution_approach}
-
-        Customer Discovery Report:
-        {customer_discovery}
-
-        Market Analysis Report:
-        {market_analysis}
-
-        Market Expansion Strategy:
-        {market_expansion}
-
-        Product Evolution Strategy:
-        {product_evolution}
+        # Recent turns plus a rolling summary, kept across reruns
+        if "market_insights_memory" not in st.session_state:
+            st.session_state.market_insights_memory = ConversationMemory(
+                llm_summarizer(LiteLLMKit(model_name="gpt-4o-mini", temperature=0.3))
+            )
+        self.memory = st.session_state.market_insights_memory
+
+    def _report_index(self):
+        """Chunk and index the reports once per session and set of reports"""
+        key = tuple(id(self.reports.get(name)) for name in REPORT_KEYS)
+        cached = st.session_state.get("market_insights_index")
+        if cached is None or cached[0] != key:
+            cached = (
+                key,
+                ReportIndex.from_reports(self.reports),
+                report_summary(self.reports),
+            )
+            st.session_state.market_insights_index = cached
+        return cached[1], cached[2]
 
-        Provide insightful, strategic, and actionable responses to user queries.
-        """.format(
-            domain=self.reports.get("domain", "Unknown"),
-            problem_statement=self.reports.get("problem_statement", ""),
-            solution_approach=self.reports.get("solution_approach", ""),
-            customer_discovery=str(self.reports.get("customer_discovery", "")),
-            market_analysis=str(self.reports.get("market_analysis", "")),
-            market_expansion=str(self.reports.get("market_expansion", "")),
-            product_evolution=str(self.reports.get("product_evolution", "")),
-        )
-        return context
+    def _generate_system_context(self, user_query):
+        """Create a system context from a report summary and the passages relevant to the query"""
+        index, summary = self._report_index()
+        return chat_system_prompt(index, summary, user_query)
 
     def run(self):
         """Launch interactive chat interface"""
@@ -75,23 +74,18 @@ class MarketInsightsChatUI:
 
             # Generate AI response
             with st.chat_message("assistant"):
-                message_placeholder = st.empty()
-                
-                # Prepare messages for LLM
-                messages = [
-                    Message(role="system", content=self._generate_system_context()),
-                    Message(role="user", content=user_query)
-                ]
-
-                # Generate response
-                full_response = self.llm.generate(
-                    ChatRequest(messages=messages)
+                # Prepare messages for LLM, with as much history as the budget allows
+                messages = self.memory.messages(
+                    self._generate_system_context(user_query), user_query
                 )
 
-                # Stream the response
-                message_placeholder.markdown(full_response)
+                # Stream the response as it is generated
+                full_response = st.write_stream(
+                    self.llm.stream(ChatRequest(messages=messages))
+                )
 
             # Add assistant response to chat history
             st.session_state.market_insights_chat_history.append(
                 {"role": "assistant", "content": full_response}
             )
+            self.memory.add_exchange(user_query, full_response)
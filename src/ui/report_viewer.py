@@ -0,0 +1,237 @@
+import math
+
+import streamlit as st
+from pydantic import BaseModel
+from app.services.blob_service import TextRef, get_blob_store
+
+# Items of a long list or mapping shown per page
+PAGE_SIZE = 10
+
+# Texts longer than this show a preview, with the full text in an expander
+TEXT_PREVIEW_CHARS = 600
+
+# Keys naming an item of a list, in order of preference
+ITEM_TITLE_KEYS = ("name", "year", "search_query", "question", "title")
+
+
+def _label(key):
+    return str(key).replace("_", " ").strip().capitalize()
+
+
+def _is_text_ref(value):
+    return isinstance(value, dict) and set(value) == set(TextRef.model_fields)
+
+
+def _is_scalar(value):
+    return not isinstance(value, (dict, list))
+
+
+def _item_title(item, index):
+    if isinstance(item, dict):
+        for key in ITEM_TITLE_KEYS:
+            if item.get(key) not in (None, ""):
+                return f"{index}. {item[key]}"
+    return f"Item {index}"
+
+
+class ReportViewer:
+    """
+    Browses a large report one section at a time.
+
+    Only the selected section is serialized and sent to the browser. Its
+    serialized form is cached in the session state for as long as the report
+    object is unchanged, so switching reports or sections does not dump the
+    whole report again. Long lists and mappings are paginated, and long or
+    raw texts sit behind expanders, raw search texts being read from the
+    blob store only when asked for.
+
+    Entries below the section level are already inside an expander, which
+    Streamlit does not nest, so their full texts sit behind a toggle instead.
+    """
+
+    def __init__(self, name, report):
+        """
+        Args:
+            name (str): Report name, e.g. "customer_discovery"; scopes widget keys
+            report (BaseModel): Report to display
+        """
+        self.name = name
+        self.report = report
+
+        if "report_sections" not in st.session_state:
+            st.session_state.report_sections = {}
+        cached = st.session_state.report_sections.get(name)
+        # A recomputed stage yields a new report object, whose sections start afresh
+        if cached is None or cached["report"] is not report:
+            cached = {"report": report, "sections": {}, "selected": None}
+            st.session_state.report_sections[name] = cached
+        self._cached = cached
+        self._sections = cached["sections"]
+
+    def section_names(self):
+        """Top-level fields of the report, without empty or bookkeeping ones"""
+        if isinstance(self.report, BaseModel):
+            names = [
+                name
+                for name in type(self.report).model_fields
+                if name != "partial" and getattr(self.report, name) not in (None, "", [], {})
+            ]
+        else:
+            names = list(self.report or {})
+        return names
+
+    def section(self, name):
+        """JSON-like data of one section, serialized on first use"""
+        if name not in self._sections:
+            if isinstance(self.report, BaseModel):
+                data = self.report.model_dump(mode="json", include={name})[name]
+            else:
+                data = self.report[name]
+            self._sections[name] = data
+        return self._sections[name]
+
+    def render(self):
+        """Section picker and the selected section"""
+        if getattr(self.report, "partial", False):
+            st.warning("Partial report: some work was skipped to stay within budget")
+
+        names = self.section_names()
+        if not names:
+            st.info("This report is empty")
+            return
+        # Widget state is dropped while another report is shown, so the
+        # selected section is remembered alongside the cached sections
+        remembered = self._cached["selected"]
+        selected = st.selectbox(
+            "Section",
+            names,
+            index=names.index(remembered) if remembered in names else 0,
+            format_func=_label,
+            key=f"{self.name}/section",
+        )
+        self._cached["selected"] = selected
+        self._value(selected, self.section(selected), f"{self.name}/{selected}", depth=0)
+
+    def _value(self, label, value, key, depth):
+        if _is_text_ref(value):
+            self._text_ref(label, value, key, depth)
+        elif isinstance(value, str):
+            self._text(label, value, key, depth)
+        elif isinstance(value, list):
+            self._list(label, value, key, depth)
+        elif isinstance(value, dict):
+            self._mapping(label, value, key, depth)
+        elif value is not None:
+            st.markdown(f"**{_label(label)}:** {value}")
+
+    def _heading(self, label, depth):
+        if depth == 0:
+            st.subheader(_label(label))
+        else:
+            st.markdown(f"**{_label(label)}**")
+
+    def _text(self, label, text, key, depth):
+        if len(text) <= TEXT_PREVIEW_CHARS:
+            if depth == 0 or "\n" in text:
+                self._heading(label, depth)
+                st.markdown(text)
+            else:
+                st.markdown(f"**{_label(label)}:** {text}")
+            return
+        self._heading(label, depth)
+        title = f"Full text ({len(text):,} characters)"
+        if depth == 0:
+            st.markdown(text[:TEXT_PREVIEW_CHARS].rstrip() + " …")
+            with st.expander(title):
+                st.markdown(text)
+        elif st.toggle(title, key=f"{key}/full"):
+            st.markdown(text)
+        else:
+            st.markdown(text[:TEXT_PREVIEW_CHARS].rstrip() + " …")
+
+    def _text_ref(self, label, value, key, depth):
+        ref = TextRef(**value)
+        title = f"{_label(label)} ({ref.length:,} characters)"
+        if depth == 0:
+            with st.expander(title):
+                self._raw_text(ref, key)
+        else:
+            st.caption(title)
+            self._raw_text(ref, key)
+
+    def _raw_text(self, ref, key):
+        """Excerpt of a raw search text, the full text read only on request"""
+        if ref.length > len(ref.excerpt) and st.toggle("Load full text", key=f"{key}/full"):
+            try:
+                st.text(get_blob_store().get(ref.hash))
+                return
+            except KeyError:
+                st.caption("The full text is no longer stored")
+        st.text(ref.excerpt)
+
+    def _page(self, total, key):
+        """Slice of the items on the selected page"""
+        pages = math.ceil(total / PAGE_SIZE)
+        page = 1
+        if pages > 1:
+            page = st.number_input(
+                f"Page (of {pages}, {total} items)",
+                min_value=1,
+                max_value=pages,
+                value=1,
+                key=f"{key}/page",
+            )
+        start = (page - 1) * PAGE_SIZE
+        return start, min(start + PAGE_SIZE, total)
+
+    def _list(self, label, items, key, depth):
+        if not items:
+            return
+        self._heading(label, depth)
+        if all(_is_scalar(item) for item in items):
+            start, end = self._page(len(items), key)
+            st.markdown("\n".join(f"- {item}" for item in items[start:end]))
+            return
+
+        start, end = self._page(len(items), key)
+        for index in range(start, end):
+            item = items[index]
+            if _is_text_ref(item):
+                self._text_ref(f"Source {index + 1}", item, f"{key}/{index}", depth)
+                continue
+            # Expanders cannot nest, so deeper items are laid out inline
+            if depth == 0:
+                with st.expander(_item_title(item, index + 1)):
+                    self._item(item, f"{key}/{index}", depth + 1)
+            else:
+                st.markdown(f"*{_item_title(item, index + 1)}*")
+                self._item(item, f"{key}/{index}", depth + 1)
+
+    def _item(self, item, key, depth):
+        if isinstance(item, dict):
+            for field, value in item.items():
+                self._value(field, value, f"{key}/{field}", depth)
+        else:
+            self._value("Value", item, key, depth)
+
+    def _mapping(self, label, mapping, key, depth):
+        if not mapping:
+            return
+        self._heading(label, depth)
+        entries = list(mapping.items())
+        if all(_is_scalar(value) for _, value in entries):
+            start, end = self._page(len(entries), key)
+            st.markdown(
+                "\n".join(
+                    f"- **{_label(field)}:** {value}" for field, value in entries[start:end]
+                )
+            )
+            return
+
+        start, end = self._page(len(entries), key)
+        for field, value in entries[start:end]:
+            if depth == 0 and not _is_scalar(value):
+                with st.expander(str(field)):
+                    self._value(field, value, f"{key}/{field}", depth + 1)
+            else:
+                self._value(field, value, f"{key}/{field}", depth + 1)
@@ -12,11 +12,6 @@ import streamlit as st
 import asyncio
 from datetime import datetime
 import base64
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
-import io
-import matplotlib.pyplot as plt
 import sys
 from app.routers.product_evolution import ProductEvolver
 
@@ -24,41 +19,75 @@ from app.routers.customer_discovery import CustomerDiscoverer, CustomerDiscovery
 from app.routers.market_analysis import MarketAnalyzer, MarketAnalysisReport
 from app.routers.market_expansion import MarketExpander, MarketExpansionStrategy
 from app.llm import LiteLLMKit
+from app.services.checkpoint_service import CheckpointStore
+from app.services.pipeline_service import run_pipeline
+from app.utils.helpers import lookup_key
+
+from app.services.pdf_service import build_pdf, export_pdf, report_digest
+from app.utils.background import progress_summary, start_background_run
 
 from chat_ui import MarketInsightsChatUI
+from report_viewer import ReportViewer
+
+# Workflow stages in order; recomputing one invalidates the stages after it
+MEMOIZED_STAGES = [
+    "customer_discovery",
+    "market_analysis",
+    "market_expansion",
+    "product_evolution",
+]
+
+# Sidebar entry and page heading of each report on the dashboard
+REPORT_TITLES = {
+    "customer_discovery": "Customer Discovery Report",
+    "market_analysis": "Market Analysis Report",
+    "market_expansion": "Market Expansion Strategy",
+    "product_evolution": "Product Evolution Strategy",
+}
+REPORT_HEADINGS = {
+    "customer_discovery": "Customer Discovery Insights",
+    "market_analysis": "Market Analysis Insights",
+    "market_expansion": "Market Expansion Strategy",
+    "product_evolution": "Product Evolution Strategy",
+}
+
+# Seconds between two refreshes of a running stage's progress
+POLL_INTERVAL_SECONDS = 2
+
+
+@st.fragment(run_every=POLL_INTERVAL_SECONDS)
+def _poll_background_run(run, spinner_text):
+    """Show a running stage's progress, rerunning the app once it finishes"""
+    if run.done:
+        st.rerun()
+
+    st.info(f"{spinner_text} ({run.elapsed:.0f}s)")
+    for event in run.events():
+        headline, body = progress_summary(event)
+        with st.expander(headline):
+            st.markdown(body)
 
 
 class PDFReportGenerator:
     @staticmethod
     def generate_pdf(reports, output_path):
         """Generate a comprehensive PDF report from market insights"""
-        customer_discovery, market_analysis, market_expansion = reports
-
-        # Create PDF document
-        doc = SimpleDocTemplate(output_path, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
-
-        # Title
-        story.append(Paragraph("Market Insights Report", styles["Title"]))
-        story.append(Spacer(1, 12))
-
-        # Customer Discovery Section
-        story.append(Paragraph("Customer Discovery Report", styles["Heading2"]))
-        story.append(Paragraph(str(customer_discovery), styles["Normal"]))
-        story.append(Spacer(1, 12))
-
-        # Market Analysis Section
-        story.append(Paragraph("Market Analysis Report", styles["Heading2"]))
-        story.append(Paragraph(str(market_analysis), styles["Normal"]))
-        story.append(Spacer(1, 12))
-
-        # Market Expansion Section
-        story.append(Paragraph("Market Expansion Strategy", styles["Heading2"]))
-        story.append(Paragraph(str(market_expansion), styles["Normal"]))
+        build_pdf(reports, output_path)
 
-        # Generate PDF
-        doc.build(story)
+    @staticmethod
+    def start_export(reports):
+        """
+        Generate the reports' PDF on a background thread.
+
+        Returns:
+            BackgroundRun: Its result is the path of the PDF, cached by the
+                hash of the reports so an unchanged export is not rebuilt
+        """
+        reports = dict(reports)
+        return start_background_run(
+            lambda on_progress: export_pdf(reports, on_progress=on_progress),
+            name="pdf_export",
+        )
 
     @staticmethod
     def base64_to_image(base64_string, output_path):
@@ -75,9 +104,6 @@ class MarketInsightUI:
         )
         self.temp_dir = tempfile.mkdtemp()
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.pdf_report_path = os.path.join(
-            self.temp_dir, f"{self.session_id}_market_insights.pdf"
-        )
 
         # Initialize session state for workflow progression
         if "workflow_stage" not in st.session_state:
@@ -95,6 +121,98 @@ class MarketInsightUI:
 
         self.reports = st.session_state.reports
 
+        # Run id under which every stage checkpoints its progress
+        if "run_id" not in st.session_state:
+            st.session_state.run_id = self.session_id
+
+        # Memoized stage results and stages still running, see _run_stage
+        if "stage_results" not in st.session_state:
+            st.session_state.stage_results = {}
+        if "background_runs" not in st.session_state:
+            st.session_state.background_runs = {}
+        if "stage_generations" not in st.session_state:
+            st.session_state.stage_generations = {}
+
+    def _stage_checkpoint(self, stage_name):
+        """Checkpoint store for a workflow stage of the current run"""
+        # A recomputed stage checkpoints under a fresh scope instead of replaying
+        generation = st.session_state.stage_generations.get(stage_name, 0)
+        scope = f"{stage_name}-{generation}" if generation else stage_name
+        return CheckpointStore(st.session_state.run_id).scoped(scope)
+
+    def _stage_key(self, stage_name):
+        """Memo key of a stage's result for the current domain"""
+        return (stage_name, lookup_key(st.session_state.reports["domain"] or ""))
+
+    def _run_stage(self, stage_name, spinner_text, compute):
+        """
+        Run a workflow stage at most once per session and domain.
+
+        The stage runs on a background thread kept in the session state, so
+        the script thread stays responsive and leaving the page does not
+        cancel it; a polling fragment shows each niche, year or question as it
+        completes. Streamlit reruns the whole script on every widget
+        interaction, so the finished report and its progress log are memoized
+        in the session state and later reruns only render them.
+
+        Args:
+            stage_name (str): Workflow stage, also the key of its report
+            spinner_text (str): Shown while the stage computes
+            compute (Callable): Takes the stage's checkpoint store and a progress
+                callback and returns its report
+
+        Returns:
+            dict: The stage's report and progress log, or None while it runs
+
+        Raises:
+            Exception: Whatever the stage raised, once it has failed
+        """
+        results = st.session_state.stage_results
+        runs = st.session_state.background_runs
+        key = self._stage_key(stage_name)
+        if key not in results:
+            run = runs.get(key)
+            if run is None:
+                checkpoint = self._stage_checkpoint(stage_name)
+                run = runs[key] = start_background_run(
+                    lambda on_progress: compute(checkpoint, on_progress),
+                    name=stage_name,
+                )
+            if not run.done:
+                _poll_background_run(run, spinner_text)
+                return None
+
+            del runs[key]
+            if run.failed:
+                raise run.error
+            results[key] = {
+                "report": run.result,
+                "log": "\n".join(
+                    progress_summary(event)[0] for event in run.events()
+                ),
+            }
+
+        result = results[key]
+        st.session_state.reports[stage_name] = result["report"]
+        return result
+
+    def _invalidate_stage(self, stage_name):
+        """Forget a stage's result and those of every stage built on it"""
+        for stage in MEMOIZED_STAGES[MEMOIZED_STAGES.index(stage_name):]:
+            st.session_state.stage_results.pop(self._stage_key(stage), None)
+            # A run still in flight finishes on its own, but is no longer awaited
+            st.session_state.background_runs.pop(self._stage_key(stage), None)
+            st.session_state.stage_generations[stage] = (
+                st.session_state.stage_generations.get(stage, 0) + 1
+            )
+            st.session_state.reports[stage] = None
+
+    def _recompute_control(self, stage_name):
+        """Button discarding a stage's memoized result and running it again"""
+        if st.button("🔄 Recompute", key=f"recompute_{stage_name}"):
+            self._invalidate_stage(stage_name)
+            st.rerun()
+
     def _save_report_to_json(self, report, report_type):
         """Save report to a JSON file in the temp directory"""
         filename = os.path.join(
@@ -110,31 +228,34 @@ class MarketInsightUI:
         progress_bar = st.progress(0)
         status_text = st.empty()
 
-        # Customer Discovery Report
-        status_text.text("Stage 1: Initiating Customer Discovery...")
+        # Customer discovery and market analysis run concurrently, expansion
+        # starts as soon as both have finished
+        status_text.text(
+            "Stages 1-3: Running Customer Discovery and Market Analysis..."
+        )
         progress_bar.progress(10)
-        customer_discoverer = CustomerDiscoverer(domain)
-
-        status_text.text("Stage 2: Exploring Customer Niches...")
-        progress_bar.progress(30)
-        customer_discovery_report = customer_discoverer.discover()
-
-        # Market Analysis Report
-        status_text.text("Stage 3: Performing Market Analysis...")
-        progress_bar.progress(50)
-        market_analyzer = MarketAnalyzer()
-        market_analyzer.breakdown_problem(domain)
-        market_analyzer.perform_analysis()
-        market_analyzer.compile_comprehensive_report()
-        market_analysis_report = market_analyzer.get_report()
-
-        # Market Expansion Strategy
-        status_text.text("Stage 4: Generating Market Expansion Strategy...")
-        progress_bar.progress(70)
-        market_expander = MarketExpander(
-            customer_discovery_report, market_analysis_report
+
+        stage_labels = {
+            "customer_discovery": "Customer Discovery",
+            "market_analysis": "Market Analysis",
+            "market_expansion": "Market Expansion Strategy",
+        }
+        completed_stages = []
+
+        def on_stage_complete(stage_name, result):
+            completed_stages.append(stage_name)
+            progress_bar.progress(10 + 70 * len(completed_stages) // len(stage_labels))
+            status_text.text(f"{stage_labels[stage_name]} complete")
+
+        pipeline_result = await run_pipeline(
+            domain,
+            targets=["market_expansion"],
+            on_stage_complete=on_stage_complete,
+            run_id=st.session_state.run_id,
         )
-        market_expansion_strategy = market_expander.expand_market()
+        customer_discovery_report = pipeline_result.customer_discovery
+        market_analysis_report = pipeline_result.market_analysis
+        market_expansion_strategy = pipeline_result.market_expansion
 
         status_text.text("Stage 5: Finalizing Reports...")
         progress_bar.progress(90)
@@ -161,39 +282,31 @@ class MarketInsightUI:
 
     def display_reports(self, reports):
         """Display generated market reports with visualizations and export options"""
-        customer_discovery, market_analysis, market_expansion = reports
         self.reports = reports  # Store reports for potential PDF export
 
         st.title("🚀 Market Insights Dashboard")
 
-        # Sidebar navigation
-        report_options = [
-            "Customer Discovery Report",
-            "Market Analysis Report",
-            "Market Expansion Strategy",
-            "Visualizations",
-        ]
+        # Sidebar navigation over the reports generated so far
+        report_views = {
+            title: (stage, report)
+            for (stage, title), report in zip(REPORT_TITLES.items(), reports)
+            if report is not None
+        }
+        report_options = [*report_views, "Visualizations"]
         selected_report = st.sidebar.radio("Select Report", report_options)
 
         # Report display logic
-        if selected_report == "Customer Discovery Report":
-            st.subheader("Customer Discovery Insights")
-            st.json(customer_discovery.model_dump())
-
-        elif selected_report == "Market Analysis Report":
-            st.subheader("Market Analysis Insights")
-            st.json(market_analysis.model_dump())
-
-        elif selected_report == "Market Expansion Strategy":
-            st.subheader("Market Expansion Strategy")
-            st.json(market_expansion.model_dump())
-
-        elif selected_report == "Visualizations":
+        if selected_report == "Visualizations":
             self._display_visualizations(reports)
+        else:
+            stage, report = report_views[selected_report]
+            st.subheader(REPORT_HEADINGS[stage])
+            ReportViewer(stage, report).render()
 
         # PDF Export Button
         if st.sidebar.button("Export Reports as PDF"):
             self._export_pdf()
+        self._pdf_export_status()
 
     def _display_visualizations(self, reports):
         """Display various visualizations from reports"""
@@ -214,22 +327,56 @@ class MarketInsightUI:
         # market_expansion_viz = reports[2].generate_strategy_visualization()
         # st.pyplot(market_expansion_viz)
 
-    def _export_pdf(self):
-        """Export reports to PDF and provide download link"""
-        if self.reports:
-            PDFReportGenerator.generate_pdf(self.reports, self.pdf_report_path)
+    def _reports_digest(self):
+        """Digest of the session's reports, recomputed only when a report is replaced"""
+        # Reports are replaced, never mutated, so identity tells whether they changed
+        reports = tuple(st.session_state.reports.get(stage) for stage in MEMOIZED_STAGES)
+        cached = st.session_state.get("reports_digest")
+        if cached is None or any(
+            old is not new for old, new in zip(cached["reports"], reports)
+        ):
+            cached = st.session_state.reports_digest = {
+                "reports": reports,
+                "digest": report_digest(st.session_state.reports),
+            }
+        return cached["digest"]
 
-            with open(self.pdf_report_path, "rb") as pdf_file:
-                pdf_bytes = pdf_file.read()
+    def _export_pdf(self):
+        """Start exporting the reports to PDF, unless that export is already running"""
+        reports = st.session_state.reports
+        if not any(reports.get(stage) for stage in MEMOIZED_STAGES):
+            st.sidebar.error("No reports available for PDF export")
+            return
+
+        digest = self._reports_digest()
+        export = st.session_state.get("pdf_export")
+        if export is None or export["digest"] != digest or export["run"].failed:
+            st.session_state.pdf_export = {
+                "digest": digest,
+                "run": PDFReportGenerator.start_export(reports),
+            }
 
-            st.download_button(
+    def _pdf_export_status(self):
+        """Progress of the PDF export, then its download button once it is ready"""
+        export = st.session_state.get("pdf_export")
+        if export is None or export["digest"] != self._reports_digest():
+            return
+
+        run = export["run"]
+        if not run.done:
+            with st.sidebar:
+                _poll_background_run(run, "Generating PDF")
+        elif run.failed:
+            st.sidebar.error(f"PDF export failed: {run.error}")
+        else:
+            # Read when clicked, off the script thread, rather than on every rerun
+            st.sidebar.download_button(
                 label="Download Market Insights PDF",
-                data=pdf_bytes,
+                data=run.result.read_bytes,
                 file_name=f"market_insights_{self.session_id}.pdf",
                 mime="application/pdf",
+                on_click="ignore",
             )
-        else:
-            st.error("No reports available for PDF export")
 
     def run(self):
         """Main application workflow"""
@@ -274,48 +421,45 @@ class MarketInsightUI:
                 "How do you plan to approach this problem?",
                 placeholder="Outline your initial strategy or approach",
             )
+            resume_run_id = st.text_input(
+                "Resume a previous run (optional)",
+                placeholder="Run id of an interrupted analysis",
+            )
             submitted = st.form_submit_button("Start Market Analysis")
 
         if submitted and domain:
             st.session_state.reports["domain"] = domain
             st.session_state.reports["problem_statement"] = problem_statement
             st.session_state.reports["solution_approach"] = solution_approach
+            if resume_run_id:
+                st.session_state.run_id = resume_run_id.strip()
             self._advance_workflow("customer_discovery")
 
     def customer_discovery_stage(self):
         """Customer Discovery Stage with Interactive Logging"""
         st.title("🔍 Customer Discovery")
+        st.caption(f"Run id: {st.session_state.run_id}")
 
         domain = st.session_state.reports["domain"]
 
-        # Interactive logging placeholder
-        log_container = st.empty()
-
-        with st.spinner("Discovering Customer Insights..."):
-            customer_discoverer = CustomerDiscoverer(domain)
-
-            # Capture print statements
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = io.StringIO()
-
-            try:
-                customer_discovery_report = customer_discoverer.discover()
-
-                # Restore stdout and get captured output
-                sys.stdout = old_stdout
-                log_output = captured_output.getvalue()
-
-                log_container.code(log_output)
-
-                st.session_state.reports["customer_discovery"] = (
-                    customer_discovery_report
-                )
+        try:
+            result = self._run_stage(
+                "customer_discovery",
+                "Discovering Customer Insights...",
+                lambda checkpoint, on_progress: CustomerDiscoverer(
+                    domain, checkpoint=checkpoint, on_progress=on_progress
+                ).discover(),
+            )
+            if result is None:
+                return
+            st.code(result["log"])
 
-                if st.button("Proceed to Market Analysis"):
-                    self._advance_workflow("market_analysis")
+            if st.button("Proceed to Market Analysis"):
+                self._advance_workflow("market_analysis")
+        except Exception as e:
+            st.error(f"Error in Customer Discovery: {e}")
 
-            except Exception as e:
-                st.error(f"Error in Customer Discovery: {e}")
+        self._recompute_control("customer_discovery")
 
     def market_analysis_stage(self):
         """Market Analysis Stage with Interactive Logging"""
@@ -323,35 +467,24 @@ class MarketInsightUI:
 
         domain = st.session_state.reports["domain"]
 
-        # Interactive logging placeholder
-        log_container = st.empty()
-
-        with st.spinner("Performing Market Analysis..."):
-            market_analyzer = MarketAnalyzer()
-
-            # Capture print statements
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = io.StringIO()
-
-            try:
-                market_analyzer.breakdown_problem(domain)
-                market_analyzer.perform_analysis()
-                market_analyzer.compile_comprehensive_report()
-                market_analysis_report = market_analyzer.get_report()
-
-                # Restore stdout and get captured output
-                sys.stdout = old_stdout
-                log_output = captured_output.getvalue()
-
-                log_container.code(log_output)
-
-                st.session_state.reports["market_analysis"] = market_analysis_report
+        try:
+            result = self._run_stage(
+                "market_analysis",
+                "Performing Market Analysis...",
+                lambda checkpoint, on_progress: MarketAnalyzer(
+                    checkpoint=checkpoint, on_progress=on_progress
+                ).analyze(domain),
+            )
+            if result is None:
+                return
+            st.code(result["log"])
 
-                if st.button("Proceed to Market Expansion"):
-                    self._advance_workflow("market_expansion")
+            if st.button("Proceed to Market Expansion"):
+                self._advance_workflow("market_expansion")
+        except Exception as e:
+            st.error(f"Error in Market Analysis: {e}")
 
-            except Exception as e:
-                st.error(f"Error in Market Analysis: {e}")
+        self._recompute_control("market_analysis")
 
     def market_expansion_stage(self):
         """Market Expansion Stage with Interactive Logging"""
@@ -360,34 +493,26 @@ class MarketInsightUI:
         customer_discovery_report = st.session_state.reports["customer_discovery"]
         market_analysis_report = st.session_state.reports["market_analysis"]
 
-        # Interactive logging placeholder
-        log_container = st.empty()
-
-        with st.spinner("Generating Market Expansion Strategy..."):
-            market_expander = MarketExpander(
-                customer_discovery_report, market_analysis_report
+        try:
+            result = self._run_stage(
+                "market_expansion",
+                "Generating Market Expansion Strategy...",
+                lambda checkpoint, on_progress: MarketExpander(
+                    customer_discovery_report,
+                    market_analysis_report,
+                    checkpoint=checkpoint,
+                ).expand_market(),
             )
+            if result is None:
+                return
+            st.code(result["log"])
 
-            # Capture print statements
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = io.StringIO()
-
-            try:
-                market_expansion_strategy = market_expander.expand_market()
-
-                # Restore stdout and get captured output
-                sys.stdout = old_stdout
-                log_output = captured_output.getvalue()
+            if st.button("Proceed to Product Evolution"):
+                self._advance_workflow("product_evolution")
+        except Exception as e:
+            st.error(f"Error in Market Expansion: {e}")
 
-                log_container.code(log_output)
-
-                st.session_state.reports["market_expansion"] = market_expansion_strategy
-
-                if st.button("Proceed to Product Evolution"):
-                    self._advance_workflow("product_evolution")
-
-            except Exception as e:
-                st.error(f"Error in Market Expansion: {e}")
+        self._recompute_control("market_expansion")
 
     def product_evolution_stage(self):
         """Product Evolution Stage with Interactive Logging"""
@@ -397,40 +522,27 @@ class MarketInsightUI:
         market_analysis_report = st.session_state.reports["market_analysis"]
         market_expansion_strategy = st.session_state.reports["market_expansion"]
 
-        # Interactive logging placeholder
-        log_container = st.empty()
-
-        with st.spinner("Generating Product Evolution Strategy..."):
-            product_evolver = ProductEvolver(
-                customer_discovery_report,
-                market_analysis_report,
-                market_expansion_strategy,
+        try:
+            result = self._run_stage(
+                "product_evolution",
+                "Generating Product Evolution Strategy...",
+                lambda checkpoint, on_progress: ProductEvolver(
+                    customer_discovery_report,
+                    market_analysis_report,
+                    market_expansion_strategy,
+                    checkpoint=checkpoint,
+                ).generate_product_evolution_strategy(),
             )
+            if result is None:
+                return
+            st.code(result["log"])
 
-            # Capture print statements
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = io.StringIO()
-
-            try:
-                product_evolution_strategy = (
-                    product_evolver.generate_product_evolution_strategy()
-                )
-
-                # Restore stdout and get captured output
-                sys.stdout = old_stdout
-                log_output = captured_output.getvalue()
-
-                log_container.code(log_output)
-
-                st.session_state.reports["product_evolution"] = (
-                    product_evolution_strategy
-                )
-
-                if st.button("View Final Report"):
-                    self._advance_workflow("final_report")
+            if st.button("View Final Report"):
+                self._advance_workflow("final_report")
+        except Exception as e:
+            st.error(f"Error in Product Evolution: {e}")
 
-            except Exception as e:
-                st.error(f"Error in Product Evolution: {e}")
+        self._recompute_control("product_evolution")
 
     def final_report_stage(self):
         """Final Report Stage with Export Options"""